@@ -1,3 +1,8 @@
 # This file is what's going to be loaded by vercel
 
 from taw import app
+from taw.web import warm_up
+
+
+# Module-level code runs once per cold instance, before the first request
+warm_up()
@@ -0,0 +1,170 @@
+"""
+Compare the WSGI and the ASGI (see `taw.asgi`) serving modes under
+concurrency: clients keep asking for big match slips, while a judge keeps
+opening the help page. Report how many slips were rendered, and the latency
+of the help page, in each mode
+
+The ASGI mode needs uvicorn: `pip install uvicorn`
+
+Run it from the root of the repo: `python -m benchmarks.async_serving`
+"""
+import argparse
+import importlib.util
+import tempfile
+import threading
+import time
+import urllib.request
+
+from benchmarks.dumps import generate_pairings_dump
+from benchmarks.load_test import (
+    PERCENTILES,
+    SERVER_SCRIPT,
+    Server,
+    encode_multipart,
+    get_percentile,
+)
+
+
+ASGI_SERVER_SCRIPT = """
+import sys
+
+import uvicorn
+
+import taw.web
+from taw.asgi import app
+
+taw.web.UPLOADS_FOLDER = sys.argv[2]
+uvicorn.run(app, host="127.0.0.1", port=int(sys.argv[1]), log_level="warning")
+"""
+
+MODES = {"wsgi": SERVER_SCRIPT, "asgi": ASGI_SERVER_SCRIPT}
+
+LIGHT_PAGE = "help/"
+# Between two requests to the light page
+LIGHT_PAGE_INTERVAL = 0.05
+
+
+def run(*, url, body, content_type, nb_render_clients, duration):
+    """
+    Send render requests from `nb_render_clients` clients and light page
+    requests from another one, for `duration` seconds, and return the report
+    """
+    deadline = time.monotonic() + duration
+    render_latencies = []
+    light_latencies = []
+    nb_errors = 0
+    lock = threading.Lock()
+
+    def send(request, latencies):
+        nonlocal nb_errors
+        start = time.perf_counter()
+        try:
+            with urllib.request.urlopen(request) as response:
+                response.read()
+        except OSError:
+            with lock:
+                nb_errors += 1
+        else:
+            with lock:
+                latencies.append(time.perf_counter() - start)
+
+    def render_client():
+        while time.monotonic() < deadline:
+            request = urllib.request.Request(
+                url, data=body, headers={"Content-Type": content_type}
+            )
+            send(request, render_latencies)
+
+    def light_client():
+        while time.monotonic() < deadline:
+            send(url + LIGHT_PAGE, light_latencies)
+            time.sleep(LIGHT_PAGE_INTERVAL)
+
+    threads = [threading.Thread(target=render_client) for _ in range(nb_render_clients)]
+    threads.append(threading.Thread(target=light_client))
+    start = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    duration = time.perf_counter() - start
+
+    render_latencies.sort()
+    light_latencies.sort()
+    return {
+        "duration": duration,
+        "nb_errors": nb_errors,
+        "nb_renders": len(render_latencies),
+        "renders_throughput": len(render_latencies) / duration,
+        "render_p50": get_percentile(render_latencies, 50)
+        if render_latencies
+        else None,
+        "nb_light_requests": len(light_latencies),
+        **{
+            f"light_p{percentile}": get_percentile(light_latencies, percentile)
+            for percentile in PERCENTILES
+        },
+        "light_max": light_latencies[-1],
+    }
+
+
+def print_report(mode, report):
+    light_percentiles = ", ".join(
+        f"p{percentile} {report[f'light_p{percentile}'] * 1000:.0f}ms"
+        for percentile in PERCENTILES
+    )
+    render_p50 = report["render_p50"]
+    render_p50 = f"{render_p50 * 1000:.0f}ms" if render_p50 is not None else "-"
+    print(
+        f"{mode}: {report['nb_renders']} renders "
+        f"({report['renders_throughput']:.1f}/s, p50 {render_p50}), "
+        f"/{LIGHT_PAGE}: {light_percentiles}, max {report['light_max'] * 1000:.0f}ms, "
+        f"{report['nb_errors']} errors"
+    )
+    if report["peak_rss"] is not None:
+        print(f"{mode}: server peak RSS {report['peak_rss'] / 1024 / 1024:.1f}MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nb-players", type=int, default=4_000)
+    parser.add_argument("--nb-render-clients", type=int, default=8)
+    parser.add_argument("--duration", type=float, default=20)
+    parser.add_argument(
+        "--action",
+        default="match_slips_pdf",
+        help="The action of the render requests, eg. `match_slips`",
+    )
+    args = parser.parse_args()
+
+    body, content_type = encode_multipart(
+        {
+            "tournament_name": "Async serving",
+            "round_number": "1",
+            "aetherhub_dump": generate_pairings_dump(args.nb_players),
+            "action": args.action,
+        },
+        {},
+    )
+
+    for mode, script in MODES.items():
+        if mode == "asgi" and importlib.util.find_spec("uvicorn") is None:
+            print(f"{mode}: skipped, uvicorn is not installed")
+            continue
+
+        with tempfile.TemporaryDirectory() as uploads_folder:
+            with Server(uploads_folder=uploads_folder, script=script) as server:
+                report = run(
+                    url=server.url,
+                    body=body,
+                    content_type=content_type,
+                    nb_render_clients=args.nb_render_clients,
+                    duration=args.duration,
+                )
+                report["peak_rss"] = server.get_peak_rss()
+
+        print_report(mode, report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Measure the latency of the first request of a cold instance, with and without
+the precompiled templates (see `flask --app taw precompile-templates`)
+
+Run it from the root of the repo: `python -m benchmarks.cold_start`
+"""
+import argparse
+import json
+import shutil
+import statistics
+import subprocess
+import sys
+
+
+# Each run is a fresh interpreter, like a cold Vercel instance
+COLD_REQUEST_SCRIPT = """
+import json
+import time
+from pathlib import Path
+
+from taw import app
+
+client = app.test_client()
+dump = Path("taw/testing/pairings_long.txt").read_text()
+timings = {}
+for action in ["pairings", "match_slips"]:
+    start = time.perf_counter()
+    client.post(
+        "/",
+        data={
+            "tournament_name": "Cold start",
+            "round_number": "1",
+            "aetherhub_dump": dump,
+            "action": action,
+        },
+    )
+    timings[action] = time.perf_counter() - start
+
+print(json.dumps(timings))
+"""
+
+
+def measure_cold_requests(nb_runs):
+    timings = []
+    for _ in range(nb_runs):
+        output = subprocess.run(
+            [sys.executable, "-c", COLD_REQUEST_SCRIPT],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        timings.append(json.loads(output))
+
+    return {
+        action: statistics.median(timing[action] for timing in timings)
+        for action in timings[0]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nb-runs", type=int, default=10)
+    args = parser.parse_args()
+
+    from taw import app
+    from taw.bytecode_cache import BYTECODE_CACHE_FOLDER, precompile_templates
+
+    shutil.rmtree(BYTECODE_CACHE_FOLDER, ignore_errors=True)
+    before = measure_cold_requests(args.nb_runs)
+
+    precompile_templates(app.jinja_env)
+    after = measure_cold_requests(args.nb_runs)
+
+    print(f"Median over {args.nb_runs} cold runs:")
+    for action in before:
+        print(
+            f"{action:>12}: {before[action] * 1000:.1f}ms without precompiled "
+            f"templates, {after[action] * 1000:.1f}ms with precompiled templates"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Measure the size of the pages of each action, as rendered and as sent to the
+clients that accept compressed responses (see `taw.compression`), and the
+time it takes to compress them, on generated dumps (see `benchmarks.dumps`)
+
+Run it from the root of the repo: `python -m benchmarks.compression`
+"""
+import argparse
+import time
+
+from benchmarks.dumps import generate_pairings_dump, generate_standings_dump
+from taw import app
+from taw.compression import ENCODINGS, compress_response
+
+
+ACTIONS = ["pairings", "match_slips", "standings", "outstanding_tables"]
+
+
+def measure(nb_players):
+    """
+    Return the size of each action's page for each encoding, as sent by the
+    app, and the time it takes to compress the whole page at once
+    """
+    client = app.test_client()
+    dumps = {
+        "pairings": generate_pairings_dump(nb_players),
+        "standings": generate_standings_dump(nb_players),
+    }
+
+    results = {}
+    for action in ACTIONS:
+        dump = dumps["standings" if action == "standings" else "pairings"]
+        data = {
+            "tournament_name": "Compression",
+            "round_number": "1",
+            "aetherhub_dump": dump,
+            "action": action,
+        }
+        results[action] = {}
+        for encoding in ["identity", *ENCODINGS]:
+            response = client.post(
+                "/", data=data, headers={"Accept-Encoding": encoding}
+            )
+            results[action][encoding] = {"nb_bytes": len(response.get_data())}
+
+        page = client.post("/", data=data).get_data()
+        for encoding in ENCODINGS:
+            start = time.perf_counter()
+            compress_response(app.response_class(page), encoding)
+            results[action][encoding]["duration"] = time.perf_counter() - start
+
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nb-players", type=int, default=1_000)
+    args = parser.parse_args()
+
+    for action, encodings in measure(args.nb_players).items():
+        nb_bytes = encodings["identity"]["nb_bytes"]
+        print(f"{action}: {nb_bytes / 1024:.0f}kB")
+        for encoding in ENCODINGS:
+            result = encodings[encoding]
+            print(
+                f"{encoding:>20}: {result['nb_bytes'] / 1024:.0f}kB, "
+                f"{nb_bytes - result['nb_bytes']:,} bytes saved "
+                f"({1 - result['nb_bytes'] / nb_bytes:.0%}), "
+                f"compressed in {result['duration'] * 1000:.1f}ms"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+Generate AetherHub dumps of any size, shaped like the real ones (see the
+fixtures in `taw/testing/`): accents, a header, a bye for an odd number of
+players, and results for some of the tables
+"""
+import itertools
+import math
+import random
+
+
+FIRST_NAMES = [
+    "Édouard",
+    "Élisabeth",
+    "Édith",
+    "Jean-Marc",
+    "Lionel",
+    "Michel",
+    "Pierre",
+    "Jacques",
+    "René",
+    "Hélène",
+    "François",
+    "Ségolène",
+    "Noël",
+    "Chloé",
+    "Anaïs",
+    "Jérôme",
+    "Zoë",
+    "Björn",
+    "Łukasz",
+    "Renée",
+    "Georges",
+    "Manuel",
+    "Gaëlle",
+    "Benoît",
+]
+LAST_NAMES = [
+    "Balladur",
+    "Borne",
+    "Cresson",
+    "Ayrault",
+    "Jospin",
+    "Rocard",
+    "Bérégovoy",
+    "Chaban-Delmas",
+    "Coty",
+    "Pompidou",
+    "Castex",
+    "Valls",
+    "de Villepin",
+    "Messmer",
+    "Fabius",
+    "Mauroy",
+    "Le Fainéant",
+    "Müller",
+    "Ørsted",
+    "Dvořák",
+    "Núñez",
+    "Çelik",
+    "O'Brien",
+    "van der Berg",
+]
+
+PAIRINGS_HEADER = "Table   Player 1    Player 2    Match Results   "
+STANDINGS_HEADER = " Rank   Name    Points  Results     OMW     GW  OGW"
+
+MATCH_RESULTS = ["2 - 0", "2 - 1", "1 - 2", "0 - 2", "1 - 1 - 1", "0 - 0 - 3"]
+
+
+def generate_player_names(nb_players, *, seed=0):
+    """Return `nb_players` distinct names, in a random order"""
+    rng = random.Random(seed)
+    names = [
+        f"{first_name} {last_name}"
+        for first_name, last_name in itertools.product(FIRST_NAMES, LAST_NAMES)
+    ]
+    rng.shuffle(names)
+    nb_names = len(names)
+    # Big events need more names than that, tell homonyms apart like AetherHub
+    # users do
+    names = [
+        names[idx % nb_names] + (f" {idx // nb_names + 1}" if idx >= nb_names else "")
+        for idx in range(nb_players)
+    ]
+
+    return names
+
+
+def get_nb_rounds(nb_players):
+    """Number of Swiss rounds of an event, as per the MTR"""
+    return max(3, math.ceil(math.log2(max(nb_players, 2))))
+
+
+def generate_pairings_dump(
+    nb_players, *, round_number=None, results_ratio=0.3, with_header=True, seed=0
+):
+    """
+    Return the pairings of a round as copy pasted from AetherHub, `results_ratio`
+    of the tables already have their results
+    """
+    rng = random.Random(seed)
+    names = generate_player_names(nb_players, seed=seed)
+    round_number = round_number or get_nb_rounds(nb_players)
+
+    # Players are paired with players with about the same number of points
+    max_points = 3 * (round_number - 1)
+    points = sorted(
+        (rng.randint(0, max_points) for _ in range(nb_players)), reverse=True
+    )
+
+    lines = [PAIRINGS_HEADER] if with_header else []
+    for table_idx in range(nb_players // 2):
+        player_1 = names[2 * table_idx]
+        player_2 = names[2 * table_idx + 1]
+        result = (
+            rng.choice(MATCH_RESULTS) if rng.random() < results_ratio else "No results"
+        )
+        lines.append(
+            f"{table_idx + 1}   {player_1} ({points[2 * table_idx]} Points)     "
+            f"{player_2} ({points[2 * table_idx + 1]} Points)    {result}  "
+        )
+
+    if nb_players % 2:
+        lines.append(
+            f"{nb_players // 2 + 1}  {names[-1]} ({points[-1]} Points)     BYE     2 - 0   "
+        )
+
+    return "\n".join(lines) + "\n"
+
+
+def generate_standings_dump(nb_players, *, nb_rounds=None, with_header=True, seed=0):
+    """Return the standings after `nb_rounds` rounds as copy pasted from AetherHub"""
+    rng = random.Random(seed)
+    names = generate_player_names(nb_players, seed=seed)
+    nb_rounds = nb_rounds or get_nb_rounds(nb_players)
+
+    records = []
+    for name in names:
+        nb_draws = rng.choices([0, 1, 2], weights=[8, 2, 1])[0]
+        nb_wins = rng.randint(0, nb_rounds - nb_draws)
+        nb_losses = nb_rounds - nb_draws - nb_wins
+        records.append((3 * nb_wins + nb_draws, name, nb_wins, nb_losses, nb_draws))
+    records.sort(key=lambda record: record[0], reverse=True)
+
+    lines = [STANDINGS_HEADER] if with_header else []
+    for position, (nb_points, name, nb_wins, nb_losses, nb_draws) in enumerate(
+        records, start=1
+    ):
+        record = f"{nb_wins} - {nb_losses}" + (f" - {nb_draws}" if nb_draws else "")
+        omw, gw, ogw = (f"{rng.uniform(33, 100):.4f}%" for _ in range(3))
+        lines.append(
+            f"{position}   {name}    {nb_points}   {record}   {omw}    {gw}    {ogw}"
+        )
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,102 @@
+"""
+Measure the import time of taw's entry points with `python -X importtime`,
+and fail when one of them goes over its budget
+
+Run it from the root of the repo: `python -m benchmarks.import_time`
+"""
+import argparse
+import statistics
+import subprocess
+import sys
+
+
+# Cumulative import time budgets, in milliseconds
+IMPORT_TIME_BUDGETS = {
+    # The parsing / layout core, without Flask
+    "taw.utils": 50,
+    # What vercel loads on a cold start, warm up included
+    "api.index": 500,
+}
+
+# The parsing / layout core must be importable without those
+WEB_MODULES = ["flask", "flask_wtf", "jinja2", "werkzeug", "wtforms"]
+# Only imported by the requests / commands that need them, not on cold starts
+LAZY_MODULES = ["PIL", "numpy"]
+
+
+def measure_import(module_name):
+    """
+    Return the cumulative import time of the module in milliseconds, and
+    the import time of each module it imported
+    """
+    stderr = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module_name}"],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stderr
+
+    cumulative_ms = None
+    self_ms_per_module = {}
+    for line in stderr.splitlines():
+        # eg. `import time:       431 |     140779 |     flask`
+        if not line.startswith("import time:") or "[us]" in line:
+            continue
+
+        self_us, cumulative_us, imported_module = line[len("import time:") :].split("|")
+        imported_module_name = imported_module.strip()
+        self_ms_per_module[imported_module_name] = int(self_us) / 1000
+        # The top-level line of the module includes everything it imported
+        if imported_module == f" {module_name}":
+            cumulative_ms = int(cumulative_us) / 1000
+
+    return cumulative_ms, self_ms_per_module
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nb-runs", type=int, default=5)
+    parser.add_argument("--nb-slowest", type=int, default=5)
+    args = parser.parse_args()
+
+    over_budget = False
+    for module_name, budget_ms in IMPORT_TIME_BUDGETS.items():
+        measures = [measure_import(module_name) for _ in range(args.nb_runs)]
+        cumulative_ms = statistics.median(measure[0] for measure in measures)
+        self_ms_per_module = measures[-1][1]
+
+        status = "OK" if cumulative_ms <= budget_ms else "OVER BUDGET"
+        print(f"{module_name}: {cumulative_ms:.1f}ms (budget {budget_ms}ms) {status}")
+        over_budget |= cumulative_ms > budget_ms
+
+        slowest = sorted(
+            self_ms_per_module.items(), key=lambda item: item[1], reverse=True
+        )
+        for imported_module_name, self_ms in slowest[: args.nb_slowest]:
+            print(f"    {self_ms:6.1f}ms {imported_module_name}")
+
+    _, core_modules = measure_import("taw.utils")
+    web_modules = [
+        module_name
+        for module_name in core_modules
+        if module_name.split(".")[0] in WEB_MODULES
+    ]
+    if web_modules:
+        print(f"taw.utils imports web modules: {', '.join(web_modules)}")
+        over_budget = True
+
+    _, app_modules = measure_import("api.index")
+    lazy_modules = [
+        module_name
+        for module_name in app_modules
+        if module_name.split(".")[0] in LAZY_MODULES
+    ]
+    if lazy_modules:
+        print(f"api.index imports lazy modules: {', '.join(lazy_modules)}")
+        over_budget = True
+
+    sys.exit(1 if over_budget else 0)
+
+
+if __name__ == "__main__":
+    main()
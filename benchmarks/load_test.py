@@ -0,0 +1,283 @@
+"""
+Start the app locally, and hammer it with concurrent POSTs for each action,
+with and without logos, on generated dumps (see `benchmarks.dumps`)
+Report the throughput and the latency percentiles of each action, and the
+peak memory usage of the server
+
+Run it from the root of the repo: `python -m benchmarks.load_test`
+"""
+import argparse
+import io
+import json
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+import uuid
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.dumps import generate_pairings_dump, generate_standings_dump
+
+
+ACTIONS = ["pairings", "match_slips", "standings"]
+PERCENTILES = [50, 95, 99]
+
+# The app as served by the development server, in its own process so that
+# we only measure the memory used by the app
+SERVER_SCRIPT = """
+import sys
+
+import taw.web
+from werkzeug.serving import run_simple
+
+taw.web.UPLOADS_FOLDER = sys.argv[2]
+run_simple("127.0.0.1", int(sys.argv[1]), taw.web.app, threaded=True)
+"""
+SERVER_STARTUP_TIMEOUT = 30
+
+
+class Server:
+    """The app running in a subprocess, on a free port"""
+
+    def __init__(self, *, uploads_folder, script=SERVER_SCRIPT):
+        self.uploads_folder = uploads_folder
+        self.script = script
+        self.process = None
+
+        with socket.socket() as s:
+            s.bind(("127.0.0.1", 0))
+            self.port = s.getsockname()[1]
+        self.url = f"http://127.0.0.1:{self.port}/"
+
+    def __enter__(self):
+        self.process = subprocess.Popen(
+            [sys.executable, "-c", self.script, str(self.port), self.uploads_folder],
+            stderr=subprocess.DEVNULL,
+        )
+
+        deadline = time.monotonic() + SERVER_STARTUP_TIMEOUT
+        while True:
+            try:
+                urllib.request.urlopen(self.url).close()
+                return self
+            except urllib.error.URLError:
+                if time.monotonic() > deadline or self.process.poll() is not None:
+                    self.process.kill()
+                    raise RuntimeError("The server did not start")
+                time.sleep(0.1)
+
+    def __exit__(self, *exc_info):
+        self.process.terminate()
+        self.process.wait()
+
+    def get_peak_rss(self):
+        """Peak resident memory of the server in bytes, None if we can't tell"""
+        try:
+            with open(f"/proc/{self.process.pid}/status") as f:
+                for line in f:
+                    # eg. `VmHWM:     51236 kB`
+                    if line.startswith("VmHWM:"):
+                        return int(line.split()[1]) * 1024
+        except OSError:
+            pass
+
+        return None
+
+
+def _generate_logo(seed):
+    from PIL import Image
+
+    rng = random.Random(seed)
+    color = tuple(rng.randrange(256) for _ in range(3))
+    logo = io.BytesIO()
+    Image.new("RGB", (800, 600), color).save(logo, format="PNG")
+    return logo.getvalue()
+
+
+def encode_multipart(fields, files):
+    """Return the body and the content type of a `multipart/form-data` request"""
+    boundary = uuid.uuid4().hex
+    body = io.BytesIO()
+    for name, value in fields.items():
+        body.write(
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n'
+            f"{value}\r\n".encode()
+        )
+    for name, (filename, content) in files.items():
+        body.write(
+            f"--{boundary}\r\nContent-Disposition: form-data; "
+            f'name="{name}"; filename="{filename}"\r\n'
+            "Content-Type: application/octet-stream\r\n\r\n".encode()
+        )
+        body.write(content)
+        body.write(b"\r\n")
+    body.write(f"--{boundary}--\r\n".encode())
+
+    return body.getvalue(), f"multipart/form-data; boundary={boundary}"
+
+
+def generate_requests(
+    nb_requests, *, nb_players, nb_dumps, logo_ratio, nb_logos=3, seed=0
+):
+    """
+    Return `(action, has_logo, body, content_type)` tuples, mixing actions,
+    dumps (so that caches are not always hit) and logos
+    """
+    rng = random.Random(seed)
+    pairings_dumps = [
+        generate_pairings_dump(nb_players, seed=dump_seed)
+        for dump_seed in range(nb_dumps)
+    ]
+    standings_dumps = [
+        generate_standings_dump(nb_players, seed=dump_seed)
+        for dump_seed in range(nb_dumps)
+    ]
+    logos = [_generate_logo(logo_seed) for logo_seed in range(nb_logos)]
+
+    requests = []
+    for _ in range(nb_requests):
+        action = rng.choice(ACTIONS)
+        dumps = standings_dumps if action == "standings" else pairings_dumps
+        has_logo = rng.random() < logo_ratio
+        files = {"tournament_logo": ("logo.png", rng.choice(logos))} if has_logo else {}
+        body, content_type = encode_multipart(
+            {
+                "tournament_name": "Load test",
+                "round_number": "1",
+                "aetherhub_dump": rng.choice(dumps),
+                "action": action,
+            },
+            files,
+        )
+        requests.append((action, has_logo, body, content_type))
+
+    return requests
+
+
+def _send(url, body, content_type):
+    """Return the latency of the request in seconds, and whether it succeeded"""
+    request = urllib.request.Request(
+        url, data=body, headers={"Content-Type": content_type}
+    )
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(request) as response:
+            # Streamed pages are only done once they've been read
+            response.read()
+            ok = response.status == 200
+    except urllib.error.URLError:
+        ok = False
+
+    return time.perf_counter() - start, ok
+
+
+def get_percentile(sorted_values, percentile):
+    """Nearest-rank percentile"""
+    idx = max(0, -(-len(sorted_values) * percentile // 100) - 1)
+    return sorted_values[idx]
+
+
+def run(requests, *, url, concurrency):
+    """Send the requests, `concurrency` at a time, and return the report"""
+    latencies = defaultdict(list)
+    nb_errors = defaultdict(int)
+    lock = threading.Lock()
+
+    def send(request):
+        action, has_logo, body, content_type = request
+        latency, ok = _send(url, body, content_type)
+        key = f"{action} with logo" if has_logo else action
+        with lock:
+            latencies[key].append(latency)
+            if not ok:
+                nb_errors[key] += 1
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # Consume the results to raise errors from the threads, if any
+        list(executor.map(send, requests))
+    duration = time.perf_counter() - start
+
+    report = {
+        "nb_requests": len(requests),
+        "nb_errors": sum(nb_errors.values()),
+        "duration": duration,
+        "throughput": len(requests) / duration,
+        "actions": {},
+    }
+    for key, action_latencies in sorted(latencies.items()):
+        action_latencies.sort()
+        report["actions"][key] = {
+            "nb_requests": len(action_latencies),
+            "nb_errors": nb_errors[key],
+            # Requests of all actions shared the server during the whole run
+            "throughput": len(action_latencies) / duration,
+            **{
+                f"p{percentile}": get_percentile(action_latencies, percentile)
+                for percentile in PERCENTILES
+            },
+        }
+
+    return report
+
+
+def print_report(report):
+    print(
+        f"{report['nb_requests']} requests in {report['duration']:.1f}s: "
+        f"{report['throughput']:.1f} requests/s, {report['nb_errors']} errors"
+    )
+    for key, action_report in report["actions"].items():
+        percentiles = ", ".join(
+            f"p{percentile} {action_report[f'p{percentile}'] * 1000:.0f}ms"
+            for percentile in PERCENTILES
+        )
+        print(
+            f"{key:>22}: {action_report['throughput']:6.1f} requests/s, "
+            f"{percentiles}, {action_report['nb_errors']} errors"
+        )
+
+    if report["peak_rss"] is not None:
+        print(f"Server peak RSS: {report['peak_rss'] / 1024 / 1024:.1f}MB")
+    else:
+        print("Server peak RSS: unknown on this platform")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nb-requests", type=int, default=300)
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--nb-players", type=int, default=200)
+    parser.add_argument("--nb-dumps", type=int, default=10)
+    parser.add_argument("--logo-ratio", type=float, default=0.5)
+    parser.add_argument("--output", help="Save the report to this JSON file")
+    args = parser.parse_args()
+
+    requests = generate_requests(
+        args.nb_requests,
+        nb_players=args.nb_players,
+        nb_dumps=args.nb_dumps,
+        logo_ratio=args.logo_ratio,
+    )
+
+    with tempfile.TemporaryDirectory() as uploads_folder:
+        with Server(uploads_folder=uploads_folder) as server:
+            report = run(requests, url=server.url, concurrency=args.concurrency)
+            report["peak_rss"] = server.get_peak_rss()
+
+    print_report(report)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump({"args": vars(args), **report}, f, indent=2)
+
+    sys.exit(1 if report["nb_errors"] else 0)
+
+
+if __name__ == "__main__":
+    main()
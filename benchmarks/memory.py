@@ -0,0 +1,56 @@
+"""
+Measure the memory used per player by the parsed pairings and standings, and
+by the pairings ordered by name, on generated dumps (see `benchmarks.dumps`)
+
+Run it from the root of the repo: `python -m benchmarks.memory`
+"""
+import argparse
+import gc
+import tracemalloc
+
+from benchmarks.dumps import generate_pairings_dump, generate_standings_dump
+from taw.utils import get_pairings_by_name, parse_pairings, parse_standings
+
+
+def measure_memory(function):
+    """Return the number of bytes still allocated by `function` once it returned"""
+    gc.collect()
+    tracemalloc.start()
+    try:
+        # Keep the result alive while measuring it
+        result = function()  # noqa: F841
+        nb_bytes, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return nb_bytes
+
+
+def get_bytes_per_player(nb_players):
+    pairings_dump = generate_pairings_dump(nb_players)
+    standings_dump = generate_standings_dump(nb_players)
+    pairings = parse_pairings(pairings_dump)
+    # Fill the collation keys caches, they're not what we're measuring
+    get_pairings_by_name(pairings)
+
+    return {
+        name: measure_memory(function) / nb_players
+        for name, function in [
+            ("parse_pairings", lambda: parse_pairings(pairings_dump)),
+            ("parse_standings", lambda: parse_standings(standings_dump)),
+            ("get_pairings_by_name", lambda: get_pairings_by_name(pairings)),
+        ]
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--nb-players", type=int, default=10_000)
+    args = parser.parse_args()
+
+    for name, nb_bytes in get_bytes_per_player(args.nb_players).items():
+        print(f"{name:>20}: {nb_bytes:.0f} bytes per player")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,286 @@
+"""
+Time the parsing, the sorting and the rendering of each page on generated
+dumps (see `benchmarks.dumps`), from small events to Grand Prix sized ones
+
+Run it from the root of the repo: `python -m benchmarks.suite`
+Save the results with `--output results.json`, and compare a later run
+against them with `--compare results.json`
+Check that the heaviest computations stay within their time budgets on big
+events with `--check-budgets`
+"""
+import argparse
+import json
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+from benchmarks.dumps import (
+    generate_pairings_dump,
+    generate_player_names,
+    generate_standings_dump,
+)
+
+
+SIZES = [100, 1_000, 10_000, 100_000]
+
+# A benchmark is flagged when its median is that much slower than the baseline
+REGRESSION_THRESHOLD = 1.2
+
+
+def _get_benchmarks(nb_players):
+    """
+    Return each benchmark as `(name, function)`. Everything the benchmarks
+    need (dumps, parsed dumps, forms) is prepared here, outside of the timings
+    """
+    from taw import app
+    from taw.forms import PairingsForm, StandingsForm
+    from taw.web import (
+        _render_match_slips,
+        _render_pairings,
+        _render_standings,
+    )
+    from taw.utils import (
+        NB_SLIPS_PER_PAGE,
+        get_pairings_by_name,
+        parse_pairings,
+        parse_standings,
+        sort_pairings_for_paper_cutter,
+    )
+
+    pairings_dump = generate_pairings_dump(nb_players)
+    standings_dump = generate_standings_dump(nb_players)
+    pairings = parse_pairings(pairings_dump)
+    tables = [table for table in pairings if not table.player_2.is_bye]
+
+    ctx = {
+        "tournament_name": "Benchmark",
+        "round_number": 1,
+        "tournament_logo_filename": None,
+    }
+
+    def render(form_class, dump, render_page):
+        with app.test_request_context(
+            "/",
+            method="POST",
+            data={**ctx, "aetherhub_dump": dump},
+        ):
+            form = form_class()
+            assert form.validate(), form.errors
+            return lambda: render_page(form, ctx)
+
+    return [
+        ("parse_pairings", lambda: parse_pairings(pairings_dump)),
+        ("parse_standings", lambda: parse_standings(standings_dump)),
+        ("get_pairings_by_name", lambda: get_pairings_by_name(pairings)),
+        (
+            "sort_pairings_for_paper_cutter",
+            lambda: sort_pairings_for_paper_cutter(
+                tables, nb_slips_per_page=NB_SLIPS_PER_PAGE
+            ),
+        ),
+        ("render_pairings", render(PairingsForm, pairings_dump, _render_pairings)),
+        (
+            "render_match_slips",
+            render(PairingsForm, pairings_dump, _render_match_slips),
+        ),
+        (
+            "render_standings",
+            render(StandingsForm, standings_dump, _render_standings),
+        ),
+    ]
+
+
+def _get_budgets():
+    """
+    Return each budget as `(name, seconds, function)`, everything the
+    functions need is prepared here like in `_get_benchmarks`
+    """
+    from taw.projection import project_top_cut
+    from taw.swiss import get_previous_opponents, pair_round
+    from taw.tiebreakers import StandingsEngine
+    from taw.utils import Player, parse_round_results, parse_standings
+
+    # A day two of a Grand Prix
+    rounds = [
+        parse_round_results(
+            generate_pairings_dump(
+                2_000, round_number=round_number, results_ratio=1, seed=round_number
+            )
+        )
+        for round_number in range(1, 16)
+    ]
+
+    def get_standings():
+        engine = StandingsEngine()
+        for round_results in rounds:
+            engine.add_round(round_results)
+        return engine.get_standings()
+
+    # The last round of a 4001 players event, where the previous rounds make
+    # for many rematches to avoid
+    rng = random.Random(0)
+    points = {name: 0 for name in generate_player_names(4_001)}
+    previous_rounds = []
+    for round_number in range(1, 8):
+        players = [Player(name, nb_points) for name, nb_points in points.items()]
+        pairings = pair_round(
+            players,
+            previous_opponents=get_previous_opponents(previous_rounds),
+            seed=round_number,
+        )
+        for table in pairings:
+            if table.player_2.is_bye:
+                points[table.player_1.name] += 3
+            else:
+                winner = rng.choice([table.player_1, table.player_2])
+                points[winner.name] += 3
+        previous_rounds.append(pairings)
+    previous_opponents = get_previous_opponents(previous_rounds)
+    players = [Player(name, nb_points) for name, nb_points in points.items()]
+
+    standings = parse_standings(generate_standings_dump(1_000))
+
+    return [
+        ("standings_engine_2000_players_15_rounds", 1, get_standings),
+        (
+            "pair_round_4001_players_round_8",
+            1,
+            lambda: pair_round(players, previous_opponents=previous_opponents, seed=8),
+        ),
+        (
+            "project_top_cut_1000_players_10000_trials",
+            3,
+            lambda: project_top_cut(standings, nb_rounds=3, nb_trials=10_000, seed=0),
+        ),
+    ]
+
+
+def check_budgets(*, nb_runs):
+    """Print the timings of the budgets, return the ones over budget"""
+    over_budget = []
+    for name, budget, function in _get_budgets():
+        timings = _time(function, nb_runs=nb_runs)
+        is_over_budget = timings["median"] > budget
+        print(
+            f"{name:>45}: {timings['median'] * 1000:10.2f}ms / {budget * 1000:.0f}ms"
+            + (" OVER BUDGET" if is_over_budget else "")
+        )
+        if is_over_budget:
+            over_budget.append((name, timings["median"]))
+
+    return over_budget
+
+
+def _time(function, *, nb_runs):
+    timings = []
+    for _ in range(nb_runs):
+        start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - start)
+
+    return {"median": statistics.median(timings), "min": min(timings)}
+
+
+def run(sizes, *, nb_runs):
+    """Return the timings in seconds, by benchmark then by number of players"""
+    from taw import app
+
+    results = {}
+    for nb_players in sizes:
+        # The templates need an application context
+        with app.app_context():
+            for name, function in _get_benchmarks(nb_players):
+                # Don't time the first call, which loads templates, fills caches...
+                function()
+                timings = _time(function, nb_runs=nb_runs)
+                results.setdefault(name, {})[str(nb_players)] = timings
+                print(
+                    f"{name:>30} {nb_players:>7} players: "
+                    f"{timings['median'] * 1000:10.2f}ms"
+                )
+
+    return results
+
+
+def compare(results, baseline, *, threshold=REGRESSION_THRESHOLD):
+    """Print how each benchmark changed, return the regressions"""
+    regressions = []
+    for name, timings_by_size in results.items():
+        for nb_players, timings in timings_by_size.items():
+            baseline_timings = baseline.get(name, {}).get(nb_players)
+            if baseline_timings is None:
+                continue
+
+            ratio = timings["median"] / baseline_timings["median"]
+            is_regression = ratio > threshold
+            print(
+                f"{name:>30} {nb_players:>7} players: {ratio:5.2f}x"
+                + (" REGRESSION" if is_regression else "")
+            )
+            if is_regression:
+                regressions.append((name, nb_players, ratio))
+
+    return regressions
+
+
+def _get_git_revision():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--sizes", type=int, nargs="+", default=SIZES)
+    parser.add_argument("--nb-runs", type=int, default=5)
+    parser.add_argument("--output", help="Save the results to this JSON file")
+    parser.add_argument("--compare", help="Compare against a saved JSON file")
+    parser.add_argument("--threshold", type=float, default=REGRESSION_THRESHOLD)
+    parser.add_argument(
+        "--check-budgets",
+        action="store_true",
+        help="Only check the time budgets of the heaviest computations",
+    )
+    args = parser.parse_args()
+
+    if args.check_budgets:
+        if check_budgets(nb_runs=args.nb_runs):
+            sys.exit(1)
+        return
+
+    results = run(args.sizes, nb_runs=args.nb_runs)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(
+                {
+                    "revision": _get_git_revision(),
+                    "python": platform.python_version(),
+                    "platform": platform.platform(),
+                    "nb_runs": args.nb_runs,
+                    "results": results,
+                },
+                f,
+                indent=2,
+            )
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+
+        print(f"Compared to {baseline['revision']}:")
+        if compare(results, baseline["results"], threshold=args.threshold):
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -15,3 +15,10 @@ def pytest_addoption(parser):
 @pytest.fixture(scope="session")
 def taw_generate_test_outputs(request):
     return request.config.getvalue("generate_test_outputs")
+
+
+@pytest.fixture
+def uploads_folder(tmp_path, monkeypatch):
+    """Uploaded logos go to a temporary folder"""
+    monkeypatch.setattr("taw.web.UPLOADS_FOLDER", str(tmp_path))
+    return tmp_path
@@ -0,0 +1,274 @@
+"""
+Serve the app over ASGI, eg. with `uvicorn taw.asgi:app`
+
+The WSGI app itself is unchanged, but a request no longer holds a thread while
+its body (eg. a big logo) is being uploaded: the body is received by the event
+loop, large bodies being spooled to disk from a background thread, and the app
+only gets the request once the body is complete. Bodies over the app's
+`MAX_CONTENT_LENGTH` get a 413 as soon as they go over it, they're not read
+any further
+
+The app then runs in one of two bounded thread pools: POSTs (parsing and
+rendering) get their own, so that pages like `/help/` and `/faq/` keep
+responding while big match slips are being rendered
+"""
+import asyncio
+import contextvars
+import os
+import sys
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from taw.web import app as wsgi_app
+from taw.web import warm_up
+
+
+# Rendering is CPU-bound: with the GIL, more threads than that only make each
+# render slower, and the light pages with them
+RENDER_WORKERS = int(os.environ.get("TAW_RENDER_WORKERS", 2))
+LIGHT_WORKERS = int(os.environ.get("TAW_LIGHT_WORKERS", 4))
+RENDER_METHODS = {"POST"}
+
+# Bodies bigger than that are spooled to disk
+MAX_BODY_MEMORY_SIZE = 1024 * 1024
+
+_END = object()
+
+
+class _BodyTooLarge(Exception):
+    pass
+
+
+class AsgiApp:
+    """An ASGI app running a WSGI app in bounded thread pools"""
+
+    def __init__(
+        self,
+        wsgi_app,
+        *,
+        render_workers=RENDER_WORKERS,
+        light_workers=LIGHT_WORKERS,
+        on_startup=None,
+        max_body_size=None,
+    ):
+        self.wsgi_app = wsgi_app
+        self.on_startup = on_startup
+        self.max_body_size = max_body_size
+        self.render_executor = ThreadPoolExecutor(
+            render_workers, thread_name_prefix="taw-render"
+        )
+        self.light_executor = ThreadPoolExecutor(
+            light_workers, thread_name_prefix="taw-light"
+        )
+        # Spools the bodies to disk
+        self.uploads_executor = ThreadPoolExecutor(1, thread_name_prefix="taw-uploads")
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+        elif scope["type"] == "http":
+            await self._http(scope, receive, send)
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                if self.on_startup is not None:
+                    await asyncio.get_running_loop().run_in_executor(
+                        self.light_executor, self.on_startup
+                    )
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                for executor in [
+                    self.render_executor,
+                    self.light_executor,
+                    self.uploads_executor,
+                ]:
+                    executor.shutdown(wait=False, cancel_futures=True)
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _http(self, scope, receive, send):
+        try:
+            received = await self._receive_body(scope, receive)
+        except _BodyTooLarge:
+            await _send_body_too_large(send)
+            return
+        if received is None:
+            # The client is gone
+            return
+        body, body_size = received
+
+        if scope["method"] in RENDER_METHODS:
+            executor = self.render_executor
+        else:
+            executor = self.light_executor
+
+        try:
+            await self._run_wsgi_app(
+                _get_environ(scope, body, body_size), send, executor
+            )
+        finally:
+            body.close()
+
+    async def _receive_body(self, scope, receive):
+        """
+        Return the whole body as a file and its size, or None if the client
+        disconnected
+        Raise `_BodyTooLarge` as soon as the body is known to be over
+        `max_body_size`, from its `Content-Length` or from what was received
+        """
+        if self._is_too_large(_get_content_length(scope)):
+            raise _BodyTooLarge
+
+        loop = asyncio.get_running_loop()
+        body = tempfile.SpooledTemporaryFile(max_size=MAX_BODY_MEMORY_SIZE)
+        size = 0
+        while True:
+            message = await receive()
+            if message["type"] == "http.disconnect":
+                body.close()
+                return None
+
+            chunk = message.get("body", b"")
+            size += len(chunk)
+            if self._is_too_large(size):
+                body.close()
+                raise _BodyTooLarge
+
+            if size > MAX_BODY_MEMORY_SIZE:
+                # The body is (about to be) on disk, don't block the event loop
+                await loop.run_in_executor(self.uploads_executor, body.write, chunk)
+            else:
+                body.write(chunk)
+
+            if not message.get("more_body", False):
+                break
+
+        body.seek(0)
+        return body, size
+
+    def _is_too_large(self, size):
+        return self.max_body_size is not None and size > self.max_body_size
+
+    async def _run_wsgi_app(self, environ, send, executor):
+        loop = asyncio.get_running_loop()
+        # Flask keeps the request in context variables: the app and the
+        # iteration of its response (eg. `stream_with_context`) must share
+        # them, even though they don't run in the same thread
+        context = contextvars.copy_context()
+
+        def run(function, *args):
+            return loop.run_in_executor(executor, context.run, function, *args)
+
+        response_start = {}
+
+        def start_response(status, headers, exc_info=None):
+            response_start["message"] = {
+                "type": "http.response.start",
+                "status": int(status.split(" ", 1)[0]),
+                "headers": [
+                    (name.lower().encode("latin-1"), value.encode("latin-1"))
+                    for name, value in headers
+                ],
+            }
+
+        response = await run(self.wsgi_app, environ, start_response)
+        try:
+            iterator = await run(iter, response)
+            is_started = False
+            # Each chunk is sent as soon as it's ready: streamed pages stay
+            # streamed
+            while (chunk := await run(next, iterator, _END)) is not _END:
+                if not chunk:
+                    continue
+                if not is_started:
+                    await send(response_start["message"])
+                    is_started = True
+                await send(
+                    {"type": "http.response.body", "body": chunk, "more_body": True}
+                )
+
+            if not is_started:
+                await send(response_start["message"])
+            await send({"type": "http.response.body", "body": b""})
+        finally:
+            if hasattr(response, "close"):
+                await run(response.close)
+
+
+def _get_content_length(scope):
+    """The `Content-Length` of the request, 0 if it's missing (eg. chunked)"""
+    for name, value in scope["headers"]:
+        if name.lower() == b"content-length":
+            try:
+                return int(value)
+            except ValueError:
+                return 0
+    return 0
+
+
+async def _send_body_too_large(send):
+    # The rest of the body is not read, the connection can't be reused
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"text/plain; charset=utf-8"),
+                (b"connection", b"close"),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": b"Request Entity Too Large"})
+
+
+def _get_environ(scope, body, body_size):
+    """The WSGI environ of an ASGI HTTP request, see PEP 3333"""
+    root_path = scope.get("root_path", "")
+    path = scope["path"]
+    if path.startswith(root_path):
+        path = path[len(root_path) :]
+    server_name, server_port = scope.get("server") or ("localhost", 80)
+
+    environ = {
+        "REQUEST_METHOD": scope["method"],
+        # WSGI strings are latin-1, whatever their actual encoding
+        "SCRIPT_NAME": root_path.encode().decode("latin-1"),
+        "PATH_INFO": path.encode().decode("latin-1"),
+        "QUERY_STRING": scope["query_string"].decode("latin-1"),
+        "SERVER_NAME": server_name,
+        "SERVER_PORT": str(server_port),
+        "SERVER_PROTOCOL": f"HTTP/{scope.get('http_version', '1.1')}",
+        "wsgi.version": (1, 0),
+        "wsgi.url_scheme": scope.get("scheme", "http"),
+        "wsgi.input": body,
+        "wsgi.errors": sys.stderr,
+        "wsgi.multithread": True,
+        "wsgi.multiprocess": False,
+        "wsgi.run_once": False,
+    }
+    if client := scope.get("client"):
+        environ["REMOTE_ADDR"], environ["REMOTE_PORT"] = client[0], str(client[1])
+
+    for name, value in scope["headers"]:
+        name = name.decode("latin-1").upper().replace("-", "_")
+        value = value.decode("latin-1")
+        if name not in ["CONTENT_TYPE", "CONTENT_LENGTH"]:
+            name = f"HTTP_{name}"
+        if name in environ:
+            # Repeated headers are joined, eg. `Accept`
+            value = f"{environ[name]},{value}"
+        environ[name] = value
+
+    # The body might have been chunked, its size is known by now
+    environ["CONTENT_LENGTH"] = str(body_size)
+
+    return environ
+
+
+app = AsgiApp(
+    wsgi_app,
+    on_startup=warm_up,
+    max_body_size=wsgi_app.config["MAX_CONTENT_LENGTH"],
+)
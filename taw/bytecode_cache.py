@@ -0,0 +1,60 @@
+import os
+from hashlib import sha1
+
+from jinja2 import FileSystemBytecodeCache
+
+
+# Filled by `flask --app taw precompile-templates` when Vercel builds a
+# deployment (see `vercel.json`), so cold instances don't have to compile every
+# template on their first request
+BYTECODE_CACHE_FOLDER = os.path.join(os.path.dirname(__file__), "bytecode_cache")
+
+
+class PrecompiledBytecodeCache(FileSystemBytecodeCache):
+    """
+    Jinja bytecode cache that can be built on one machine and shipped to another
+
+    Jinja checks the checksum of the template source and the Python version
+    when loading the bytecode, a stale cache is simply ignored. The checksum is
+    that of the preprocessed source, so that changes to the extensions (eg.
+    the minification of `taw.compression`) invalidate the cache as well
+    """
+
+    def __init__(self, directory=BYTECODE_CACHE_FOLDER):
+        super().__init__(directory=directory)
+
+    def get_bucket(self, environment, name, filename, source):
+        # Jinja only checksums the raw source
+        source = environment.preprocess(source, name, filename)
+        return super().get_bucket(environment, name, filename, source)
+
+    def get_cache_key(self, name, filename=None):
+        # The default key depends on the absolute path of the template,
+        # which is not the same where we build and where we deploy
+        return sha1(name.encode("utf-8")).hexdigest()
+
+    def dump_bytecode(self, bucket):
+        # Templates compiled at runtime are written to the folder when it
+        # exists, except once deployed: it's read-only there, and the cache is
+        # optional anyway
+        try:
+            super().dump_bytecode(bucket)
+        except OSError:
+            pass
+
+
+def precompile_templates(jinja_env):
+    """
+    Compile every template of the environment into its bytecode cache, and
+    return the names of the compiled templates
+    """
+    os.makedirs(jinja_env.bytecode_cache.directory, exist_ok=True)
+    jinja_env.bytecode_cache.clear()
+    # Templates that were already loaded would not go through the bytecode cache
+    jinja_env.cache.clear()
+
+    template_names = jinja_env.list_templates(extensions=["html"])
+    for template_name in template_names:
+        jinja_env.get_template(template_name)
+
+    return template_names
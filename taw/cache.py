@@ -0,0 +1,144 @@
+import hashlib
+import os
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+
+# Scorekeepers paste the same dump several times per round (pairings, match
+# slips, reprints), rounds last about an hour
+CACHE_TTL = 2 * 60 * 60
+
+
+def get_max_bytes_setting(name, default):
+    """The size of a cache, in bytes, from the `name` environment variable"""
+    return int(os.environ.get(name, default))
+
+
+# Vercel functions only have 128MB, see `vercel.json`: instances with more
+# memory can afford bigger caches
+PARSED_DUMPS_CACHE_MAX_BYTES = get_max_bytes_setting(
+    "TAW_PARSED_DUMPS_CACHE_MAX_BYTES", 8 * 1024 * 1024
+)
+RENDERED_PAGES_CACHE_MAX_BYTES = get_max_bytes_setting(
+    "TAW_RENDERED_PAGES_CACHE_MAX_BYTES", 16 * 1024 * 1024
+)
+# 800KB for the biggest events, see `taw.utils.MAX_TABLE_NUMBER`
+PAPER_CUTTER_SEATS_CACHE_MAX_BYTES = get_max_bytes_setting(
+    "TAW_PAPER_CUTTER_SEATS_CACHE_MAX_BYTES", 4 * 1024 * 1024
+)
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache, bounded by the total size of its values, whose
+    entries expire `ttl` seconds after they were set
+    The size of each value is given by the caller, see `get_deep_size`
+    """
+
+    def __init__(self, *, max_bytes, ttl):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        # key -> (expires_at, size, value), least recently used first
+        self._entries = OrderedDict()
+        self._nb_bytes = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, size, value = entry
+            if expires_at <= time.monotonic():
+                self._remove(key)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value, *, size):
+        # No need to evict everything else for a value that won't fit anyway
+        if size > self.max_bytes:
+            return
+
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+
+            self._entries[key] = (time.monotonic() + self.ttl, size, value)
+            self._nb_bytes += size
+
+            # Evict the least recently used entries until we fit in memory
+            while self._nb_bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._nb_bytes = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self):
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "nb_entries": len(self._entries),
+                "nb_bytes": self._nb_bytes,
+                "max_bytes": self.max_bytes,
+            }
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._nb_bytes -= size
+
+
+def get_dump_hash(dump):
+    return hashlib.sha256(dump.encode()).hexdigest()
+
+
+def get_deep_size(obj):
+    """
+    Approximate memory footprint of parsed pairings / standings: lists and
+    (named)tuples are followed, shared objects are counted several times
+    """
+    size = sys.getsizeof(obj)
+    if isinstance(obj, (list, tuple)):
+        size += sum(get_deep_size(item) for item in obj)
+    return size
+
+
+def parse_with_cache(parse, dump, *, dump_hash=None):
+    """
+    Parse the dump with `parse`, or get it from the cache if the exact same
+    dump was already parsed. Parsed values are shared, they must not be modified
+    """
+    cache_key = (parse.__name__, dump_hash or get_dump_hash(dump))
+    parsed = parsed_dumps_cache.get(cache_key)
+    if parsed is None:
+        parsed = parse(dump)
+        parsed_dumps_cache.set(cache_key, parsed, size=get_deep_size(parsed))
+
+    return parsed
+
+
+# Parsed `Table`s / `Standing`s, keyed by the kind of dump and its hash
+parsed_dumps_cache = LRUCache(max_bytes=PARSED_DUMPS_CACHE_MAX_BYTES, ttl=CACHE_TTL)
+# Rendered HTML, keyed by the dump hash and everything else the page depends on
+rendered_pages_cache = LRUCache(max_bytes=RENDERED_PAGES_CACHE_MAX_BYTES, ttl=CACHE_TTL)
+# Print orders of the match slips, keyed by the number of tables and of slips
+# per page, see `taw.utils.sort_pairings_for_paper_cutter`
+paper_cutter_seats_cache = LRUCache(
+    max_bytes=PAPER_CUTTER_SEATS_CACHE_MAX_BYTES, ttl=CACHE_TTL
+)
@@ -0,0 +1,133 @@
+"""
+Smaller responses, for the venue Wi-Fi: templates are minified once, when
+they're compiled, and rendered pages are compressed for the clients that
+accept it, with gzip, or brotli when the `brotli` package is installed
+"""
+import re
+import zlib
+
+from jinja2.ext import Extension
+
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# Levels that compress 1MB of match slips in ~7ms, next to the ~100ms it
+# takes to render them. Higher levels barely save anything more on our pages,
+# for several times the CPU (brotli's 11 takes ~200ms)
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+# In order of preference
+ENCODINGS = ["br", "gzip"] if brotli is not None else ["gzip"]
+
+# PDFs are already compressed
+COMPRESSIBLE_MIMETYPES = {"text/html", "application/json", "text/plain"}
+# Below that, compressing doesn't save anything worth it
+MIN_SIZE = 512
+
+
+# A line with nothing but Jinja tags and comments, eg. `{% endif %}`
+re_tags_line = re.compile(r"(?:\{%(?:(?!%\}).)*%\}|\{#(?:(?!#\}).)*#\})+")
+
+
+class MinifyExtension(Extension):
+    """
+    Strip the indentation and the blank lines of the templates, and the line
+    breaks after lines that only hold Jinja tags
+
+    Line breaks between markup are kept: the page is displayed the same, and
+    inline scripts are not affected. It's done on the source of the templates,
+    rendering a row costs nothing more
+    """
+
+    def preprocess(self, source, name, filename=None):
+        lines = []
+        for line in source.splitlines():
+            line = line.strip()
+            if not line:
+                continue
+            lines.append(line)
+            # Whatever the tags output is followed by the next line, as if the
+            # tags were on that line
+            lines.append("" if re_tags_line.fullmatch(line) else "\n")
+
+        return "".join(lines)
+
+
+def get_response_encoding(request, response):
+    """Return the encoding to compress the response with, or None"""
+    if (
+        response.direct_passthrough
+        or response.status_code != 200
+        or response.mimetype not in COMPRESSIBLE_MIMETYPES
+        or "Content-Encoding" in response.headers
+    ):
+        return None
+
+    # Caches must not send a compressed page to clients that don't accept it
+    response.vary.add("Accept-Encoding")
+
+    if not response.is_streamed and response.calculate_content_length() < MIN_SIZE:
+        return None
+
+    return request.accept_encodings.best_match(ENCODINGS)
+
+
+def compress_response(response, encoding, *, on_done=None):
+    """
+    Compress the response with `encoding`, see `get_response_encoding`
+    Streamed responses stay streamed: each chunk is compressed and flushed on
+    its own. `on_done` is called with the number of bytes before and after
+    compression, once the whole response was compressed
+    """
+    compress, flush, finish = _get_compressor(encoding)
+    response.headers["Content-Encoding"] = encoding
+
+    if not response.is_streamed:
+        data = response.get_data()
+        compressed_data = compress(data) + finish()
+        response.set_data(compressed_data)
+        if on_done is not None:
+            on_done(len(data), len(compressed_data))
+        return response
+
+    response.headers.pop("Content-Length", None)
+    response.response = _iter_compressed(
+        response.iter_encoded(), compress, flush, finish, on_done=on_done
+    )
+    return response
+
+
+def _get_compressor(encoding):
+    """Return the `compress`, `flush` and `finish` functions of `encoding`"""
+    if encoding == "br":
+        compressor = brotli.Compressor(quality=BROTLI_QUALITY)
+        return compressor.process, compressor.flush, compressor.finish
+
+    # `16 +` for the gzip header and trailer
+    compressor = zlib.compressobj(GZIP_LEVEL, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+    return (
+        compressor.compress,
+        lambda: compressor.flush(zlib.Z_SYNC_FLUSH),
+        compressor.flush,
+    )
+
+
+def _iter_compressed(chunks, compress, flush, finish, *, on_done):
+    nb_bytes = nb_compressed_bytes = 0
+    for chunk in chunks:
+        compressed_chunk = compress(chunk) + flush()
+        nb_bytes += len(chunk)
+        nb_compressed_bytes += len(compressed_chunk)
+        yield compressed_chunk
+
+    compressed_chunk = finish()
+    nb_compressed_bytes += len(compressed_chunk)
+    yield compressed_chunk
+
+    if on_done is not None:
+        on_done(nb_bytes, nb_compressed_bytes)
@@ -1,9 +1,12 @@
+from flask import request
 from flask_wtf import FlaskForm
 from flask_wtf.file import FileField
 from wtforms import IntegerField, StringField, TextAreaField
 from wtforms.validators import DataRequired, NumberRange, Optional, ValidationError
 
+from taw.cache import get_dump_hash, parse_with_cache
 from taw.exceptions import ParsePairingException, ParseStandingException
+from taw.profiling import timed
 from taw.utils import parse_pairings, parse_standings
 
 
@@ -27,18 +30,52 @@ class BaseForm(FlaskForm):
         # We don't handle sensitive data, I can't be bothered to set up a secret key properly
         csrf = False
 
+    def parse_aetherhub_dump(self, parse):
+        """
+        Parse the dump, or get it from the cache if the exact same dump
+        was already parsed (eg. for the pairings, then for the match slips)
+        Parsed values are shared between requests, they must not be modified
+        """
+        with timed("parse"):
+            self.aetherhub_dump_hash = get_dump_hash(self.aetherhub_dump.data)
+            parsed = parse_with_cache(
+                parse, self.aetherhub_dump.data, dump_hash=self.aetherhub_dump_hash
+            )
+
+        self.nb_parsed_rows = len(parsed)
+        return parsed
+
 
 class PairingsForm(BaseForm):
+    # Only used by the round bundle, alongside the pairings
+    standings_dump = TextAreaField(
+        "Optional: Standings from AetherHub",
+        validators=[Optional()],
+        description="Only used for the round bundle",
+    )
+    parsed_standings = None
+
     def validate_aetherhub_dump(form, field):
         try:
-            form.parsed_pairings = parse_pairings(field.data)
+            form.parsed_pairings = form.parse_aetherhub_dump(parse_pairings)
         except ParsePairingException as e:
             raise ValidationError(str(e)) from e
 
+    def validate_standings_dump(form, field):
+        # A stale standings paste must not block the other actions
+        if request.form.get("action") != "round_bundle_pdf":
+            return
+
+        try:
+            with timed("parse"):
+                form.parsed_standings = parse_with_cache(parse_standings, field.data)
+        except ParseStandingException as e:
+            raise ValidationError(str(e)) from e
+
 
 class StandingsForm(BaseForm):
     def validate_aetherhub_dump(form, field):
         try:
-            form.parsed_standings = parse_standings(field.data)
+            form.parsed_standings = form.parse_aetherhub_dump(parse_standings)
         except ParseStandingException as e:
             raise ValidationError(str(e)) from e
@@ -0,0 +1,251 @@
+"""
+Versioned JSON API, for tools that want the parsed dumps without the HTML
+
+Every endpoint takes the raw dump, either as the (text) body of the request,
+or as JSON: `{"dump": "..."}`, or `{"dumps": ["...", "..."]}` to handle
+several dumps in one call. Rows are returned as compact arrays, whose columns
+are listed once in the response.
+"""
+from flask import Blueprint, request
+from werkzeug.exceptions import BadRequest
+
+from taw.cache import parse_with_cache
+from taw.exceptions import ParsePairingException, ParseStandingException
+from taw.utils import (
+    NB_SLIPS_PER_PAGE,
+    get_pairings_by_name,
+    parse_pairings,
+    parse_round_results,
+    parse_standings,
+    sort_pairings_for_paper_cutter,
+)
+
+
+api_v1 = Blueprint("api_v1", __name__, url_prefix="/api/v1")
+
+# Each dump is parsed and serialized in the same request: don't let a single
+# call take the whole function
+MAX_BATCH_SIZE = 20
+
+PAIRINGS_COLUMNS = [
+    "table_number",
+    "player_1",
+    "player_1_points",
+    "player_2",
+    "player_2_points",
+]
+RESULTS_COLUMNS = ["table_number", "player_1_wins", "player_2_wins", "draws"]
+STANDINGS_COLUMNS = [
+    "position",
+    "player_name",
+    "nb_points",
+    "record",
+    "omw",
+    "gw",
+    "ogw",
+]
+
+
+@api_v1.errorhandler(BadRequest)
+def bad_request(error):
+    return {"error": error.description}, 400
+
+
+@api_v1.route("/pairings", methods=["POST"])
+def pairings():
+    """Tables ordered by table number, the bye has no opponent"""
+    return _parse_dumps(
+        parse_pairings,
+        _get_pairings_rows,
+        columns=PAIRINGS_COLUMNS,
+        exception_class=ParsePairingException,
+    )
+
+
+@api_v1.route("/pairings/by_name", methods=["POST"])
+def pairings_by_name():
+    """Each table once per player, ordered by player name, like the pairings page"""
+    return _parse_dumps(
+        parse_pairings,
+        _get_pairings_by_name_rows,
+        columns=PAIRINGS_COLUMNS,
+        exception_class=ParsePairingException,
+    )
+
+
+@api_v1.route("/match_slips", methods=["POST"])
+def match_slips():
+    """Tables in print order, `null` for empty slips, see `sort_pairings_for_paper_cutter`"""
+    return _parse_dumps(
+        parse_pairings,
+        _get_match_slips_rows,
+        columns=PAIRINGS_COLUMNS,
+        exception_class=ParsePairingException,
+    )
+
+
+@api_v1.route("/results", methods=["POST"])
+def round_results():
+    """Games won by each player and drawn, `null` for the tables still playing"""
+    return _parse_dumps(
+        parse_round_results,
+        _get_results_rows,
+        columns=RESULTS_COLUMNS,
+        exception_class=ParsePairingException,
+    )
+
+
+@api_v1.route("/outstanding_tables", methods=["POST"])
+def outstanding_tables():
+    """Tables which are still playing, ordered by table number"""
+    return _parse_dumps(
+        parse_round_results,
+        _get_outstanding_tables_rows,
+        columns=PAIRINGS_COLUMNS,
+        exception_class=ParsePairingException,
+    )
+
+
+@api_v1.route("/standings", methods=["POST"])
+def standings():
+    return _parse_dumps(
+        parse_standings,
+        _get_standings_rows,
+        columns=STANDINGS_COLUMNS,
+        exception_class=ParseStandingException,
+    )
+
+
+def _parse_dumps(parse, get_rows, *, columns, exception_class):
+    dumps, is_batch = _get_dumps()
+    first_table_number = _get_first_table_number()
+
+    results = []
+    for dump in dumps:
+        try:
+            parsed = parse_with_cache(parse, dump)
+        except exception_class as e:
+            results.append({"error": str(e)})
+        else:
+            results.append(
+                {"rows": get_rows(parsed, first_table_number=first_table_number)}
+            )
+
+    if is_batch:
+        # One invalid dump doesn't prevent us from returning the others
+        return {"columns": columns, "results": results}
+
+    (result,) = results
+    if "error" in result:
+        return result, 400
+
+    return {"columns": columns, **result}
+
+
+def _get_dumps():
+    """Return the dumps of the request, and whether it is a batch"""
+    if not request.is_json:
+        dump = request.get_data(as_text=True)
+        if not dump.strip():
+            raise BadRequest("The dump is empty")
+        return [dump], False
+
+    body = request.get_json()
+    if not isinstance(body, dict):
+        raise BadRequest('Expected an object with a "dump" or "dumps" key')
+
+    if "dumps" in body:
+        dumps = body["dumps"]
+        if not isinstance(dumps, list) or not all(
+            isinstance(dump, str) for dump in dumps
+        ):
+            raise BadRequest('"dumps" must be a list of strings')
+        if len(dumps) > MAX_BATCH_SIZE:
+            raise BadRequest(f"Too many dumps (maximum is {MAX_BATCH_SIZE})")
+        return dumps, True
+
+    dump = body.get("dump")
+    if not isinstance(dump, str) or not dump.strip():
+        raise BadRequest('Expected an object with a "dump" or "dumps" key')
+    return [dump], False
+
+
+def _get_first_table_number():
+    first_table_number = request.args.get("first_table_number")
+    if first_table_number is None and request.is_json:
+        first_table_number = request.get_json().get("first_table_number")
+
+    if first_table_number is None:
+        return None
+
+    try:
+        first_table_number = int(first_table_number)
+    except (TypeError, ValueError):
+        first_table_number = 0
+    if first_table_number < 1:
+        raise BadRequest("The first table number must be a positive integer")
+
+    return first_table_number
+
+
+def _serialize_table(table):
+    if table.player_2.is_bye:
+        return [table.number, table.player_1.name, table.player_1.points, None, None]
+
+    return [
+        table.number,
+        table.player_1.name,
+        table.player_1.points,
+        table.player_2.name,
+        table.player_2.points,
+    ]
+
+
+def _get_pairings_rows(pairings, *, first_table_number):
+    table_number_offset = (first_table_number or 1) - 1
+    return [
+        _serialize_table(table._replace(number=table.number + table_number_offset))
+        for table in pairings
+    ]
+
+
+def _get_pairings_by_name_rows(pairings, *, first_table_number):
+    return [
+        _serialize_table(table)
+        for table in get_pairings_by_name(
+            pairings, first_table_number=first_table_number
+        )
+        # The bye is not a player
+        if not table.player_1.is_bye
+    ]
+
+
+def _get_match_slips_rows(pairings, *, first_table_number):
+    # No match slip for the bye
+    pairings = [pairing for pairing in pairings if not pairing.player_2.is_bye]
+    return [
+        _serialize_table(pairing) if pairing is not None else None
+        for pairing in sort_pairings_for_paper_cutter(
+            pairings,
+            nb_slips_per_page=NB_SLIPS_PER_PAGE,
+            first_table_number=first_table_number,
+        )
+    ]
+
+
+def _get_results_rows(results, *, first_table_number):
+    table_number_offset = (first_table_number or 1) - 1
+    return [
+        [table.number + table_number_offset, *(results.get_result(idx) or [None] * 3)]
+        for idx, table in enumerate(results.pairings)
+    ]
+
+
+def _get_outstanding_tables_rows(results, *, first_table_number):
+    return _get_pairings_rows(
+        results.get_outstanding_tables(), first_table_number=first_table_number
+    )
+
+
+def _get_standings_rows(standings, *, first_table_number):
+    return [list(standing) for standing in standings]
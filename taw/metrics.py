@@ -0,0 +1,197 @@
+"""
+In-process metrics, exposed in the Prometheus text format
+
+The observations of a request are buffered, and only added to the registry
+once the response was sent: a single lock acquisition per request, outside
+of the time the user waits for
+"""
+import threading
+from bisect import bisect_left
+from collections import defaultdict
+
+from flask import g, has_app_context
+
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+# 1kB to 64MB
+BYTES_BUCKETS = tuple(1024 * 4**exponent for exponent in range(9))
+COUNT_BUCKETS = (10, 100, 1_000, 10_000, 100_000)
+
+
+class Counter:
+    type = "counter"
+
+    def __init__(self, name, documentation, *, labelnames):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        # Label values -> value
+        self._values = defaultdict(float)
+
+    def _record(self, label_values, value):
+        self._values[label_values] += value
+
+    def _iter_samples(self):
+        for label_values, value in self._values.items():
+            yield self.name, dict(zip(self.labelnames, label_values)), value
+
+
+class Histogram:
+    type = "histogram"
+
+    def __init__(self, name, documentation, *, labelnames, buckets):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = labelnames
+        self.buckets = buckets
+        # Label values -> number of observations in each bucket (not cumulated,
+        # the last one is `+Inf`), then their sum
+        self._values = {}
+
+    def _record(self, label_values, value):
+        values = self._values.get(label_values)
+        if values is None:
+            values = self._values[label_values] = [0] * (len(self.buckets) + 2)
+
+        values[bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+    def _iter_samples(self):
+        for label_values, values in self._values.items():
+            labels = dict(zip(self.labelnames, label_values))
+            cumulated_count = 0
+            for bucket, count in zip(self.buckets + ("+Inf",), values):
+                cumulated_count += count
+                yield f"{self.name}_bucket", {**labels, "le": bucket}, cumulated_count
+            yield f"{self.name}_sum", labels, values[-1]
+            yield f"{self.name}_count", labels, cumulated_count
+
+
+class Registry:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = []
+
+    def counter(self, name, documentation, *, labelnames=()):
+        return self._register(Counter(name, documentation, labelnames=labelnames))
+
+    def histogram(self, name, documentation, *, labelnames=(), buckets):
+        return self._register(
+            Histogram(name, documentation, labelnames=labelnames, buckets=buckets)
+        )
+
+    def _register(self, metric):
+        self._metrics.append(metric)
+        return metric
+
+    def record(self, observations):
+        """Add `(metric, label_values, value)` observations to the metrics"""
+        with self._lock:
+            for metric, label_values, value in observations:
+                metric._record(label_values, value)
+
+    def expose(self):
+        with self._lock:
+            return "".join(
+                format_metric(
+                    metric.name,
+                    metric.type,
+                    metric.documentation,
+                    metric._iter_samples(),
+                )
+                for metric in self._metrics
+            )
+
+
+def format_metric(name, type_, documentation, samples):
+    """Return the metric in the Prometheus text format"""
+    lines = [f"# HELP {name} {documentation}", f"# TYPE {name} {type_}"]
+    for sample_name, labels, value in samples:
+        if labels:
+            labels_str = ",".join(
+                f'{label}="{_escape_label_value(label_value)}"'
+                for label, label_value in labels.items()
+            )
+            sample_name = f"{sample_name}{{{labels_str}}}"
+        lines.append(f"{sample_name} {_format_value(value)}")
+
+    return "\n".join(lines) + "\n"
+
+
+def _escape_label_value(value):
+    return str(value).replace("\\", r"\\").replace('"', r"\"").replace("\n", r"\n")
+
+
+def _format_value(value):
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def observe(metric, value, *label_values):
+    """
+    Record an observation of the current request, see `pop_observations`
+    Outside of any request, it is recorded right away
+    """
+    observation = (metric, label_values, value)
+    if has_app_context():
+        g.setdefault("metrics_observations", []).append(observation)
+    else:
+        registry.record([observation])
+
+
+def pop_observations():
+    """Return the observations of the current request, so far"""
+    return g.pop("metrics_observations", [])
+
+
+registry = Registry()
+
+requests_total = registry.counter(
+    "taw_requests_total",
+    "Number of requests",
+    labelnames=("action", "status"),
+)
+request_duration_seconds = registry.histogram(
+    "taw_request_duration_seconds",
+    "Time to respond, streamed responses are only timed until they start",
+    labelnames=("action",),
+    buckets=LATENCY_BUCKETS,
+)
+dump_bytes = registry.histogram(
+    "taw_dump_bytes",
+    "Size of the dumps from AetherHub",
+    labelnames=("kind",),
+    buckets=BYTES_BUCKETS,
+)
+dump_lines = registry.histogram(
+    "taw_dump_lines",
+    "Number of lines of the dumps from AetherHub",
+    labelnames=("kind",),
+    buckets=COUNT_BUCKETS,
+)
+parsed_rows = registry.histogram(
+    "taw_parsed_rows",
+    "Number of tables / standings parsed from the dumps",
+    labelnames=("kind",),
+    buckets=COUNT_BUCKETS,
+)
+response_bytes = registry.histogram(
+    "taw_response_bytes",
+    "Size of the rendered pages / PDFs, as sent (ie. compressed)",
+    labelnames=("action",),
+    buckets=BYTES_BUCKETS,
+)
+uncompressed_bytes = registry.counter(
+    "taw_uncompressed_bytes_total",
+    "Size of the compressed responses, before compression",
+    labelnames=("action", "encoding"),
+)
+compression_saved_bytes = registry.counter(
+    "taw_compression_saved_bytes_total",
+    "Bytes saved by compressing the responses",
+    labelnames=("action", "encoding"),
+)
+upload_bytes = registry.histogram(
+    "taw_upload_bytes",
+    "Size of the uploaded logos",
+    buckets=BYTES_BUCKETS,
+)
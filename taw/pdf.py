@@ -0,0 +1,672 @@
+"""
+Minimal PDF output for match slips, pairings and standings
+
+Pages are drawn one after the other and sent as soon as they are ready, so
+memory does not depend on the number of tables. Text is drawn with DejaVu Sans,
+which covers most scripts: the fonts are embedded at the end of the document,
+with only the glyphs used by its pages (see `taw.truetype`). Characters it
+doesn't have (eg. CJK) fall back on the CJK fonts PDF viewers provide.
+"""
+import itertools
+import os
+import zlib
+from collections import namedtuple
+from functools import lru_cache
+
+from taw.truetype import TrueTypeFont, get_subset_tag
+
+
+# A4, in points
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+MARGIN = 36
+
+NB_TABLE_ROWS_PER_PAGE = 48
+TABLE_ROW_HEIGHT = 14
+
+POWERED_BY = "Powered by TAW https://github.com/pmourlanne/taw/"
+
+FONTS_FOLDER = os.path.join(os.path.dirname(__file__), "fonts")
+REGULAR_FONT_PATH = os.path.join(FONTS_FOLDER, "DejaVuSans.ttf")
+BOLD_FONT_PATH = os.path.join(FONTS_FOLDER, "DejaVuSans-Bold.ttf")
+
+# Fonts that PDF viewers provide, see the PDF reference, 5.6 "Composite
+# Fonts": text is written in UTF-16, and mapped to their glyphs by the viewer
+CJKFont = namedtuple(
+    "CJKFont", ["name", "ordering", "supplement", "encoding", "bbox", "ascent"]
+)
+SIMPLIFIED_CHINESE_FONT = CJKFont(
+    "STSong-Light", "GB1", 2, "UniGB-UTF16-H", (-25, -254, 1000, 880), 880
+)
+# Hangul is not in the Chinese fonts
+KOREAN_FONT = CJKFont(
+    "HYSMyeongJo-Medium", "Korea1", 1, "UniKS-UTF16-H", (0, -148, 1001, 880), 880
+)
+HANGUL_RANGES = [(0x1100, 0x11FF), (0x3130, 0x318F), (0xAC00, 0xD7AF)]
+
+
+class _PDFDocument:
+    """
+    Write PDF objects as soon as they are ready, only keeping track of
+    their offsets for the cross-reference table written at the end
+    """
+
+    def __init__(self):
+        self._position = 0
+        self._offsets = {}
+        self._nb_objects = 0
+
+    def reserve_object(self):
+        self._nb_objects += 1
+        return self._nb_objects
+
+    def header(self):
+        # The binary comment tells tools the file is not plain text
+        return self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+
+    def object(self, number, content):
+        self._offsets[number] = self._position
+        return self._write(b"%d 0 obj\n%s\nendobj\n" % (number, content))
+
+    def stream_object(self, number, data):
+        data = zlib.compress(data)
+        return self.object(
+            number,
+            b"<< /Length %d /Filter /FlateDecode >>\nstream\n%s\nendstream"
+            % (len(data), data),
+        )
+
+    def jpeg_object(self, number, jpeg, *, width, height):
+        # JPEGs can be embedded as they are
+        return self.object(
+            number,
+            b"<< /Type /XObject /Subtype /Image /Width %d /Height %d "
+            b"/ColorSpace /DeviceRGB /BitsPerComponent 8 /Filter /DCTDecode "
+            b"/Length %d >>\nstream\n%s\nendstream" % (width, height, len(jpeg), jpeg),
+        )
+
+    def trailer(self, *, root):
+        xref_position = self._position
+        xref = [b"xref\n0 %d\n" % (self._nb_objects + 1), b"0000000000 65535 f \n"]
+        for number in range(1, self._nb_objects + 1):
+            xref.append(b"%010d 00000 n \n" % self._offsets[number])
+        xref.append(
+            b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n"
+            % (self._nb_objects + 1, root, xref_position)
+        )
+        return self._write(b"".join(xref))
+
+    def _write(self, data):
+        self._position += len(data)
+        return data
+
+
+@lru_cache(maxsize=None)
+def _load_font(path):
+    with open(path, "rb") as f:
+        return TrueTypeFont(f.read())
+
+
+class _Fonts:
+    """
+    The fonts of a document, and the glyphs used by its pages. Each font gets
+    its resource name (`F1`, `F2`, ...) the first time it's used
+    """
+
+    def __init__(self, document):
+        self._document = document
+        self._embedded_fonts = {
+            False: _EmbeddedFont(_load_font(REGULAR_FONT_PATH)),
+            True: _EmbeddedFont(_load_font(BOLD_FONT_PATH)),
+        }
+        self._cjk_fonts = {
+            cjk_font: _CJKFont(cjk_font)
+            for cjk_font in [SIMPLIFIED_CHINESE_FONT, KOREAN_FONT]
+        }
+        # Font objects, by resource name
+        self._used_fonts = {}
+        # The same texts come back on every page, eg. "Sign"
+        self._shown_texts = {}
+
+    def show_text(self, text, *, size, bold):
+        """The operations that show `text`, in as many fonts as needed"""
+        key = (text, size, bold)
+        if (operations := self._shown_texts.get(key)) is None:
+            operations = b" ".join(
+                b"/%s %d Tf %s Tj" % (self._use(font), size, font.encode(chars))
+                for font, chars in itertools.groupby(
+                    text, key=lambda char: self._get_font(char, bold=bold)
+                )
+            )
+            self._shown_texts[key] = operations
+
+        return operations
+
+    def iter_objects(self):
+        """Write the fonts used by the pages, once they were all written"""
+        for font in self._used_fonts.values():
+            yield from font.iter_objects(self._document)
+
+    def get_resources(self):
+        return b"/Font << %s >>" % b" ".join(
+            b"/%s %d 0 R" % (name, font.number)
+            for name, font in self._used_fonts.items()
+        )
+
+    def _get_font(self, char, *, bold):
+        embedded_font = self._embedded_fonts[bold]
+        if embedded_font.has_char(char):
+            return embedded_font
+
+        code_point = ord(char)
+        if any(start <= code_point <= end for start, end in HANGUL_RANGES):
+            return self._cjk_fonts[KOREAN_FONT]
+        return self._cjk_fonts[SIMPLIFIED_CHINESE_FONT]
+
+    def _use(self, font):
+        if font.number is None:
+            font.number = self._document.reserve_object()
+            font.resource_name = b"F%d" % (len(self._used_fonts) + 1)
+            self._used_fonts[font.resource_name] = font
+        return font.resource_name
+
+
+class _EmbeddedFont:
+    """A TrueType font, embedded with only the glyphs used by the document"""
+
+    def __init__(self, truetype_font):
+        self._truetype_font = truetype_font
+        self.number = None
+        self.resource_name = None
+        # The (first) character of each glyph used, for text extraction
+        self._chars = {}
+
+    def has_char(self, char):
+        return self._truetype_font.get_glyph_id(char) != 0
+
+    def encode(self, chars):
+        # Glyph ids, see `/Identity-H`
+        glyph_ids = []
+        for char in chars:
+            glyph_id = self._truetype_font.get_glyph_id(char)
+            self._chars.setdefault(glyph_id, char)
+            glyph_ids.append(b"%04X" % glyph_id)
+        return b"<%s>" % b"".join(glyph_ids)
+
+    def iter_objects(self, document):
+        font = self._truetype_font
+        glyph_ids = sorted(self._chars)
+        name = f"{get_subset_tag(glyph_ids)}+{font.postscript_name}".encode()
+        cid_font = document.reserve_object()
+        descriptor = document.reserve_object()
+        font_file = document.reserve_object()
+        to_unicode = document.reserve_object()
+
+        yield document.object(
+            self.number,
+            b"<< /Type /Font /Subtype /Type0 /BaseFont /%s /Encoding /Identity-H "
+            b"/DescendantFonts [%d 0 R] /ToUnicode %d 0 R >>"
+            % (name, cid_font, to_unicode),
+        )
+        widths = b" ".join(
+            b"%d [%d]" % (glyph_id, font.get_width(glyph_id)) for glyph_id in glyph_ids
+        )
+        yield document.object(
+            cid_font,
+            b"<< /Type /Font /Subtype /CIDFontType2 /BaseFont /%s "
+            b"/CIDSystemInfo << /Registry (Adobe) /Ordering (Identity) "
+            b"/Supplement 0 >> /FontDescriptor %d 0 R /CIDToGIDMap /Identity "
+            b"/W [%s] >>" % (name, descriptor, widths),
+        )
+        yield document.object(
+            descriptor,
+            _get_font_descriptor(
+                name, bbox=font.bbox, ascent=font.ascent, descent=font.descent
+            )
+            + b" /FontFile2 %d 0 R >>" % font_file,
+        )
+        yield document.stream_object(font_file, font.subset(glyph_ids))
+        yield document.stream_object(
+            to_unicode,
+            _get_to_unicode_cmap(
+                (b"<%04X>" % glyph_id, char) for glyph_id, char in self._chars.items()
+            ),
+        )
+
+
+class _CJKFont:
+    """A CJK font provided by PDF viewers, see `CJKFont`"""
+
+    def __init__(self, cjk_font):
+        self._cjk_font = cjk_font
+        self.number = None
+        self.resource_name = None
+        self._chars = set()
+
+    def encode(self, chars):
+        chars = "".join(chars)
+        self._chars.update(chars)
+        return b"<%s>" % chars.encode("utf-16-be").hex().upper().encode()
+
+    def iter_objects(self, document):
+        cjk_font = self._cjk_font
+        name = cjk_font.name.encode()
+        cid_font = document.reserve_object()
+        descriptor = document.reserve_object()
+        to_unicode = document.reserve_object()
+
+        yield document.object(
+            self.number,
+            b"<< /Type /Font /Subtype /Type0 /BaseFont /%s-%s /Encoding /%s "
+            b"/DescendantFonts [%d 0 R] /ToUnicode %d 0 R >>"
+            % (
+                name,
+                cjk_font.encoding.encode(),
+                cjk_font.encoding.encode(),
+                cid_font,
+                to_unicode,
+            ),
+        )
+        yield document.object(
+            cid_font,
+            b"<< /Type /Font /Subtype /CIDFontType0 /BaseFont /%s "
+            b"/CIDSystemInfo << /Registry (Adobe) /Ordering (%s) /Supplement %d >> "
+            b"/FontDescriptor %d 0 R /DW 1000 >>"
+            % (name, cjk_font.ordering.encode(), cjk_font.supplement, descriptor),
+        )
+        yield document.object(
+            descriptor,
+            _get_font_descriptor(
+                name,
+                bbox=cjk_font.bbox,
+                ascent=cjk_font.ascent,
+                descent=cjk_font.bbox[1],
+            )
+            + b" >>",
+        )
+        yield document.stream_object(
+            to_unicode,
+            _get_to_unicode_cmap(
+                (b"<%s>" % char.encode("utf-16-be").hex().upper().encode(), char)
+                for char in sorted(self._chars)
+            ),
+        )
+
+
+def _get_font_descriptor(name, *, bbox, ascent, descent):
+    """The font descriptor, without its closing `>>`"""
+    # Flags: symbolic (the font has glyphs outside of the standard Latin set)
+    return b"<< /Type /FontDescriptor /FontName /%s /Flags 4 /FontBBox [%s] " % (
+        name,
+        b" ".join(b"%d" % value for value in bbox),
+    ) + b"/ItalicAngle 0 /Ascent %d /Descent %d /CapHeight %d /StemV 80" % (
+        ascent,
+        descent,
+        ascent,
+    )
+
+
+def _get_to_unicode_cmap(codes):
+    """
+    Map the codes written in the content streams back to their characters,
+    so that the text of the document can be copied, searched and extracted
+    `codes` are `(hex code, char)` tuples
+    """
+    codes = list(codes)
+    lines = [
+        b"/CIDInit /ProcSet findresource begin 12 dict begin begincmap",
+        b"/CIDSystemInfo << /Registry (Adobe) /Ordering (UCS) /Supplement 0 >> def",
+        b"/CMapName /Adobe-Identity-UCS def /CMapType 2 def",
+        b"1 begincodespacerange <0000> <FFFF> endcodespacerange",
+    ]
+    # At most 100 entries per block
+    for start in range(0, len(codes), 100):
+        block = codes[start : start + 100]
+        lines.append(b"%d beginbfchar" % len(block))
+        lines.extend(
+            b"%s <%s>" % (code, char.encode("utf-16-be").hex().upper().encode())
+            for code, char in block
+        )
+        lines.append(b"endbfchar")
+    lines.append(b"endcmap CMapName currentdict /CMap defineresource pop end end")
+    return b"\n".join(lines)
+
+
+_Text = namedtuple("_Text", ["x", "y", "text", "size", "bold"])
+
+
+class _Page:
+    """Drawing operations for a single page, origin at the bottom left"""
+
+    def __init__(self):
+        self._operations = []
+
+    def text(self, x, y, text, *, size=10, bold=False):
+        # Encoded with the fonts of the document, see `content`
+        self._operations.append(_Text(x, y, str(text), size, bold))
+
+    def line(self, x1, y1, x2, y2, *, width=1, dotted=False):
+        dash = b"[1 3] 0 d" if dotted else b"[] 0 d"
+        self._operations.append(
+            b"%s %.2f w %.2f %.2f m %.2f %.2f l S" % (dash, width, x1, y1, x2, y2)
+        )
+
+    def circle(self, x, y, radius, *, width=1):
+        # Four Bézier curves, see https://spencermortensen.com/articles/bezier-circle/
+        k = radius * 0.5523
+        # Counterclockwise, starting on the right
+        curves = [
+            (x + radius, y + k, x + k, y + radius, x, y + radius),
+            (x - k, y + radius, x - radius, y + k, x - radius, y),
+            (x - radius, y - k, x - k, y - radius, x, y - radius),
+            (x + k, y - radius, x + radius, y - k, x + radius, y),
+        ]
+        operations = [b"[] 0 d %.2f w %.2f %.2f m" % (width, x + radius, y)]
+        operations += [b"%.2f %.2f %.2f %.2f %.2f %.2f c" % curve for curve in curves]
+        operations.append(b"S")
+        self._operations.append(b" ".join(operations))
+
+    def image(self, name, x, y, width, height):
+        self._operations.append(
+            b"q %.2f 0 0 %.2f %.2f %.2f cm /%s Do Q" % (width, height, x, y, name)
+        )
+
+    def logo(self, logo, x, y, *, max_width, max_height):
+        """Draw the logo in the given box, bottom-left aligned"""
+        scale = min(max_width / logo.width, max_height / logo.height)
+        self.image(b"Logo", x, y, logo.width * scale, logo.height * scale)
+
+    def content(self, fonts):
+        return b"\n".join(
+            b"BT %.2f %.2f Td %s ET"
+            % (
+                operation.x,
+                operation.y,
+                fonts.show_text(
+                    operation.text, size=operation.size, bold=operation.bold
+                ),
+            )
+            if isinstance(operation, _Text)
+            else operation
+            for operation in self._operations
+        )
+
+
+def _iter_pdf(pages, *, logo=None):
+    """
+    Write the PDF for the given `_Page`s, as an iterator of bytes
+    The logo (see `taw.uploads.EmbeddedLogo`) is embedded once, and can then
+    be drawn on any page
+    """
+    document = _PDFDocument()
+    catalog = document.reserve_object()
+    pages_tree = document.reserve_object()
+    # Written last, once the pages tell which fonts and glyphs are used
+    resources = document.reserve_object()
+    fonts = _Fonts(document)
+
+    yield document.header()
+
+    xobjects = b""
+    if logo is not None:
+        image = document.reserve_object()
+        yield document.jpeg_object(
+            image, logo.jpeg, width=logo.width, height=logo.height
+        )
+        xobjects = b" /XObject << /Logo %d 0 R >>" % image
+
+    page_numbers = []
+    for page in pages:
+        content = document.reserve_object()
+        yield document.stream_object(content, page.content(fonts))
+
+        page_number = document.reserve_object()
+        page_numbers.append(page_number)
+        yield document.object(
+            page_number,
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] "
+            b"/Resources %d 0 R /Contents %d 0 R >>"
+            % (pages_tree, PAGE_WIDTH, PAGE_HEIGHT, resources, content),
+        )
+
+    yield from fonts.iter_objects()
+    yield document.object(resources, b"<< %s%s >>" % (fonts.get_resources(), xobjects))
+
+    kids = b" ".join(b"%d 0 R" % page_number for page_number in page_numbers)
+    yield document.object(
+        pages_tree,
+        b"<< /Type /Pages /Kids [%s] /Count %d >>" % (kids, len(page_numbers)),
+    )
+    yield document.object(catalog, b"<< /Type /Catalog /Pages %d 0 R >>" % pages_tree)
+    yield document.trailer(root=catalog)
+
+
+def iter_match_slips_pdf(
+    rows, *, tournament_name, round_number, nb_slips_per_page, logo=None
+):
+    """
+    PDF version of `match_slips.html`, `rows` are expected in the order
+    given by `sort_pairings_for_paper_cutter`
+    """
+    return _iter_pdf(
+        _iter_match_slips_pages(
+            rows,
+            tournament_name=tournament_name,
+            round_number=round_number,
+            nb_slips_per_page=nb_slips_per_page,
+            logo=logo,
+        ),
+        logo=logo,
+    )
+
+
+def _iter_match_slips_pages(
+    rows, *, tournament_name, round_number, nb_slips_per_page, logo
+):
+    slip_height = (PAGE_HEIGHT - 2 * MARGIN) / nb_slips_per_page
+
+    page = None
+    for row_idx, row in enumerate(rows):
+        slip_idx = row_idx % nb_slips_per_page
+        if slip_idx == 0:
+            if page is not None:
+                yield page
+            page = _Page()
+
+        top = PAGE_HEIGHT - MARGIN - slip_idx * slip_height
+        page.line(MARGIN, top, PAGE_WIDTH - MARGIN, top, width=1.5, dotted=True)
+        # We want a separator at the bottom of the page too
+        bottom = top - slip_height
+        page.line(MARGIN, bottom, PAGE_WIDTH - MARGIN, bottom, width=1.5, dotted=True)
+
+        # Empty slips are only there to fill the page
+        if row["table_number"] == "":
+            continue
+
+        _draw_match_slip(
+            page,
+            row,
+            top=top,
+            tournament_name=tournament_name,
+            round_number=round_number,
+        )
+        if logo is not None:
+            page.logo(logo, MARGIN + 110, top - 44, max_width=80, max_height=36)
+
+    if page is None:
+        # No slips to print (eg. only a bye), but a PDF needs at least a page
+        page = _Page()
+        page.text(MARGIN, PAGE_HEIGHT - MARGIN - 22, POWERED_BY, size=8)
+
+    yield page
+
+
+def _draw_match_slip(page, row, *, top, tournament_name, round_number):
+    left = MARGIN + 4
+    sign_left = MARGIN + 230
+    wins_left = MARGIN + 370
+    draws_left = MARGIN + 410
+    drop_left = MARGIN + 470
+
+    page.text(left, top - 22, f"Table #{row['table_number']}", size=12, bold=True)
+    page.text(MARGIN + 200, top - 22, f"Round #{round_number} - {tournament_name}"[:60])
+
+    page.text(sign_left, top - 44, "Sign", size=9)
+    page.text(wins_left, top - 44, "Wins", size=9)
+    page.text(draws_left, top - 44, "Draws", size=9)
+    page.text(drop_left, top - 44, "Drop", size=9)
+
+    for player_idx, baseline in [(1, top - 72), (2, top - 122)]:
+        name = row[f"player_{player_idx}"][:40]
+        points = row[f"player_{player_idx}_points"]
+        page.text(left, baseline, f"{name} ({points} pts)", size=10)
+
+        page.line(sign_left, baseline - 2, sign_left + 110, baseline - 2, width=2)
+        page.text(
+            sign_left + 75,
+            baseline - 12,
+            f"PLAYER {player_idx}",
+            size=7,
+            bold=True,
+        )
+        page.line(wins_left, baseline - 2, wins_left + 30, baseline - 2, width=2)
+        page.circle(drop_left + 10, baseline + 3, 8, width=2)
+
+    page.line(draws_left, top - 98, draws_left + 30, top - 98, width=2)
+
+
+PAIRINGS_COLUMNS = [
+    ("Table", "table_number", MARGIN),
+    ("Player 1", "player_1", MARGIN + 45),
+    ("Points", "player_1_points", MARGIN + 255),
+    ("Player 2", "player_2", MARGIN + 300),
+    ("Points", "player_2_points", MARGIN + 490),
+]
+
+STANDINGS_COLUMNS = [
+    ("Rank", "position", MARGIN),
+    ("Player", "player_name", MARGIN + 40),
+    ("Points", "nb_points", MARGIN + 250),
+    ("Record", "record", MARGIN + 295),
+    ("OMW%", "omw", MARGIN + 355),
+    ("GW%", "gw", MARGIN + 410),
+    ("OGW%", "ogw", MARGIN + 465),
+]
+
+
+def iter_pairings_pdf(rows, *, tournament_name, round_number, logo=None):
+    """PDF version of `pairings.html`"""
+    return _iter_pdf(
+        _iter_pairings_pages(
+            rows,
+            tournament_name=tournament_name,
+            round_number=round_number,
+            logo=logo,
+        ),
+        logo=logo,
+    )
+
+
+def iter_round_bundle_pdf(
+    pairings_rows,
+    match_slips_rows,
+    standings=None,
+    *,
+    tournament_name,
+    round_number,
+    nb_slips_per_page,
+    logo=None,
+):
+    """
+    Everything needed for a round in a single document: the pairings, the
+    match slips and optionally the standings
+    """
+    pages = itertools.chain(
+        _iter_pairings_pages(
+            pairings_rows,
+            tournament_name=tournament_name,
+            round_number=round_number,
+            logo=logo,
+        ),
+        _iter_match_slips_pages(
+            match_slips_rows,
+            tournament_name=tournament_name,
+            round_number=round_number,
+            nb_slips_per_page=nb_slips_per_page,
+            logo=logo,
+        ),
+    )
+    if standings is not None:
+        pages = itertools.chain(
+            pages,
+            _iter_standings_pages(
+                standings,
+                tournament_name=tournament_name,
+                round_number=round_number,
+                logo=logo,
+            ),
+        )
+
+    return _iter_pdf(pages, logo=logo)
+
+
+def _iter_pairings_pages(rows, *, tournament_name, round_number, logo):
+    return _iter_table_pages(
+        rows,
+        columns=PAIRINGS_COLUMNS,
+        tournament_name=tournament_name,
+        title=f"Pairings Round #{round_number}",
+        logo=logo,
+    )
+
+
+def _iter_standings_pages(standings, *, tournament_name, round_number, logo):
+    return _iter_table_pages(
+        (standing._asdict() for standing in standings),
+        columns=STANDINGS_COLUMNS,
+        tournament_name=tournament_name,
+        title=f"Standings Round #{round_number}",
+        logo=logo,
+    )
+
+
+def _iter_table_pages(rows, *, columns, tournament_name, title, logo):
+    """
+    `columns` are `(title, key in each row, left position)` tuples, the first
+    column is in bold
+    """
+    first_key = columns[0][1]
+
+    page = None
+    baseline = None
+    for row_idx, row in enumerate(rows):
+        if row_idx % NB_TABLE_ROWS_PER_PAGE == 0:
+            if page is not None:
+                yield page
+            page = _Page()
+
+            if logo is not None:
+                page.logo(logo, 250, PAGE_HEIGHT - 75, max_width=120, max_height=55)
+            page.text(
+                MARGIN, PAGE_HEIGHT - 50, tournament_name[:45], size=16, bold=True
+            )
+            page.text(MARGIN + 360, PAGE_HEIGHT - 50, title, size=16, bold=True)
+
+            baseline = PAGE_HEIGHT - 90
+            for column_title, _, left in columns:
+                page.text(left, baseline, column_title, bold=True)
+            page.line(MARGIN, baseline - 4, PAGE_WIDTH - MARGIN, baseline - 4)
+
+        baseline -= TABLE_ROW_HEIGHT
+        for _, key, left in columns:
+            value = row[key]
+            if isinstance(value, str):
+                value = value[:38]
+            page.text(left, baseline, value, bold=key == first_key)
+
+    if page is None:
+        page = _Page()
+        baseline = PAGE_HEIGHT - 90
+
+    page.text(MARGIN, baseline - 2 * TABLE_ROW_HEIGHT, POWERED_BY, size=8)
+    yield page
@@ -0,0 +1,92 @@
+"""
+Where does the time of a request go: each phase is timed and reported in the
+`Server-Timing` header, and a whole request can be profiled on demand
+"""
+import cProfile
+import marshal
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from flask import current_app, g, has_app_context, request
+from werkzeug.utils import secure_filename
+
+
+@contextmanager
+def timed(phase):
+    """
+    Time the block as `phase` of the current request. Phases may be nested
+    (eg. the rows are sorted while the page is rendered), and the time of a
+    phase which happens several times is summed
+    """
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        # eg. the benchmarks call the renderers outside of any request
+        if has_app_context():
+            timings = g.setdefault("server_timings", {})
+            timings[phase] = timings.get(phase, 0) + time.perf_counter() - start
+
+
+def start_request_timing():
+    g.request_start = time.perf_counter()
+
+
+def get_request_duration():
+    """Seconds since the start of the current request, None if unknown"""
+    if (request_start := g.get("request_start")) is None:
+        return None
+
+    return time.perf_counter() - request_start
+
+
+def get_server_timing_header():
+    """
+    Return the `Server-Timing` header of the current request, eg.
+    `validate;dur=12.3, parse;dur=10.1, total;dur=30.2`
+    Streamed responses are rendered after their headers are sent: only the
+    phases that happened before are reported
+    """
+    timings = dict(g.get("server_timings", {}))
+    if (request_duration := get_request_duration()) is not None:
+        timings["total"] = request_duration
+
+    return ", ".join(
+        f"{phase};dur={duration * 1000:.1f}" for phase, duration in timings.items()
+    )
+
+
+def profiled(view):
+    """
+    When the `PROFILING` config is set, `?profile=1` profiles the whole
+    request (rendering included) with cProfile, and returns the stats as a
+    file to be loaded with `pstats` or eg. snakeviz
+    """
+
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        if not (current_app.config["PROFILING"] and request.args.get("profile")):
+            return view(*args, **kwargs)
+
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            response = current_app.make_response(view(*args, **kwargs))
+            # Streamed responses are rendered while they're being sent
+            response.make_sequence()
+        finally:
+            profiler.disable()
+
+        profiler.create_stats()
+        # The action comes from the user, it must not break the header
+        name = secure_filename(str(request.form.get("action", request.endpoint)))
+        filename = f"taw-{name}.prof"
+        return current_app.response_class(
+            # The format of `cProfile.Profile.dump_stats`
+            marshal.dumps(profiler.stats),
+            mimetype="application/octet-stream",
+            headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+        )
+
+    return wrapper
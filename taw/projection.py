@@ -0,0 +1,275 @@
+"""
+Project the top cut of an event: play out the remaining Swiss rounds many
+times from the current standings, and count how often each player makes it
+
+Each simulated round pairs the players by points, in a random order within
+each score group (see `taw.swiss`), without checking for rematches. Ties at
+the end are broken by the current standings, as a rough proxy for the
+tiebreakers of the final standings
+
+Trials are simulated in chunks, all the trials of a chunk at once, with NumPy
+"""
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from taw.utils import RoundResults
+
+
+MATCH_WIN_POINTS = 3
+MATCH_DRAW_POINTS = 1
+# Share of the simulated matches that end in a draw
+DRAW_PROBABILITY = 0.05
+
+# Results are drawn as random bytes, looked up in the points earned by each
+# player for each byte: much cheaper than comparing random floats
+_NB_OUTCOMES = 256
+_nb_wins = round((1 - DRAW_PROBABILITY) / 2 * _NB_OUTCOMES)
+_PLAYER_1_POINTS = np.full(_NB_OUTCOMES, MATCH_DRAW_POINTS, dtype=np.uint16)
+_PLAYER_1_POINTS[:_nb_wins] = MATCH_WIN_POINTS
+_PLAYER_1_POINTS[-_nb_wins:] = 0
+_PLAYER_2_POINTS = _PLAYER_1_POINTS[::-1].copy()
+
+# Bounds the memory used by a chunk: its arrays have one entry per player and
+# per trial
+MAX_CHUNK_SIZE = 4_000_000
+
+# Bounds the time of a projection, about 4s on a single process: the number of
+# results simulated, ie. trials × players × rounds
+MAX_SIMULATED_RESULTS = 100_000_000
+DEFAULT_NB_TRIALS = 100_000
+
+# Points and a random tie-breaker are packed together in 16 bits, to sort
+# them with NumPy's radix sort
+_JITTER_BITS = 8
+MAX_POINTS = 2 ** (16 - _JITTER_BITS) - 1
+
+Projection = namedtuple(
+    "Projection",
+    ["nb_trials", "top_probabilities", "cutoff_probabilities", "points_probabilities"],
+)
+Projection.__doc__ = """
+`top_probabilities`: probability of each player to make the top cut, by name
+`cutoff_probabilities`: probability of each number of points to be the points
+of the last player of the top cut
+`points_probabilities`: probability of making the top cut with that number of
+points at the end of the Swiss rounds
+"""
+
+
+def project_top_cut(
+    standings,
+    *,
+    nb_rounds,
+    top=8,
+    round_results=None,
+    nb_trials=None,
+    nb_processes=None,
+    seed=None,
+):
+    """
+    Simulate the remaining `nb_rounds` rounds `nb_trials` times, and return
+    the `Projection` of the top `top` players
+    `nb_trials` is at most `get_max_nb_trials`, which is also the default when
+    it's lower than `DEFAULT_NB_TRIALS`
+    `standings` are the current standings, see `parse_standings`
+    `round_results` are the pairings of the round being played, if any, see
+    `parse_round_results`: the first simulated round uses these pairings and
+    the reported results, and counts as one of the `nb_rounds`
+    Chunks of trials are spread across `nb_processes` processes, if given
+    """
+    if not 0 < top <= len(standings):
+        raise ValueError(f"Cannot project a top {top} with {len(standings)} players")
+
+    max_nb_trials = get_max_nb_trials(len(standings), nb_rounds)
+    if nb_trials is None:
+        nb_trials = min(DEFAULT_NB_TRIALS, max_nb_trials)
+    elif nb_trials > max_nb_trials:
+        raise ValueError(
+            f"Cannot simulate more than {max_nb_trials} trials of {nb_rounds} "
+            f"rounds with {len(standings)} players"
+        )
+
+    player_names = [standing.player_name for standing in standings]
+    points = np.array([standing.nb_points for standing in standings], dtype=np.uint16)
+    if points.max() + MATCH_WIN_POINTS * nb_rounds > MAX_POINTS:
+        raise ValueError(f"Cannot project more than {MAX_POINTS} points")
+
+    current_round = None
+    if round_results is not None and nb_rounds:
+        current_round = _get_current_round(round_results, player_names)
+
+    # One seed per chunk: the same seed gives the same projection, whatever
+    # the number of processes
+    chunk_size = max(1, MAX_CHUNK_SIZE // len(standings))
+    chunk_nb_trials = [chunk_size] * (nb_trials // chunk_size)
+    if nb_trials % chunk_size:
+        chunk_nb_trials.append(nb_trials % chunk_size)
+    seeds = np.random.SeedSequence(seed).spawn(len(chunk_nb_trials))
+    chunks = [
+        (points, nb_rounds, top, current_round, chunk_trials, chunk_seed)
+        for chunk_trials, chunk_seed in zip(chunk_nb_trials, seeds)
+    ]
+
+    if nb_processes is None or len(chunks) == 1:
+        counts = list(map(_simulate_chunk, chunks))
+    else:
+        with ProcessPoolExecutor(max_workers=nb_processes) as pool:
+            counts = list(pool.map(_simulate_chunk, chunks))
+
+    nb_tops, nb_cutoffs, nb_tops_by_points, nb_players_by_points = (
+        np.sum(chunk_counts, axis=0) for chunk_counts in zip(*counts)
+    )
+
+    return Projection(
+        nb_trials=nb_trials,
+        top_probabilities=dict(zip(player_names, (nb_tops / nb_trials).tolist())),
+        cutoff_probabilities={
+            nb_points: nb_cutoff / nb_trials
+            for nb_points, nb_cutoff in enumerate(nb_cutoffs.tolist())
+            if nb_cutoff
+        },
+        points_probabilities={
+            nb_points: nb_tops_at_points / nb_players_at_points
+            for nb_points, (nb_tops_at_points, nb_players_at_points) in enumerate(
+                zip(nb_tops_by_points.tolist(), nb_players_by_points.tolist())
+            )
+            if nb_players_at_points
+        },
+    )
+
+
+def get_max_nb_trials(nb_players, nb_rounds):
+    """The number of trials that fits in `MAX_SIMULATED_RESULTS`"""
+    return max(1, MAX_SIMULATED_RESULTS // (nb_players * max(nb_rounds, 1)))
+
+
+# The matches of the round being played, as player indices, and the points
+# they earn with the reported results (`NO_RESULT` for the tables still playing)
+_CurrentRound = namedtuple(
+    "_CurrentRound",
+    [
+        "player_1_indices",
+        "player_2_indices",
+        "player_1_points",
+        "player_2_points",
+        "bye_indices",
+    ],
+)
+
+
+def _get_current_round(round_results, player_names):
+    player_indices = {name: idx for idx, name in enumerate(player_names)}
+
+    def get_player_idx(player):
+        try:
+            return player_indices[player.name]
+        except KeyError:
+            raise ValueError(f"{player.name} is not in the standings") from None
+
+    player_1_indices, player_2_indices = [], []
+    player_1_points, player_2_points = [], []
+    bye_indices = []
+    for idx, table in enumerate(round_results.pairings):
+        if table.player_2.is_bye:
+            bye_indices.append(get_player_idx(table.player_1))
+            continue
+
+        result = round_results.get_result(idx)
+        player_1_indices.append(get_player_idx(table.player_1))
+        player_2_indices.append(get_player_idx(table.player_2))
+        if result is None:
+            player_1_points.append(RoundResults.NO_RESULT)
+            player_2_points.append(RoundResults.NO_RESULT)
+        else:
+            player_1_wins, player_2_wins, draws = result
+            player_1_points.append(_get_match_points(*result))
+            player_2_points.append(
+                _get_match_points(player_2_wins, player_1_wins, draws)
+            )
+
+    return _CurrentRound(
+        player_1_indices=np.array(player_1_indices, dtype=np.intp),
+        player_2_indices=np.array(player_2_indices, dtype=np.intp),
+        player_1_points=np.array(player_1_points, dtype=np.int16),
+        player_2_points=np.array(player_2_points, dtype=np.int16),
+        bye_indices=np.array(bye_indices, dtype=np.intp),
+    )
+
+
+def _get_match_points(player_wins, opponent_wins, draws):
+    if player_wins > opponent_wins:
+        return MATCH_WIN_POINTS
+    if player_wins == opponent_wins:
+        return MATCH_DRAW_POINTS
+    return 0
+
+
+def _simulate_chunk(chunk):
+    """
+    Simulate a chunk of trials, and return the number of times each player
+    made the top cut, and by number of points: the number of times it was
+    the cutoff, of top cut players, and of players
+    """
+    initial_points, nb_rounds, top, current_round, nb_trials, seed = chunk
+    rng = np.random.default_rng(seed)
+    nb_players = len(initial_points)
+
+    # One row per trial. Players are scattered through the flattened array:
+    # that's several times faster than indexing rows and columns
+    points = np.tile(initial_points, (nb_trials, 1))
+    flat_points = points.reshape(-1)
+    row_offsets = np.arange(0, nb_trials * nb_players, nb_players)[:, np.newaxis]
+
+    for round_idx in range(nb_rounds):
+        is_current_round = round_idx == 0 and current_round is not None
+        if is_current_round:
+            # A bye is a win, see `BYE_RESULT`
+            points[:, current_round.bye_indices] += MATCH_WIN_POINTS
+            player_1_indices = row_offsets + current_round.player_1_indices
+            player_2_indices = row_offsets + current_round.player_2_indices
+        else:
+            # Highest points first, in a random order within each score group
+            jitter = rng.integers(
+                0, 2**_JITTER_BITS, size=points.shape, dtype=np.uint8
+            )
+            order = np.argsort(
+                ~((points << _JITTER_BITS) | jitter), axis=1, kind="stable"
+            )
+            order += row_offsets
+            if nb_players % 2:
+                # The bye goes to the last player
+                flat_points[order[:, -1]] += MATCH_WIN_POINTS
+                order = order[:, :-1]
+            player_1_indices, player_2_indices = order[:, 0::2], order[:, 1::2]
+
+        player_1_points, player_2_points = _play_matches(rng, player_1_indices.shape)
+        if is_current_round:
+            # Reported results are already known
+            reported = current_round.player_1_points != RoundResults.NO_RESULT
+            player_1_points[:, reported] = current_round.player_1_points[reported]
+            player_2_points[:, reported] = current_round.player_2_points[reported]
+
+        # A player plays at most once per round: there are no duplicate indices
+        flat_points[player_1_indices] += player_1_points
+        flat_points[player_2_indices] += player_2_points
+
+    # Highest points first, ties broken by the current standings
+    order = np.argsort(~points, axis=1, kind="stable")
+    top_players = order[:, :top]
+    top_points = flat_points[top_players + row_offsets]
+
+    nb_bins = MAX_POINTS + 1
+    return (
+        np.bincount(top_players.ravel(), minlength=nb_players),
+        np.bincount(top_points[:, -1], minlength=nb_bins),
+        np.bincount(top_points.ravel(), minlength=nb_bins),
+        np.bincount(flat_points, minlength=nb_bins),
+    )
+
+
+def _play_matches(rng, shape):
+    """Random results, as the points earned by each player of each match"""
+    outcomes = rng.integers(0, _NB_OUTCOMES, size=shape, dtype=np.uint8)
+    return _PLAYER_1_POINTS[outcomes], _PLAYER_2_POINTS[outcomes]
@@ -0,0 +1,324 @@
+"""
+Pair the next round of a Swiss tournament, without going through AetherHub
+
+Players are paired within their score group, in a random order. Players who
+can't be paired within their group (odd number of players, or only rematches
+left) are paired down with the next group. If some players still can't be
+paired, they are paired again along with the tables closest to their scores,
+with a maximum matching (see `_get_maximum_matching`): rematches are only
+allowed when there is no way to pair everyone without them
+"""
+import random
+from collections import deque
+from itertools import groupby
+from operator import attrgetter
+
+from taw.utils import BYE_STRING, Player, Table
+
+
+def get_previous_opponents(rounds):
+    """
+    Return the names of the players each player already played, from the
+    pairings of the previous rounds (see `parse_pairings`)
+    Players who had a bye have `BYE_STRING` among their opponents
+    """
+    previous_opponents = {}
+    for pairings in rounds:
+        for table in pairings:
+            player_1, player_2 = table.player_1.name, table.player_2.name
+            previous_opponents.setdefault(player_1, set()).add(player_2)
+            if not table.player_2.is_bye:
+                previous_opponents.setdefault(player_2, set()).add(player_1)
+
+    return previous_opponents
+
+
+def pair_round(players, *, previous_opponents=None, seed=None):
+    """
+    Pair the next round and return the pairings like `parse_pairings` does:
+    a list of `Table`s ordered by table number, the highest scores first
+    `players` are `Player`s, with their points before the round
+    `previous_opponents` maps names to the names of the players they already
+    played, see `get_previous_opponents`
+    With an odd number of players, the lowest ranked player who didn't get a
+    bye yet gets one, at the last table
+    """
+    previous_opponents = previous_opponents or {}
+    if len({player.name for player in players}) != len(players):
+        raise ValueError("Player names must be unique")
+
+    rng = random.Random(seed)
+    # Highest scores first, in a random order within each score group
+    players = sorted(players, key=lambda player: (-player.points, rng.random()))
+
+    bye_player = None
+    if len(players) % 2:
+        bye_player = _get_bye_player(players, previous_opponents)
+        players.remove(bye_player)
+
+    pairs = []
+    floaters = []
+    for _, group in groupby(players, key=attrgetter("points")):
+        first_pair_idx = len(pairs)
+        leftovers = _pair_bracket(floaters + list(group), previous_opponents, pairs)
+        floaters = _pair_leftovers(
+            leftovers, previous_opponents, pairs, first_pair_idx=first_pair_idx
+        )
+
+    # Nobody left to pair down with: look for swaps with any table, then pair
+    # the last players again with their closest tables. As a last resort,
+    # allow rematches
+    floaters = _pair_leftovers(floaters, previous_opponents, pairs, first_pair_idx=0)
+    if floaters:
+        floaters = _pair_floaters(floaters, previous_opponents, pairs)
+    pairs.extend(zip(floaters[::2], floaters[1::2]))
+
+    pairs = [sorted(pair, key=attrgetter("points"), reverse=True) for pair in pairs]
+    # Pair-downs and swaps moved pairs around, order them by scores again
+    pairs.sort(key=lambda pair: (-pair[0].points, -pair[1].points))
+    pairings = [
+        Table(number=number, player_1=player_1, player_2=player_2)
+        for number, (player_1, player_2) in enumerate(pairs, start=1)
+    ]
+
+    if bye_player is not None:
+        pairings.append(
+            Table(
+                number=len(pairings) + 1,
+                player_1=bye_player,
+                player_2=Player(name=BYE_STRING, points=0),
+            )
+        )
+
+    return pairings
+
+
+def _can_play(player_1, player_2, previous_opponents):
+    # Don't assume that `previous_opponents` is symmetric
+    if player_2.name in previous_opponents.get(player_1.name, ()):
+        return False
+    return player_1.name not in previous_opponents.get(player_2.name, ())
+
+
+def _get_bye_player(sorted_players, previous_opponents):
+    for player in reversed(sorted_players):
+        if BYE_STRING not in previous_opponents.get(player.name, ()):
+            return player
+
+    # Everyone had a bye already :shrug:
+    return sorted_players[-1]
+
+
+def _pair_bracket(bracket, previous_opponents, pairs):
+    """
+    Pair each player with the next player of the bracket they didn't play yet
+    Add the pairs to `pairs`, and return the players that couldn't be paired
+    """
+    paired = [False] * len(bracket)
+    leftovers = []
+    for idx, player in enumerate(bracket):
+        if paired[idx]:
+            continue
+
+        # Usually the very next player, unless they already played each other
+        for opponent_idx in range(idx + 1, len(bracket)):
+            if not paired[opponent_idx] and _can_play(
+                player, bracket[opponent_idx], previous_opponents
+            ):
+                paired[opponent_idx] = True
+                pairs.append((player, bracket[opponent_idx]))
+                break
+        else:
+            leftovers.append(player)
+
+    return leftovers
+
+
+def _pair_leftovers(leftovers, previous_opponents, pairs, *, first_pair_idx):
+    """
+    Pair the leftovers of a bracket together, either directly, or by swapping
+    them with the players of a pair from `first_pair_idx` onwards
+    Return the players that still couldn't be paired
+    """
+    remaining = []
+    for player in leftovers:
+        other_idx = _pair_leftover(
+            player, remaining, previous_opponents, pairs, first_pair_idx=first_pair_idx
+        )
+        if other_idx is None:
+            remaining.append(player)
+        else:
+            del remaining[other_idx]
+
+    return remaining
+
+
+def _pair_leftover(player, others, previous_opponents, pairs, *, first_pair_idx):
+    """Pair `player` with one of `others`, and return its index, or None"""
+    for other_idx, other in enumerate(others):
+        if _can_play(player, other, previous_opponents):
+            pairs.append((other, player))
+            return other_idx
+
+    for other_idx, other in enumerate(others):
+        if swapped := _swap(player, other, previous_opponents, pairs, first_pair_idx):
+            pairs.extend(swapped)
+            return other_idx
+
+    return None
+
+
+def _swap(player, other, previous_opponents, pairs, first_pair_idx):
+    """
+    Look for a pair whose players can play `player` and `other`, remove it
+    from `pairs` and return the new pairs, or None
+    """
+    # Lowest pairs first, their scores are the closest
+    for pair_idx in range(len(pairs) - 1, first_pair_idx - 1, -1):
+        player_1, player_2 = pairs[pair_idx]
+        for new_pairs in [
+            ((player_1, player), (player_2, other)),
+            ((player_1, other), (player_2, player)),
+        ]:
+            if all(_can_play(*pair, previous_opponents) for pair in new_pairs):
+                del pairs[pair_idx]
+                return new_pairs
+
+    return None
+
+
+def _pair_floaters(floaters, previous_opponents, pairs):
+    """
+    Pair the floaters again along with the pairs closest to their scores,
+    with as few rematches as possible: more and more pairs are added until
+    everyone can be paired, or all the pairs are there
+    Update `pairs`, and return the players that still couldn't be paired
+    """
+
+    def get_distance(pair):
+        pair_points = (pair[0].points + pair[1].points) / 2
+        return min(abs(pair_points - floater.points) for floater in floaters)
+
+    pair_idxs = sorted(range(len(pairs)), key=lambda idx: get_distance(pairs[idx]))
+    nb_window_pairs = len(floaters)
+    while True:
+        window_pair_idxs = set(pair_idxs[:nb_window_pairs])
+        players = list(floaters)
+        for pair_idx in window_pair_idxs:
+            players.extend(pairs[pair_idx])
+
+        # The pairs of the window are a good start
+        matches = [None] * len(floaters)
+        for idx in range(len(floaters), len(players), 2):
+            matches.extend([idx + 1, idx])
+        matches = _get_maximum_matching(
+            [
+                [_can_play(player, other, previous_opponents) for other in players]
+                for player in players
+            ],
+            matches,
+        )
+
+        unmatched = [players[idx] for idx, match in enumerate(matches) if match is None]
+        if not unmatched or len(window_pair_idxs) == len(pairs):
+            break
+        nb_window_pairs *= 2
+
+    pairs[:] = [pair for idx, pair in enumerate(pairs) if idx not in window_pair_idxs]
+    pairs.extend(
+        (players[idx], players[match])
+        for idx, match in enumerate(matches)
+        if match is not None and idx < match
+    )
+    return unmatched
+
+
+def _get_maximum_matching(can_play, matches):
+    """
+    Edmonds' blossom algorithm: grow the `matches` (the index of each
+    player's opponent, or None) along augmenting paths, until none is left
+    `can_play` is the adjacency matrix of the players
+    """
+    matches = list(matches)
+    for root in range(len(matches)):
+        if matches[root] is not None:
+            continue
+        path = _find_augmenting_path(root, can_play, matches)
+        if path is None:
+            continue
+
+        # Flip the matches along the path
+        end, parents = path
+        while end is not None:
+            previous = parents[end]
+            next_end = matches[previous]
+            matches[end], matches[previous] = previous, end
+            end = next_end
+    return matches
+
+
+def _find_augmenting_path(root, can_play, matches):
+    """
+    Return the end of an augmenting path from `root` and the parents of the
+    players along the path, or None
+    """
+    nb_players = len(matches)
+    parents = [None] * nb_players
+    # Players of a contracted blossom share their base
+    bases = list(range(nb_players))
+    in_tree = [False] * nb_players
+    in_tree[root] = True
+    queue = deque([root])
+
+    def get_common_base(a, b):
+        on_path = [False] * nb_players
+        while True:
+            a = bases[a]
+            on_path[a] = True
+            if matches[a] is None:
+                break
+            a = parents[matches[a]]
+        while True:
+            b = bases[b]
+            if on_path[b]:
+                return b
+            b = parents[matches[b]]
+
+    def mark_blossom(player, base, child, in_blossom):
+        while bases[player] != base:
+            in_blossom[bases[player]] = in_blossom[bases[matches[player]]] = True
+            parents[player] = child
+            child = matches[player]
+            player = parents[matches[player]]
+
+    while queue:
+        player = queue.popleft()
+        for other in range(nb_players):
+            if (
+                not can_play[player][other]
+                or bases[player] == bases[other]
+                or matches[player] == other
+            ):
+                continue
+
+            if other == root or (
+                matches[other] is not None and parents[matches[other]] is not None
+            ):
+                base = get_common_base(player, other)
+                in_blossom = [False] * nb_players
+                mark_blossom(player, base, other, in_blossom)
+                mark_blossom(other, base, player, in_blossom)
+                for idx in range(nb_players):
+                    if in_blossom[bases[idx]]:
+                        bases[idx] = base
+                        if not in_tree[idx]:
+                            in_tree[idx] = True
+                            queue.append(idx)
+            elif parents[other] is None:
+                parents[other] = player
+                if matches[other] is None:
+                    return other, parents
+                in_tree[matches[other]] = True
+                queue.append(matches[other])
+
+    return None
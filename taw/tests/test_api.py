@@ -0,0 +1,151 @@
+from pathlib import Path
+
+import pytest
+
+from taw import app as taw_app
+
+
+TESTING_DIR = Path("taw/testing/")
+
+
+@pytest.fixture
+def client():
+    return taw_app.test_client()
+
+
+def test_pairings(client):
+    response = client.post(
+        "/api/v1/pairings",
+        data=(TESTING_DIR / "pairings_with_bye.txt").read_text(),
+        content_type="text/plain",
+    )
+
+    assert response.status_code == 200
+    assert response.json["columns"] == [
+        "table_number",
+        "player_1",
+        "player_1_points",
+        "player_2",
+        "player_2_points",
+    ]
+    rows = response.json["rows"]
+    assert rows[0] == [1, "Édouard Balladur", 9, "Édith Cresson", 9]
+    # The bye has no opponent
+    assert [row for row in rows if row[3] is None] == [
+        [12, "Georges Pompidou", 0, None, None]
+    ]
+
+
+def test_pairings_by_name(client):
+    response = client.post(
+        "/api/v1/pairings/by_name",
+        json={
+            "dump": "1   Jacques Chirac (0 Points)     René Coty (0 Points)",
+            "first_table_number": 3,
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.json["rows"] == [
+        [3, "Jacques Chirac", 0, "René Coty", 0],
+        [3, "René Coty", 0, "Jacques Chirac", 0],
+    ]
+
+
+def test_match_slips(client):
+    response = client.post(
+        "/api/v1/match_slips",
+        data=(TESTING_DIR / "pairings_long.txt").read_text(),
+        content_type="text/plain",
+    )
+
+    assert response.status_code == 200
+    rows = response.json["rows"]
+    # 32 tables, and 3 empty slips to fill the last page
+    assert len(rows) == 35
+    assert [row[0] if row else None for row in rows[:6]] == [1, 8, 15, 22, 29, 2]
+    assert rows.count(None) == 3
+
+
+def test_results(client):
+    dump = """1   Jacques Chirac (0 Points)     René Coty (0 Points)    2 - 1
+2   Vincent Auriol (0 Points)     Alain Poher (0 Points)    No results"""
+
+    response = client.post("/api/v1/results", json={"dump": dump})
+    assert response.json["rows"] == [[1, 2, 1, 0], [2, None, None, None]]
+
+    response = client.post("/api/v1/outstanding_tables", json={"dump": dump})
+    assert response.json["rows"] == [[2, "Vincent Auriol", 0, "Alain Poher", 0]]
+
+
+def test_standings(client):
+    response = client.post(
+        "/api/v1/standings",
+        json={"dump": (TESTING_DIR / "standings.txt").read_text()},
+    )
+
+    assert response.status_code == 200
+    assert response.json["columns"][:3] == ["position", "player_name", "nb_points"]
+    assert [row[0] for row in response.json["rows"]] == list(
+        range(1, len(response.json["rows"]) + 1)
+    )
+
+
+def test_batch(client):
+    response = client.post(
+        "/api/v1/pairings",
+        json={
+            "dumps": [
+                "1   Jacques Chirac (0 Points)     René Coty (0 Points)",
+                "Not pairings",
+            ]
+        },
+    )
+
+    # One invalid dump doesn't fail the whole batch
+    assert response.status_code == 200
+    first_result, second_result = response.json["results"]
+    assert first_result == {"rows": [[1, "Jacques Chirac", 0, "René Coty", 0]]}
+    assert second_result["error"].startswith("Could not parse the following pairing")
+
+
+@pytest.mark.parametrize(
+    "kwargs, error",
+    [
+        pytest.param(
+            {"data": "Not pairings", "content_type": "text/plain"},
+            "Could not parse the following pairing",
+            id="invalid dump",
+        ),
+        pytest.param(
+            {"data": "", "content_type": "text/plain"},
+            "The dump is empty",
+            id="empty dump",
+        ),
+        pytest.param(
+            {"json": {"dump": ["Not a string"]}},
+            'Expected an object with a "dump" or "dumps" key',
+            id="not a string",
+        ),
+        pytest.param(
+            {"json": {"dumps": ["1   A (0 Points)     B (0 Points)"] * 21}},
+            "Too many dumps (maximum is 20)",
+            id="batch too big",
+        ),
+        pytest.param(
+            {
+                "json": {
+                    "dump": "1   A (0 Points)     B (0 Points)",
+                    "first_table_number": 0,
+                }
+            },
+            "The first table number must be a positive integer",
+            id="invalid first table number",
+        ),
+    ],
+)
+def test_errors(client, kwargs, error):
+    response = client.post("/api/v1/pairings", **kwargs)
+
+    assert response.status_code == 400
+    assert response.json["error"].startswith(error)
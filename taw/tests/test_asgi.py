@@ -0,0 +1,253 @@
+import asyncio
+import threading
+from pathlib import Path
+
+import pytest
+
+from benchmarks.dumps import generate_pairings_dump
+from benchmarks.load_test import encode_multipart
+from taw import app as taw_app
+from taw.asgi import AsgiApp, app as asgi_app
+from taw.tests.test_uploads import _png
+
+
+TESTING_DIR = Path("taw/testing/")
+
+
+async def _request(app, method, path, *, body=b"", headers=(), chunk_size=None):
+    """Return the status, the headers and the body messages of the response"""
+    chunk_size = chunk_size or len(body) or 1
+    messages = [
+        {
+            "type": "http.request",
+            "body": body[start : start + chunk_size],
+            "more_body": start + chunk_size < len(body),
+        }
+        for start in range(0, max(len(body), 1), chunk_size)
+    ]
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        # Only once the response was sent
+        await asyncio.Event().wait()
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    await app(
+        {
+            "type": "http",
+            "http_version": "1.1",
+            "method": method,
+            "scheme": "http",
+            "path": path,
+            "root_path": "",
+            "query_string": b"",
+            "headers": [
+                (name.lower().encode(), value.encode()) for name, value in headers
+            ],
+            "client": ("127.0.0.1", 12345),
+            "server": ("127.0.0.1", 8000),
+        },
+        receive,
+        send,
+    )
+
+    start, *body_messages = sent
+    assert start["type"] == "http.response.start"
+    assert not body_messages[-1].get("more_body", False)
+    return start["status"], dict(start["headers"]), body_messages
+
+
+def _get_body(body_messages):
+    return b"".join(message["body"] for message in body_messages)
+
+
+def test_help_page():
+    status, headers, body_messages = asyncio.run(_request(asgi_app, "GET", "/help/"))
+
+    assert status == 200
+    assert headers[b"content-type"] == b"text/html; charset=utf-8"
+    assert b"</html>" in _get_body(body_messages)
+
+
+@pytest.mark.parametrize("nb_players", [64, 3_000])
+def test_post(uploads_folder, nb_players):
+    body, content_type = encode_multipart(
+        {
+            "tournament_name": "Testing Tournament",
+            "round_number": "1",
+            "aetherhub_dump": generate_pairings_dump(nb_players),
+            "action": "pairings",
+        },
+        {"tournament_logo": ("logo.png", _png(40, 20))},
+    )
+
+    status, headers, body_messages = asyncio.run(
+        _request(
+            asgi_app,
+            "POST",
+            "/",
+            body=body,
+            headers=[("Content-Type", content_type)],
+            chunk_size=16 * 1024,
+        )
+    )
+
+    assert status == 200
+    assert b"Testing Tournament" in _get_body(body_messages)
+    assert len(list(uploads_folder.iterdir())) == 1
+    if nb_players > 1_000:
+        # Big pages are still streamed
+        assert len(body_messages) > 2
+        assert b"content-length" not in headers
+
+
+def _echo_app(environ, start_response):
+    start_response("200 OK", [("Content-Type", "application/octet-stream")])
+    return [environ["PATH_INFO"].encode("latin-1"), b"\n", environ["wsgi.input"].read()]
+
+
+def test_big_body(monkeypatch):
+    monkeypatch.setattr("taw.asgi.MAX_BODY_MEMORY_SIZE", 1024)
+    body = bytes(range(256)) * 100
+
+    status, _, body_messages = asyncio.run(
+        _request(AsgiApp(_echo_app), "POST", "/é", body=body, chunk_size=1000)
+    )
+
+    assert status == 200
+    assert _get_body(body_messages) == "/é\n".encode() + body
+
+
+@pytest.mark.parametrize("with_content_length", [True, False])
+def test_body_too_large(with_content_length):
+    def wsgi_app(environ, start_response):
+        raise AssertionError("The request should not reach the app")
+
+    body = b"x" * 10_000
+    headers = [("Content-Length", str(len(body)))] if with_content_length else []
+    messages = [
+        {"type": "http.request", "body": body[start : start + 1000], "more_body": True}
+        for start in range(0, len(body), 1000)
+    ]
+
+    async def receive():
+        return messages.pop(0)
+
+    sent = []
+
+    async def send(message):
+        sent.append(message)
+
+    scope = {
+        "type": "http",
+        "method": "POST",
+        "path": "/",
+        "headers": [(name.lower().encode(), value.encode()) for name, value in headers],
+    }
+    asyncio.run(AsgiApp(wsgi_app, max_body_size=2_500)(scope, receive, send))
+
+    assert sent[0]["status"] == 413
+    # The body was not read any further
+    nb_read_messages = 0 if with_content_length else 3
+    assert len(messages) == 10 - nb_read_messages
+
+
+def test_max_body_size():
+    assert asgi_app.max_body_size == taw_app.config["MAX_CONTENT_LENGTH"]
+
+
+def test_light_pages_while_rendering():
+    rendering = threading.Event()
+    rendered = threading.Event()
+
+    def wsgi_app(environ, start_response):
+        if environ["REQUEST_METHOD"] == "POST":
+            rendering.set()
+            rendered.wait(timeout=5)
+        return _echo_app(environ, start_response)
+
+    app = AsgiApp(wsgi_app, render_workers=1, light_workers=1)
+
+    async def run():
+        renders = [
+            asyncio.create_task(_request(app, "POST", "/", body=b"slips"))
+            for _ in range(3)
+        ]
+        await asyncio.get_running_loop().run_in_executor(None, rendering.wait, 5)
+
+        # All the render workers are busy, and more renders are waiting
+        status, _, body_messages = await asyncio.wait_for(
+            _request(app, "GET", "/help/"), timeout=1
+        )
+        assert status == 200
+        assert _get_body(body_messages) == b"/help/\n"
+        assert not any(render.done() for render in renders)
+
+        rendered.set()
+        for status, _, body_messages in await asyncio.gather(*renders):
+            assert _get_body(body_messages) == b"/\nslips"
+
+    asyncio.run(run())
+
+
+def test_disconnect():
+    def wsgi_app(environ, start_response):
+        raise AssertionError("The request should not reach the app")
+
+    async def receive():
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        raise AssertionError("Nobody to send the response to")
+
+    scope = {"type": "http", "method": "POST", "path": "/", "headers": []}
+    asyncio.run(AsgiApp(wsgi_app)(scope, receive, send))
+
+
+def test_lifespan():
+    started = []
+    app = AsgiApp(_echo_app, on_startup=lambda: started.append(True))
+    messages = [{"type": "lifespan.startup"}, {"type": "lifespan.shutdown"}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0)
+
+    async def send(message):
+        sent.append(message["type"])
+
+    asyncio.run(app({"type": "lifespan"}, receive, send))
+
+    assert started == [True]
+    assert sent == ["lifespan.startup.complete", "lifespan.shutdown.complete"]
+    with pytest.raises(RuntimeError):
+        app.render_executor.submit(print)
+
+
+def test_pdf(uploads_folder):
+    body, content_type = encode_multipart(
+        {
+            "tournament_name": "Testing Tournament",
+            "round_number": "1",
+            "aetherhub_dump": (TESTING_DIR / "pairings_long.txt").read_text(),
+            "action": "match_slips_pdf",
+        },
+        {},
+    )
+
+    status, headers, body_messages = asyncio.run(
+        _request(
+            asgi_app, "POST", "/", body=body, headers=[("Content-Type", content_type)]
+        )
+    )
+
+    assert status == 200
+    assert headers[b"content-type"] == b"application/pdf"
+    pdf = _get_body(body_messages)
+    assert pdf.startswith(b"%PDF")
+    assert pdf.rstrip().endswith(b"%%EOF")
@@ -0,0 +1,121 @@
+import pytest
+
+from benchmarks.async_serving import MODES
+from benchmarks.async_serving import run as run_async_serving
+from benchmarks.compression import ACTIONS
+from benchmarks.compression import measure as measure_compression
+from benchmarks.dumps import generate_pairings_dump, generate_standings_dump
+from benchmarks.load_test import (
+    Server,
+    encode_multipart,
+    generate_requests,
+    get_percentile,
+)
+from benchmarks.load_test import run as run_load_test
+from benchmarks.suite import compare, run
+from taw.utils import parse_pairings, parse_standings
+
+
+@pytest.mark.parametrize("nb_players", [1, 2, 3, 64, 1_001])
+def test_generated_dumps_can_be_parsed(nb_players):
+    pairings_dump = generate_pairings_dump(nb_players)
+    assert pairings_dump.startswith("Table   Player 1")
+
+    pairings = parse_pairings(pairings_dump)
+    assert len(pairings) == (nb_players + 1) // 2
+    # The bye is on the last table
+    assert [table.number for table in pairings if table.player_2.is_bye] == (
+        [len(pairings)] if nb_players % 2 else []
+    )
+
+    standings = parse_standings(generate_standings_dump(nb_players))
+    assert len(standings) == nb_players
+    assert len({standing.player_name for standing in standings}) == nb_players
+
+
+def test_generated_dumps_are_reproducible():
+    assert generate_pairings_dump(100) == generate_pairings_dump(100)
+    assert generate_pairings_dump(100) != generate_pairings_dump(100, seed=1)
+
+
+def test_suite():
+    results = run([10], nb_runs=1)
+
+    assert set(results) == {
+        "parse_pairings",
+        "parse_standings",
+        "get_pairings_by_name",
+        "sort_pairings_for_paper_cutter",
+        "render_pairings",
+        "render_match_slips",
+        "render_standings",
+    }
+
+    baseline = {
+        name: {"10": {**timings["10"], "median": timings["10"]["median"] / 2}}
+        for name, timings in results.items()
+    }
+    # Everything is twice as slow as the baseline
+    assert len(compare(results, baseline)) == len(results)
+
+
+@pytest.mark.parametrize(
+    "percentile, expected",
+    [(50, 50), (95, 95), (99, 99), (100, 100), (1, 1)],
+)
+def test_get_percentile(percentile, expected):
+    assert get_percentile(list(range(1, 101)), percentile) == expected
+
+
+def test_load_test(tmp_path):
+    requests = generate_requests(12, nb_players=20, nb_dumps=2, logo_ratio=0.5)
+
+    with Server(uploads_folder=str(tmp_path)) as server:
+        report = run_load_test(requests, url=server.url, concurrency=4)
+
+    assert report["nb_requests"] == 12
+    assert report["nb_errors"] == 0
+    assert (
+        sum(
+            action_report["nb_requests"] for action_report in report["actions"].values()
+        )
+        == 12
+    )
+    # Logos were uploaded to the server
+    assert list(tmp_path.iterdir())
+
+
+@pytest.mark.parametrize("mode", MODES)
+def test_async_serving(tmp_path, mode):
+    body, content_type = encode_multipart(
+        {
+            "tournament_name": "Async serving",
+            "round_number": "1",
+            "aetherhub_dump": generate_pairings_dump(20),
+            "action": "match_slips",
+        },
+        {},
+    )
+
+    with Server(uploads_folder=str(tmp_path), script=MODES[mode]) as server:
+        report = run_async_serving(
+            url=server.url,
+            body=body,
+            content_type=content_type,
+            nb_render_clients=2,
+            duration=0.5,
+        )
+
+    assert report["nb_errors"] == 0
+    assert report["nb_renders"] > 0
+    assert report["nb_light_requests"] > 0
+
+
+def test_compression():
+    results = measure_compression(64)
+
+    assert set(results) == set(ACTIONS)
+    for encodings in results.values():
+        for encoding, result in encodings.items():
+            if encoding != "identity":
+                assert result["nb_bytes"] < encodings["identity"]["nb_bytes"]
@@ -0,0 +1,54 @@
+from jinja2 import DictLoader, Environment
+from jinja2.ext import Extension
+
+from taw.bytecode_cache import PrecompiledBytecodeCache, precompile_templates
+
+
+def test_precompiled_templates_are_used(tmp_path):
+    templates = {"hello.html": "Hello {{ name }}!"}
+
+    build_env = Environment(
+        loader=DictLoader(templates),
+        bytecode_cache=PrecompiledBytecodeCache(str(tmp_path)),
+    )
+    assert precompile_templates(build_env) == ["hello.html"]
+
+    deployed_env = Environment(
+        loader=DictLoader(templates),
+        bytecode_cache=PrecompiledBytecodeCache(str(tmp_path)),
+    )
+    # Prevent any compilation, the bytecode must come from the cache
+    deployed_env.compile = None
+    assert deployed_env.get_template("hello.html").render(name="TAW") == "Hello TAW!"
+
+
+def test_missing_bytecode_cache_folder(tmp_path):
+    env = Environment(
+        loader=DictLoader({"hello.html": "Hello {{ name }}!"}),
+        bytecode_cache=PrecompiledBytecodeCache(str(tmp_path / "missing")),
+    )
+
+    assert env.get_template("hello.html").render(name="TAW") == "Hello TAW!"
+
+
+class _UpperExtension(Extension):
+    def preprocess(self, source, name, filename=None):
+        return source.upper()
+
+
+def test_preprocessing_changes_invalidate_the_cache(tmp_path):
+    templates = {"hello.html": "Hello {{ name }}!"}
+
+    build_env = Environment(
+        loader=DictLoader(templates),
+        bytecode_cache=PrecompiledBytecodeCache(str(tmp_path)),
+    )
+    precompile_templates(build_env)
+
+    # Eg. a change to the minification of the templates
+    deployed_env = Environment(
+        loader=DictLoader(templates),
+        bytecode_cache=PrecompiledBytecodeCache(str(tmp_path)),
+        extensions=[_UpperExtension],
+    )
+    assert deployed_env.get_template("hello.html").render(NAME="TAW") == "HELLO TAW!"
@@ -0,0 +1,98 @@
+import pytest
+
+from taw import app as taw_app
+from taw.cache import (
+    LRUCache,
+    get_max_bytes_setting,
+    parsed_dumps_cache,
+    rendered_pages_cache,
+)
+
+
+@pytest.fixture
+def now(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr("taw.cache.time.monotonic", lambda: now[0])
+    return now
+
+
+def test_lru_cache_hits_and_misses(now):
+    cache = LRUCache(max_bytes=100, ttl=60)
+
+    assert cache.get("key") is None
+    cache.set("key", "value", size=10)
+    assert cache.get("key") == "value"
+
+    assert cache.stats() == {
+        "hits": 1,
+        "misses": 1,
+        "nb_entries": 1,
+        "nb_bytes": 10,
+        "max_bytes": 100,
+    }
+
+
+def test_lru_cache_ttl(now):
+    cache = LRUCache(max_bytes=100, ttl=60)
+    cache.set("key", "value", size=10)
+
+    now[0] += 59
+    assert cache.get("key") == "value"
+
+    now[0] += 1
+    assert cache.get("key") is None
+    assert cache.stats()["nb_bytes"] == 0
+
+
+def test_lru_cache_evicts_least_recently_used(now):
+    cache = LRUCache(max_bytes=100, ttl=60)
+    cache.set("first", 1, size=40)
+    cache.set("second", 2, size=40)
+    # "first" is now the most recently used
+    assert cache.get("first") == 1
+
+    cache.set("third", 3, size=40)
+
+    assert cache.get("second") is None
+    assert cache.get("first") == 1
+    assert cache.get("third") == 3
+    assert cache.stats()["nb_bytes"] == 80
+
+
+def test_lru_cache_value_too_big(now):
+    cache = LRUCache(max_bytes=100, ttl=60)
+    cache.set("small", 1, size=40)
+    cache.set("big", 2, size=101)
+
+    assert cache.get("big") is None
+    assert cache.get("small") == 1
+
+
+def test_max_bytes_setting(monkeypatch):
+    monkeypatch.delenv("TAW_TESTING_CACHE_MAX_BYTES", raising=False)
+    assert get_max_bytes_setting("TAW_TESTING_CACHE_MAX_BYTES", 100) == 100
+
+    monkeypatch.setenv("TAW_TESTING_CACHE_MAX_BYTES", "200")
+    assert get_max_bytes_setting("TAW_TESTING_CACHE_MAX_BYTES", 100) == 200
+
+
+def test_same_dump_is_parsed_and_rendered_once():
+    parsed_dumps_cache.clear()
+    rendered_pages_cache.clear()
+
+    client = taw_app.test_client()
+    data = {
+        "tournament_name": "Testing Tournament",
+        "round_number": "1",
+        "aetherhub_dump": "1   Jacques Chirac (0 Points)     François Mitterrand (0 Points)",
+    }
+    pairings_html = client.post("/", data={**data, "action": "pairings"}).data
+    client.post("/", data={**data, "action": "match_slips"})
+    # Reprint
+    assert client.post("/", data={**data, "action": "pairings"}).data == pairings_html
+
+    stats = client.get("/cache/stats/").json
+    assert stats["parsed_dumps"]["misses"] == 1
+    assert stats["parsed_dumps"]["hits"] == 2
+    assert stats["rendered_pages"]["misses"] == 2
+    assert stats["rendered_pages"]["hits"] == 1
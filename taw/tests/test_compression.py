@@ -0,0 +1,129 @@
+import gzip
+from pathlib import Path
+
+import pytest
+from flask import request
+from jinja2 import Environment
+
+from taw import app as taw_app
+from taw.compression import MinifyExtension, get_response_encoding
+from taw.tests.test_metrics import _get_samples
+
+
+TESTING_DIR = Path("taw/testing/")
+
+
+@pytest.fixture
+def client(uploads_folder):
+    return taw_app.test_client()
+
+
+def _post(client, action, *, accept_encoding=None, dump_name="pairings_long.txt"):
+    return client.post(
+        "/",
+        data={
+            "tournament_name": "Testing Tournament",
+            "round_number": "1",
+            "aetherhub_dump": (TESTING_DIR / dump_name).read_text(),
+            "action": action,
+        },
+        headers={"Accept-Encoding": accept_encoding} if accept_encoding else {},
+    )
+
+
+def test_minify():
+    environment = Environment(extensions=[MinifyExtension])
+    template = environment.from_string(
+        """
+        <ul>
+            {% for item in items %}
+                {# An item #}
+                <li>{{ item }}</li>
+
+            {% endfor %}
+        </ul>
+        <script>
+            const a = 1
+            const b = 2
+        </script>
+        """
+    )
+
+    assert template.render(items=[1, 2]) == (
+        "<ul>\n<li>1</li>\n<li>2</li>\n</ul>\n"
+        "<script>\nconst a = 1\nconst b = 2\n</script>"
+    )
+
+
+@pytest.mark.parametrize("action", ["pairings", "match_slips", "standings"])
+def test_gzip(client, action):
+    dump_name = "standings_long.txt" if action == "standings" else "pairings_long.txt"
+    page = _post(client, action, dump_name=dump_name).get_data()
+
+    response = _post(client, action, accept_encoding="gzip", dump_name=dump_name)
+
+    assert response.status_code == 200
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Accept-Encoding" in response.vary
+    compressed_page = response.get_data()
+    assert len(compressed_page) < len(page) / 4
+    assert gzip.decompress(compressed_page) == page
+
+
+def test_brotli(client):
+    brotli = pytest.importorskip("brotli")
+    page = _post(client, "match_slips").get_data()
+
+    response = _post(client, "match_slips", accept_encoding="gzip, br")
+
+    assert response.headers["Content-Encoding"] == "br"
+    assert brotli.decompress(response.get_data()) == page
+
+
+def test_streamed_page(client, monkeypatch):
+    page = _post(client, "match_slips").get_data()
+    monkeypatch.setattr("taw.web.STREAMING_MIN_NB_ROWS", 1)
+
+    response = _post(client, "match_slips", accept_encoding="gzip")
+
+    assert response.is_streamed
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert "Content-Length" not in response.headers
+    assert gzip.decompress(response.get_data()) == page
+
+
+def test_not_compressed(client):
+    # Not accepted by the client
+    response = _post(client, "pairings")
+    assert "Content-Encoding" not in response.headers
+    assert "Accept-Encoding" in response.vary
+
+    # Already compressed
+    response = _post(client, "match_slips_pdf", accept_encoding="gzip")
+    assert response.mimetype == "application/pdf"
+    assert "Content-Encoding" not in response.headers
+
+    # Too small to be worth it
+    with taw_app.test_request_context(headers={"Accept-Encoding": "gzip"}):
+        response = taw_app.response_class("<p>Small</p>")
+        assert get_response_encoding(request, response) is None
+        response.set_data("<p>Big</p>" * 100)
+        assert get_response_encoding(request, response) == "gzip"
+
+
+def test_metrics(client):
+    before = _get_samples(client)
+
+    page = _post(client, "pairings").get_data()
+    compressed_page = _post(client, "pairings", accept_encoding="gzip").get_data()
+
+    after = _get_samples(client)
+
+    def get_increase(sample):
+        return after[sample] - before.get(sample, 0)
+
+    labels = '{action="pairings",encoding="gzip"}'
+    assert get_increase(f"taw_uncompressed_bytes_total{labels}") == len(page)
+    assert get_increase(f"taw_compression_saved_bytes_total{labels}") == len(
+        page
+    ) - len(compressed_page)
@@ -67,7 +67,7 @@ def assert_generated_html(taw_generate_test_outputs, client):
         )
         generated_html = response.get_data(as_text=True)
 
-        prefix = "match_slips_" if mode == "match_slips" else ""
+        prefix = "" if mode in ["pairings", "standings"] else f"{mode}_"
 
         # If we were asked to generate the test outputs
         if taw_generate_test_outputs:
@@ -83,7 +83,7 @@ def assert_generated_html(taw_generate_test_outputs, client):
     return _func
 
 
-@pytest.mark.parametrize("mode", ["pairings", "match_slips"])
+@pytest.mark.parametrize("mode", ["pairings", "match_slips", "outstanding_tables"])
 @pytest.mark.parametrize(
     "dump_path",
     TESTING_DIR.glob("*pairings*.txt"),
@@ -100,3 +100,33 @@ def test_generate_from_pairings(dump_path, mode, assert_generated_html):
 )
 def test_generate_from_standings(dump_path, assert_generated_html):
     assert_generated_html(dump_path, "standings")
+
+
+@pytest.mark.parametrize(
+    "dump_path, mode",
+    [
+        (TESTING_DIR / "pairings_long.txt", "pairings"),
+        (TESTING_DIR / "pairings_long.txt", "match_slips"),
+        (TESTING_DIR / "standings_long.txt", "standings"),
+    ],
+    ids=["pairings", "match_slips", "standings"],
+)
+def test_streamed_pages(dump_path, mode, client, monkeypatch):
+    # Stream every page
+    monkeypatch.setattr("taw.web.STREAMING_MIN_NB_ROWS", 1)
+
+    response = client.post(
+        "/",
+        data={
+            "tournament_name": "Testing Tournament",
+            "round_number": "1",
+            "aetherhub_dump": dump_path.read_text(),
+            "action": mode,
+        },
+    )
+
+    assert response.is_streamed
+    prefix = "match_slips_" if mode == "match_slips" else ""
+    assert response.get_data(as_text=True) == _get_expected_html(
+        dump_path, prefix=prefix
+    )
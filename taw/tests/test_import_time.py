@@ -0,0 +1,38 @@
+import subprocess
+import sys
+
+from benchmarks.import_time import LAZY_MODULES, WEB_MODULES
+
+
+def _get_imported_modules(module_name):
+    return subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            f"import sys, {module_name}; print('\\n'.join(sys.modules))",
+        ],
+        check=True,
+        capture_output=True,
+        text=True,
+    ).stdout.split()
+
+
+def test_core_does_not_import_web_modules():
+    imported_modules = _get_imported_modules("taw.utils")
+
+    for module_name in WEB_MODULES:
+        assert module_name not in imported_modules
+
+
+def test_cold_start_does_not_import_lazy_modules():
+    # What vercel loads on a cold start, see `benchmarks.import_time`
+    imported_modules = _get_imported_modules("api.index")
+
+    for module_name in LAZY_MODULES:
+        assert module_name not in imported_modules
+
+
+def test_app_is_loaded_lazily():
+    import taw
+
+    assert taw.app is taw.web.app
@@ -0,0 +1,128 @@
+import io
+import re
+from pathlib import Path
+
+import pytest
+
+from taw import app as taw_app
+from taw.metrics import Registry
+from taw.tests.test_uploads import _png
+
+
+TESTING_DIR = Path("taw/testing/")
+
+
+def _get_samples(client):
+    """Return the value of each sample exposed by `/metrics`"""
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.mimetype == "text/plain"
+
+    samples = {}
+    for line in response.get_data(as_text=True).splitlines():
+        if not line.startswith("#"):
+            sample, value = line.rsplit(" ", 1)
+            samples[sample] = float(value)
+    return samples
+
+
+def test_metrics(uploads_folder):
+    client = taw_app.test_client()
+    before = _get_samples(client)
+
+    dump = (TESTING_DIR / "pairings_long.txt").read_text()
+    png = _png(40, 20)
+    for action in ["pairings", "match_slips_pdf"]:
+        response = client.post(
+            "/",
+            data={
+                "tournament_name": "Testing Tournament",
+                "round_number": "1",
+                "aetherhub_dump": dump,
+                "action": action,
+                "tournament_logo": (io.BytesIO(png), "logo.png"),
+            },
+        )
+        assert response.status_code == 200
+        # Streamed responses are recorded once they've been sent
+        response.get_data()
+    client.post("/", data={"action": "something else"})
+
+    after = _get_samples(client)
+
+    def get_increase(sample):
+        return after[sample] - before.get(sample, 0)
+
+    assert get_increase('taw_requests_total{action="pairings",status="200"}') == 1
+    assert (
+        get_increase('taw_requests_total{action="match_slips_pdf",status="200"}') == 1
+    )
+    # Unknown actions don't get their own label
+    assert get_increase('taw_requests_total{action="unknown",status="200"}') == 1
+    assert get_increase('taw_request_duration_seconds_count{action="pairings"}') == 1
+
+    assert get_increase('taw_dump_bytes_sum{kind="pairings"}') == 2 * len(dump.encode())
+    assert get_increase('taw_dump_lines_sum{kind="pairings"}') == 2 * (
+        dump.count("\n") + 1
+    )
+    assert get_increase('taw_parsed_rows_sum{kind="pairings"}') == 2 * 32
+    assert get_increase("taw_upload_bytes_sum") == 2 * len(png)
+
+    for action in ["pairings", "match_slips_pdf"]:
+        assert get_increase(f'taw_response_bytes_sum{{action="{action}"}}') > 0
+
+    assert 0 <= after['taw_cache_hit_ratio{cache="parsed_dumps"}'] <= 1
+
+
+def test_histogram():
+    registry = Registry()
+    histogram = registry.histogram(
+        "test_seconds", "Test histogram", labelnames=("action",), buckets=(1, 5)
+    )
+    registry.record(
+        [(histogram, ("a",), value) for value in [0.5, 1, 2, 10]]
+        + [(histogram, ('quote " and \\ backslash',), 3)]
+    )
+
+    assert registry.expose() == (
+        "# HELP test_seconds Test histogram\n"
+        "# TYPE test_seconds histogram\n"
+        'test_seconds_bucket{action="a",le="1"} 2\n'
+        'test_seconds_bucket{action="a",le="5"} 3\n'
+        'test_seconds_bucket{action="a",le="+Inf"} 4\n'
+        'test_seconds_sum{action="a"} 13.5\n'
+        'test_seconds_count{action="a"} 4\n'
+        'test_seconds_bucket{action="quote \\" and \\\\ backslash",le="1"} 0\n'
+        'test_seconds_bucket{action="quote \\" and \\\\ backslash",le="5"} 1\n'
+        'test_seconds_bucket{action="quote \\" and \\\\ backslash",le="+Inf"} 1\n'
+        'test_seconds_sum{action="quote \\" and \\\\ backslash"} 3\n'
+        'test_seconds_count{action="quote \\" and \\\\ backslash"} 1\n'
+    )
+
+
+def test_counter():
+    registry = Registry()
+    counter = registry.counter("test_total", "Test counter")
+    registry.record([(counter, (), 1), (counter, (), 1)])
+
+    assert re.search(r"^test_total 2$", registry.expose(), re.MULTILINE)
+
+
+def test_request_too_large():
+    client = taw_app.test_client()
+    before = _get_samples(client)
+
+    response = client.post(
+        "/",
+        data={
+            "action": "pairings",
+            "aetherhub_dump": "x" * (taw_app.config["MAX_CONTENT_LENGTH"] + 1),
+        },
+    )
+
+    assert response.status_code == 413
+    # Recorded once it's been sent
+    response.get_data()
+    after = _get_samples(client)
+    sample = 'taw_requests_total{action="unknown",status="413"}'
+    assert after[sample] - before.get(sample, 0) == 1
@@ -0,0 +1,194 @@
+import io
+import re
+from pathlib import Path
+
+import pypdf
+import pytest
+
+from taw import app as taw_app
+from taw.cache import parsed_dumps_cache
+
+
+TESTING_DIR = Path("taw/testing/")
+
+
+def _assert_valid_pdf(pdf):
+    assert pdf.startswith(b"%PDF-1.4\n")
+    assert pdf.endswith(b"%%EOF\n")
+
+    # Every entry of the cross-reference table points to its object
+    xref_position = int(re.search(rb"startxref\n(\d+)\n", pdf).group(1))
+    xref = pdf[xref_position:].split(b"trailer")[0].splitlines()
+    for number, entry in enumerate(xref[3:], start=1):
+        offset = int(entry.split()[0])
+        assert pdf[offset:].startswith(b"%d 0 obj\n" % number)
+
+
+@pytest.mark.parametrize(
+    "dump_path, action, nb_pages",
+    [
+        # 11 tables and a bye, on a single page
+        (TESTING_DIR / "pairings_with_bye.txt", "pairings_pdf", 1),
+        # 32 tables, 5 slips per page
+        (TESTING_DIR / "pairings_long.txt", "match_slips_pdf", 7),
+    ],
+    ids=["pairings", "match_slips"],
+)
+def test_pdf(dump_path, action, nb_pages):
+    response = taw_app.test_client().post(
+        "/",
+        data={
+            "tournament_name": "Testing Tournament",
+            "round_number": "1",
+            "aetherhub_dump": dump_path.read_text(),
+            "action": action,
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/pdf"
+    assert response.is_streamed
+
+    pdf = response.data
+    _assert_valid_pdf(pdf)
+    assert pdf.count(b"/Type /Page ") == nb_pages
+
+
+def test_match_slips_pdf_without_slips():
+    response = taw_app.test_client().post(
+        "/",
+        data={
+            "tournament_name": "Testing Tournament",
+            "round_number": "1",
+            "aetherhub_dump": "1\tAlice (0 Points)\tBYE\t2 - 0",
+            "action": "match_slips_pdf",
+        },
+    )
+
+    assert response.status_code == 200
+    pdf = response.data
+    _assert_valid_pdf(pdf)
+    # Viewers reject documents without pages
+    assert pdf.count(b"/Type /Page ") == 1
+
+
+@pytest.mark.parametrize(
+    "standings_dump, nb_pages",
+    [
+        # 64 players on 2 pages, and 7 pages of match slips
+        ("", 9),
+        # Plus 64 standings on 2 pages
+        ((TESTING_DIR / "standings_long.txt").read_text(), 11),
+    ],
+    ids=["without standings", "with standings"],
+)
+def test_round_bundle_pdf(standings_dump, nb_pages):
+    parsed_dumps_cache.clear()
+
+    response = taw_app.test_client().post(
+        "/",
+        data={
+            "tournament_name": "Testing Tournament",
+            "round_number": "1",
+            "aetherhub_dump": (TESTING_DIR / "pairings_long.txt").read_text(),
+            "standings_dump": standings_dump,
+            "action": "round_bundle_pdf",
+        },
+    )
+
+    assert response.status_code == 200
+    assert response.mimetype == "application/pdf"
+
+    pdf = response.data
+    _assert_valid_pdf(pdf)
+    assert pdf.count(b"/Type /Page ") == nb_pages
+    # The pairings were only parsed once
+    assert parsed_dumps_cache.stats()["hits"] == 0
+
+
+def test_round_bundle_pdf_invalid_standings():
+    response = taw_app.test_client().post(
+        "/",
+        data={
+            "tournament_name": "Testing Tournament",
+            "round_number": "1",
+            "aetherhub_dump": (TESTING_DIR / "pairings_long.txt").read_text(),
+            "standings_dump": "Not standings",
+            "action": "round_bundle_pdf",
+        },
+    )
+
+    assert response.mimetype == "text/html"
+    assert "Could not parse the following standing" in response.get_data(as_text=True)
+
+
+@pytest.mark.parametrize("action", ["pairings", "match_slips", "outstanding_tables"])
+def test_standings_only_parsed_for_round_bundle(action):
+    response = taw_app.test_client().post(
+        "/",
+        data={
+            "tournament_name": "Testing Tournament",
+            "round_number": "1",
+            "aetherhub_dump": (TESTING_DIR / "pairings_long.txt").read_text(),
+            "standings_dump": "Not standings",
+            "action": action,
+        },
+    )
+
+    assert response.status_code == 200
+    assert "Could not parse" not in response.get_data(as_text=True)
+
+
+# pypdf reads the Chinese font as GB18030 instead of UTF-16, so only
+# Korean covers the CJK fonts
+NON_CP1252_NAMES = ["Łukasz Dvořák", "İlker Şahin", "Иван Петров", "김민준"]
+
+
+def _get_pdf_text(pdf):
+    reader = pypdf.PdfReader(io.BytesIO(pdf))
+    return "\n".join(page.extract_text() for page in reader.pages)
+
+
+@pytest.mark.parametrize(
+    "action, with_standings",
+    [
+        ("pairings_pdf", False),
+        ("match_slips_pdf", False),
+        ("round_bundle_pdf", True),
+    ],
+)
+def test_pdf_non_cp1252_names(action, with_standings):
+    first_names, second_names = NON_CP1252_NAMES[::2], NON_CP1252_NAMES[1::2]
+    pairings_dump = "\n".join(
+        f"{table}\t{first_name} (3 Points)\t{second_name} (3 Points)\tNo results"
+        for table, (first_name, second_name) in enumerate(
+            zip(first_names, second_names), start=1
+        )
+    )
+    standings_dump = "\n".join(
+        f"{rank}\t{name}\t3\t1 - 1\t50.0000%\t50.0000%\t50.0000%"
+        for rank, name in enumerate(NON_CP1252_NAMES, start=1)
+    )
+
+    response = taw_app.test_client().post(
+        "/",
+        data={
+            "tournament_name": "Tournoi de Zürich",
+            "round_number": "1",
+            "aetherhub_dump": pairings_dump,
+            "standings_dump": standings_dump if with_standings else "",
+            "action": action,
+        },
+    )
+
+    assert response.status_code == 200
+    pdf = response.data
+    _assert_valid_pdf(pdf)
+    text = _get_pdf_text(pdf)
+    assert "Tournoi de Zürich" in text
+    for name in NON_CP1252_NAMES:
+        assert name in text
+    if with_standings:
+        # Twice in the pairings (one row per player), once in the match slips
+        # and once in the standings
+        assert text.count("Łukasz Dvořák") == 4
@@ -0,0 +1,112 @@
+import pstats
+import re
+from pathlib import Path
+
+import pytest
+
+from taw import app as taw_app
+from taw.cache import parsed_dumps_cache, rendered_pages_cache
+
+
+TESTING_DIR = Path("taw/testing/")
+
+
+def _post(client, action, dump_path, **kwargs):
+    return client.post(
+        "/",
+        data={
+            "tournament_name": "Testing Tournament",
+            "round_number": "1",
+            "aetherhub_dump": dump_path.read_text(),
+            "action": action,
+        },
+        **kwargs,
+    )
+
+
+@pytest.mark.parametrize(
+    "action, dump_path, phases",
+    [
+        (
+            "pairings",
+            TESTING_DIR / "pairings.txt",
+            ["validate", "parse", "sort", "render", "total"],
+        ),
+        (
+            "match_slips",
+            TESTING_DIR / "pairings.txt",
+            ["validate", "parse", "sort", "render", "total"],
+        ),
+        (
+            "standings",
+            TESTING_DIR / "standings.txt",
+            ["validate", "parse", "render", "total"],
+        ),
+    ],
+)
+def test_server_timing_header(action, dump_path, phases):
+    parsed_dumps_cache.clear()
+    rendered_pages_cache.clear()
+
+    response = _post(taw_app.test_client(), action, dump_path)
+
+    server_timing = response.headers["Server-Timing"]
+    assert re.fullmatch(r"\w+;dur=\d+\.\d(, \w+;dur=\d+\.\d)*", server_timing)
+    assert sorted(re.findall(r"(\w+);", server_timing)) == sorted(phases)
+
+
+def test_profiling_is_disabled_by_default():
+    response = _post(
+        taw_app.test_client(),
+        "pairings",
+        TESTING_DIR / "pairings.txt",
+        query_string={"profile": "1"},
+    )
+
+    assert response.mimetype == "text/html"
+
+
+@pytest.mark.parametrize(
+    "action, rows_function_name",
+    [
+        ("pairings", "_iter_pairings_rows"),
+        ("match_slips_pdf", "_iter_match_slips_rows"),
+    ],
+    ids=["page", "streamed pdf"],
+)
+def test_profiling(action, rows_function_name, monkeypatch, tmp_path):
+    monkeypatch.setitem(taw_app.config, "PROFILING", True)
+    rendered_pages_cache.clear()
+
+    response = _post(
+        taw_app.test_client(),
+        action,
+        TESTING_DIR / "pairings_long.txt",
+        query_string={"profile": "1"},
+    )
+
+    assert response.mimetype == "application/octet-stream"
+    assert f'filename="taw-{action}.prof"' in response.headers["Content-Disposition"]
+
+    profile_path = tmp_path / "profile.prof"
+    profile_path.write_bytes(response.data)
+    profiled_functions = {
+        function_name for _, _, function_name in pstats.Stats(str(profile_path)).stats
+    }
+    # The page / PDF was rendered while being profiled
+    assert rows_function_name in profiled_functions
+
+
+def test_profiling_filename(monkeypatch):
+    monkeypatch.setitem(taw_app.config, "PROFILING", True)
+
+    response = _post(
+        taw_app.test_client(),
+        '../"pairings"\r\nX-Injected: 1',
+        TESTING_DIR / "pairings.txt",
+        query_string={"profile": "1"},
+    )
+
+    assert response.headers["Content-Disposition"] == (
+        'attachment; filename="taw-pairings_X-Injected_1.prof"'
+    )
@@ -0,0 +1,133 @@
+from pathlib import Path
+
+import pytest
+
+from benchmarks.dumps import generate_standings_dump
+from taw import app as taw_app
+from taw.projection import get_max_nb_trials, project_top_cut
+from taw.utils import parse_round_results, parse_standings
+
+
+TESTING_DIR = Path("taw/testing/")
+
+
+@pytest.fixture
+def standings():
+    return parse_standings((TESTING_DIR / "standings_long.txt").read_text())
+
+
+def test_project_top_cut(standings):
+    projection = project_top_cut(standings, nb_rounds=2, nb_trials=10_000, seed=0)
+
+    assert projection.nb_trials == 10_000
+    assert sum(projection.top_probabilities.values()) == pytest.approx(8)
+    assert sum(projection.cutoff_probabilities.values()) == pytest.approx(1)
+    # 32 players with 3 points, 32 with 0: it takes at least 6 points, and
+    # 9 points is always enough
+    assert min(projection.cutoff_probabilities) >= 6
+    assert projection.points_probabilities[9] == 1
+    assert projection.points_probabilities.get(3, 0) == 0
+    # The current standings break the ties
+    top_probabilities = list(projection.top_probabilities.values())
+    assert top_probabilities[0] > top_probabilities[31] > 0
+    assert top_probabilities[32] > top_probabilities[-1] == 0
+
+    # Same seed, same projection
+    assert project_top_cut(standings, nb_rounds=2, nb_trials=10_000, seed=0) == (
+        projection
+    )
+
+
+def test_project_top_cut_processes(standings, monkeypatch):
+    # Several chunks, for several processes
+    monkeypatch.setattr("taw.projection.MAX_CHUNK_SIZE", 64 * 1_000)
+
+    assert project_top_cut(
+        standings, nb_rounds=1, nb_trials=5_000, nb_processes=2, seed=0
+    ) == project_top_cut(standings, nb_rounds=1, nb_trials=5_000, seed=0)
+
+
+def test_project_top_cut_current_round(standings):
+    pairings_input = (TESTING_DIR / "pairings_long.txt").read_text()
+    round_results = parse_round_results(pairings_input)
+    # The standings of the round before these pairings
+    standings = [standing._replace(nb_points=0) for standing in standings]
+
+    projection = project_top_cut(
+        standings, nb_rounds=1, top=16, round_results=round_results, nb_trials=100
+    )
+
+    # All the results are reported, nothing is left to chance: the top 16 are
+    # the first winners in the standings
+    winners = set()
+    for idx, table in enumerate(round_results.pairings):
+        player_1_wins, player_2_wins, _ = round_results.get_result(idx)
+        if player_1_wins > player_2_wins:
+            winners.add(table.player_1.name)
+        elif player_2_wins > player_1_wins:
+            winners.add(table.player_2.name)
+    top_players = [
+        standing.player_name
+        for standing in standings
+        if standing.player_name in winners
+    ][:16]
+    assert projection.top_probabilities == {
+        standing.player_name: float(standing.player_name in top_players)
+        for standing in standings
+    }
+    assert projection.cutoff_probabilities == {3: 1}
+
+
+def test_project_top_cut_big_event():
+    standings = parse_standings(generate_standings_dump(1_000))
+
+    # Timed by `python -m benchmarks.suite --check-budgets`
+    projection = project_top_cut(standings, nb_rounds=3, nb_trials=10_000, seed=0)
+
+    assert projection.nb_trials == 10_000
+    assert len(projection.top_probabilities) == 1_000
+    # 8 players make the top cut in each trial
+    assert sum(projection.top_probabilities.values()) == pytest.approx(8)
+    assert sum(projection.cutoff_probabilities.values()) == pytest.approx(1)
+
+
+def test_project_top_cut_max_nb_trials(standings, monkeypatch):
+    assert get_max_nb_trials(10_000, 3) == 3_333
+    big_standings = parse_standings(generate_standings_dump(10_000))
+    with pytest.raises(ValueError, match="Cannot simulate more than 3333 trials"):
+        project_top_cut(big_standings, nb_rounds=3, nb_trials=10_000)
+
+    # As many trials as possible by default, 64 players and 3 rounds here
+    monkeypatch.setattr("taw.projection.MAX_SIMULATED_RESULTS", 100 * 64 * 3)
+    assert project_top_cut(standings, nb_rounds=3).nb_trials == 100
+
+
+def test_project_top_cut_command(tmp_path):
+    standings_path = tmp_path / "standings.txt"
+    standings_path.write_text((TESTING_DIR / "standings_long.txt").read_text())
+
+    result = taw_app.test_cli_runner().invoke(
+        args=[
+            "project-top-cut",
+            str(standings_path),
+            "--rounds",
+            "2",
+            "--trials",
+            "1000",
+        ]
+    )
+
+    assert result.exit_code == 0, result.output
+    assert "Points of the last player of the top 8:" in result.output
+    assert "1. Clotaire III: " in result.output
+
+
+def test_project_top_cut_errors(standings):
+    with pytest.raises(ValueError):
+        project_top_cut(standings, nb_rounds=1, top=65)
+
+    round_results = parse_round_results(
+        (TESTING_DIR / "pairings_with_bye.txt").read_text()
+    )
+    with pytest.raises(ValueError, match="is not in the standings"):
+        project_top_cut(standings, nb_rounds=1, round_results=round_results)
@@ -0,0 +1,199 @@
+import random
+from pathlib import Path
+
+from taw.swiss import get_previous_opponents, pair_round
+from taw.utils import (
+    BYE_STRING,
+    Player,
+    Table,
+    get_pairings_by_name,
+    parse_pairings,
+    sort_pairings_for_paper_cutter,
+)
+
+
+TESTING_DIR = Path("taw/testing/")
+
+
+def _get_players(points_by_name):
+    return [Player(name, points) for name, points in points_by_name.items()]
+
+
+def _get_pairs(pairings):
+    return {frozenset([table.player_1.name, table.player_2.name]) for table in pairings}
+
+
+def _get_rematches(pairings, previous_opponents):
+    return [
+        table
+        for table in pairings
+        if table.player_2.name in previous_opponents.get(table.player_1.name, ())
+    ]
+
+
+def test_get_previous_opponents():
+    previous_opponents = get_previous_opponents(
+        [parse_pairings((TESTING_DIR / "pairings_with_bye.txt").read_text())]
+    )
+
+    assert previous_opponents["Georges Pompidou"] == {BYE_STRING}
+    assert BYE_STRING not in previous_opponents
+    for name, opponents in previous_opponents.items():
+        for opponent in opponents - {BYE_STRING}:
+            assert previous_opponents[opponent] == {name}
+
+
+def test_pair_round():
+    players = _get_players(
+        {
+            "Jacques Chirac": 3,
+            "René Coty": 3,
+            "Vincent Auriol": 0,
+            "Alain Poher": 0,
+            "Georges Pompidou": 0,
+        }
+    )
+
+    pairings = pair_round(players, seed=0)
+
+    assert [table.number for table in pairings] == [1, 2, 3]
+    assert _get_pairs(pairings[:1]) == {frozenset(["Jacques Chirac", "René Coty"])}
+    assert pairings[-1].player_2 == Player(BYE_STRING, 0)
+    assert {table.player_1.name for table in pairings[1:]} | {
+        table.player_2.name for table in pairings[1:]
+    } == {"Vincent Auriol", "Alain Poher", "Georges Pompidou", BYE_STRING}
+
+    # Same seed, same pairings
+    assert pair_round(players, seed=0) == pairings
+
+
+def test_pair_round_pair_down():
+    players = _get_players(
+        {
+            "Jacques Chirac": 6,
+            "René Coty": 3,
+            "Vincent Auriol": 3,
+            "Alain Poher": 3,
+            "Georges Pompidou": 0,
+            "Valéry Giscard d'Estaing": 0,
+        }
+    )
+
+    pairings = pair_round(players, seed=0)
+
+    # The 6 points player is paired down with a 3 points player, as is the
+    # last 3 points player
+    assert [(table.player_1.points, table.player_2.points) for table in pairings] == [
+        (6, 3),
+        (3, 3),
+        (0, 0),
+    ]
+
+
+def test_pair_round_avoid_rematches():
+    players = _get_players(
+        {
+            "Jacques Chirac": 3,
+            "René Coty": 3,
+            "Vincent Auriol": 3,
+            "Alain Poher": 3,
+        }
+    )
+    previous_opponents = {
+        "Jacques Chirac": {"René Coty", "Vincent Auriol"},
+        "René Coty": {"Jacques Chirac", "Alain Poher"},
+        "Vincent Auriol": {"Jacques Chirac"},
+        "Alain Poher": {"René Coty"},
+    }
+
+    for seed in range(10):
+        pairings = pair_round(players, previous_opponents=previous_opponents, seed=seed)
+        assert _get_pairs(pairings) == {
+            frozenset(["Jacques Chirac", "Alain Poher"]),
+            frozenset(["René Coty", "Vincent Auriol"]),
+        }
+
+
+def test_pair_round_avoid_rematches_across_brackets():
+    # Pairing each bracket, then swapping pairs, leaves p2 and p6 for a
+    # rematch: the whole remainder must be paired again
+    points = [9, 7, 3, 4, 12, 6, 0, 6]
+    players = _get_players({f"p{idx}": points[idx] for idx in range(8)})
+    previous_opponents = {
+        f"p{idx}": {f"p{opponent_idx}" for opponent_idx in opponent_idxs}
+        for idx, opponent_idxs in enumerate(
+            [
+                [1, 2, 3, 7],
+                [0, 3, 4, 5],
+                [0, 4, 6, 7],
+                [0, 1, 4, 6],
+                [1, 2, 3, 5],
+                [1, 4, 6, 7],
+                [2, 3, 5, 7],
+                [0, 2, 5, 6],
+            ]
+        )
+    }
+
+    for seed in range(10):
+        pairings = pair_round(players, previous_opponents=previous_opponents, seed=seed)
+        assert len(pairings) == 4
+        assert not _get_rematches(pairings, previous_opponents)
+
+
+def test_pair_round_rematch_as_last_resort():
+    players = _get_players({"Jacques Chirac": 3, "René Coty": 0})
+
+    pairings = pair_round(
+        players,
+        previous_opponents={
+            "Jacques Chirac": {"René Coty"},
+            "René Coty": {"Jacques Chirac"},
+        },
+    )
+
+    assert pairings == [
+        Table(number=1, player_1=players[0], player_2=players[1]),
+    ]
+
+
+def test_pair_round_no_second_bye():
+    players = _get_players({"Jacques Chirac": 3, "René Coty": 0, "Alain Poher": 0})
+
+    for seed in range(10):
+        pairings = pair_round(
+            players,
+            previous_opponents={"René Coty": {BYE_STRING}},
+            seed=seed,
+        )
+        assert pairings[-1].player_1.name == "Alain Poher"
+        assert pairings[-1].player_2.is_bye
+
+
+def test_pair_round_big_event():
+    rng = random.Random(0)
+    points = {f"Player {idx}": 0 for idx in range(4_001)}
+    rounds = []
+    previous_opponents = {}
+
+    for round_number in range(1, 9):
+        players = _get_players(points)
+        # Timed by `python -m benchmarks.suite --check-budgets`
+        pairings = pair_round(
+            players, previous_opponents=previous_opponents, seed=round_number
+        )
+
+        assert not _get_rematches(pairings, previous_opponents)
+        assert len(pairings) == 2_001
+        # The same structure as the parsed pairings, for the renderers
+        assert len(get_pairings_by_name(pairings)) == 2 * len(pairings)
+        assert sort_pairings_for_paper_cutter(pairings, nb_slips_per_page=3)
+
+        for table in pairings:
+            if table.player_2.is_bye:
+                points[table.player_1.name] += 3
+            else:
+                winner = rng.choice([table.player_1, table.player_2])
+                points[winner.name] += 3
+        rounds.append(pairings)
+        previous_opponents = get_previous_opponents(rounds)
@@ -0,0 +1,138 @@
+import random
+from pathlib import Path
+
+import pytest
+
+from taw.tiebreakers import StandingsEngine
+from taw.utils import (
+    BYE_STRING,
+    Player,
+    RoundResults,
+    Table,
+    parse_round_results,
+    parse_standings,
+)
+
+
+TESTING_DIR = Path("taw/testing/")
+
+
+def _get_round_results(tables_and_results):
+    results = RoundResults.for_pairings(
+        [
+            Table(
+                number=number,
+                player_1=Player(player_1, 0),
+                player_2=Player(player_2, 0),
+            )
+            for number, (player_1, player_2, _) in enumerate(
+                tables_and_results, start=1
+            )
+        ]
+    )
+    for idx, (_, _, result) in enumerate(tables_and_results):
+        if result is not None:
+            (
+                results.player_1_wins[idx],
+                results.player_2_wins[idx],
+                results.draws[idx],
+            ) = result
+    return results
+
+
+def test_standings_like_aetherhub():
+    engine = StandingsEngine()
+    engine.add_round(
+        parse_round_results((TESTING_DIR / "pairings_long.txt").read_text())
+    )
+
+    # Standings of the same round, from AetherHub
+    assert engine.get_standings() == parse_standings(
+        (TESTING_DIR / "standings_long.txt").read_text()
+    )
+
+
+def test_tiebreakers():
+    engine = StandingsEngine()
+    engine.add_round(
+        _get_round_results(
+            [
+                ("Jacques Chirac", "René Coty", (2, 0, 0)),
+                ("Vincent Auriol", "Alain Poher", (1, 1, 1)),
+                ("Georges Pompidou", BYE_STRING, None),
+            ]
+        )
+    )
+    engine.add_round(
+        _get_round_results(
+            [
+                ("Jacques Chirac", "Georges Pompidou", (2, 1, 0)),
+                ("René Coty", "Vincent Auriol", (0, 2, 0)),
+                ("Alain Poher", BYE_STRING, (2, 0, 0)),
+            ]
+        )
+    )
+
+    standings = {standing.player_name: standing for standing in engine.get_standings()}
+    chirac = standings["Jacques Chirac"]
+    assert (chirac.position, chirac.nb_points, chirac.record) == (1, 6, "2 - 0")
+    # Coty's 0% and Pompidou's 50% match win percentages
+    assert chirac.omw == "41.6666%"
+    assert chirac.gw == "80.0000%"
+
+    coty = standings["René Coty"]
+    assert (coty.nb_points, coty.record) == (0, "0 - 2")
+    # Opponents: Chirac (100%), Auriol (4 / 6 match points)
+    assert coty.omw == "83.3333%"
+    # Floored for the opponents, but not for the player themselves
+    assert coty.gw == "0.0000%"
+
+    poher = standings["Alain Poher"]
+    assert (poher.nb_points, poher.record) == (4, "1 - 0 - 1")
+    # The bye is not an opponent
+    assert poher.omw == "66.6666%"
+
+
+def test_update_round():
+    tables = [
+        ("Jacques Chirac", "René Coty", (2, 0, 0)),
+        ("Vincent Auriol", "Alain Poher", (2, 1, 0)),
+    ]
+    engine = StandingsEngine()
+    engine.add_round(_get_round_results([tables[0], (*tables[1][:2], None)]))
+    # The second table is still playing
+    assert engine.get_tiebreakers().match_points.tolist() == [3, 0, 0, 0]
+    assert engine.get_tiebreakers().wins.tolist() == [1, 0, 0, 0]
+
+    engine.update_round(0, _get_round_results(tables))
+
+    expected_engine = StandingsEngine()
+    expected_engine.add_round(_get_round_results(tables))
+    assert engine.get_standings() == expected_engine.get_standings()
+
+
+def _get_random_round(player_names, rng):
+    player_names = rng.sample(player_names, len(player_names))
+    tables_and_results = [
+        (player_1, player_2, rng.choice([(2, 0, 0), (2, 1, 0), (1, 2, 0), (1, 1, 1)]))
+        for player_1, player_2 in zip(player_names[::2], player_names[1::2])
+    ]
+    if len(player_names) % 2:
+        tables_and_results.append((player_names[-1], BYE_STRING, None))
+    return _get_round_results(tables_and_results)
+
+
+@pytest.mark.parametrize("nb_players", [2_000, 2_001])
+def test_big_event(nb_players):
+    rng = random.Random(0)
+    player_names = [f"Player {idx}" for idx in range(nb_players)]
+    rounds = [_get_random_round(player_names, rng) for _ in range(15)]
+
+    # Timed by `python -m benchmarks.suite --check-budgets`
+    engine = StandingsEngine()
+    for round_results in rounds:
+        engine.add_round(round_results)
+    standings = engine.get_standings()
+
+    assert len(standings) == nb_players
+    assert sum(standing.nb_points for standing in standings) <= 3 * 15 * nb_players
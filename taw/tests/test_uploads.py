@@ -0,0 +1,184 @@
+import io
+import os
+import time
+from pathlib import Path
+
+import pytest
+from PIL import Image
+from werkzeug.datastructures import FileStorage
+
+from taw import app as taw_app
+from taw.uploads import evict_logos, save_logo
+
+
+def _logo(content, filename="logo.PNG"):
+    return FileStorage(stream=io.BytesIO(content), filename=filename)
+
+
+def test_save_logo_by_content(tmp_path):
+    filename = save_logo(_logo(_png(40, 20)), folder=tmp_path)
+    assert filename.startswith("taw-logo-")
+    assert filename.endswith(".jpg")
+
+    # Same content, same file
+    assert (
+        save_logo(_logo(_png(40, 20), filename="other.png"), folder=tmp_path)
+        == filename
+    )
+    other_filename = save_logo(_logo(_png(20, 40)), folder=tmp_path)
+    assert other_filename != filename
+
+    assert sorted(os.listdir(tmp_path)) == sorted([filename, other_filename])
+
+
+def test_save_logo_not_an_image(tmp_path):
+    logo = _logo(b"<svg><script>alert(1)</script></svg>", filename="logo.svg")
+
+    assert save_logo(logo, folder=tmp_path) is None
+    assert os.listdir(tmp_path) == []
+
+
+@pytest.mark.parametrize(
+    "failing_function", ["taw.uploads._normalize_logo", "PIL.Image.Image.save"]
+)
+def test_save_logo_failure_leaves_no_temporary_file(
+    failing_function, tmp_path, monkeypatch
+):
+    def fail(*args, **kwargs):
+        raise OSError("No space left on device")
+
+    logo = _logo(_png(400, 100))
+    monkeypatch.setattr(failing_function, fail)
+
+    with pytest.raises(OSError, match="No space left"):
+        save_logo(logo, folder=tmp_path)
+
+    assert os.listdir(tmp_path) == []
+
+
+def test_evict_logos(tmp_path):
+    now = time.time()
+    old_logo = save_logo(_logo(_png(10, 10)), folder=tmp_path)
+    os.utime(tmp_path / old_logo, (now - 100, now - 100))
+    least_recent_logo = save_logo(_logo(_png(20, 20)), folder=tmp_path)
+    os.utime(tmp_path / least_recent_logo, (now - 20, now - 20))
+    recent_logo = save_logo(_logo(_png(30, 30)), folder=tmp_path)
+    # Not a logo, should never be removed
+    (tmp_path / "something_else").write_bytes(b"something else" * 100)
+    os.utime(tmp_path / "something_else", (now - 100, now - 100))
+
+    # Room for the most recent logo only
+    max_bytes = (tmp_path / recent_logo).stat().st_size
+    evict_logos(folder=tmp_path, max_age=50, max_bytes=max_bytes)
+
+    assert sorted(os.listdir(tmp_path)) == sorted([recent_logo, "something_else"])
+
+
+def test_logo_is_stored_once(uploads_folder):
+    client = taw_app.test_client()
+    png = _png(40, 20)
+    # Match slips embed the logo, pairings link to it
+    for action in ["match_slips", "pairings"]:
+        response = client.post(
+            "/",
+            data={
+                "tournament_name": "Testing Tournament",
+                "round_number": "1",
+                "aetherhub_dump": "1   Jacques Chirac (0 Points)     René Coty (0 Points)",
+                "action": action,
+                "tournament_logo": (io.BytesIO(png), "logo.png"),
+            },
+        )
+        assert response.status_code == 200
+
+    (logo,) = os.listdir(uploads_folder)
+    assert f"/uploads/{logo}" in response.get_data(as_text=True)
+
+    response = client.get(f"/uploads/{logo}")
+    assert response.data == (uploads_folder / logo).read_bytes()
+    assert response.mimetype == "image/jpeg"
+    assert response.headers["X-Content-Type-Options"] == "nosniff"
+    assert response.cache_control.immutable
+    assert response.cache_control.max_age == 365 * 24 * 60 * 60
+
+
+def test_logo_not_an_image(uploads_folder):
+    response = taw_app.test_client().post(
+        "/",
+        data={
+            "tournament_name": "Testing Tournament",
+            "round_number": "1",
+            "aetherhub_dump": "1   Jacques Chirac (0 Points)     René Coty (0 Points)",
+            "action": "pairings",
+            "tournament_logo": (io.BytesIO(b"<svg></svg>"), "logo.svg"),
+        },
+    )
+
+    assert "Could not read the logo" in response.get_data(as_text=True)
+    assert os.listdir(uploads_folder) == []
+
+
+def test_only_logos_are_served(uploads_folder):
+    (uploads_folder / "something_else").write_bytes(b"something else")
+    (uploads_folder / ".taw-logo-tmp1234").write_bytes(b"half-written logo")
+    # Only normalized logos are served
+    html_logo = f"taw-logo-{'0' * 64}.html"
+    (uploads_folder / html_logo).write_bytes(b"<script>alert(1)</script>")
+
+    client = taw_app.test_client()
+    for name in ["something_else", ".taw-logo-tmp1234", html_logo]:
+        assert client.get(f"/uploads/{name}").status_code == 404
+
+
+def _png(width, height):
+    png = io.BytesIO()
+    Image.new("RGBA", (width, height), (255, 0, 0, 128)).save(png, format="PNG")
+    return png.getvalue()
+
+
+def test_logo_is_normalized(tmp_path):
+    filename = save_logo(_logo(_png(1000, 800)), folder=tmp_path)
+    assert filename.endswith(".jpg")
+    # The original is not kept
+    assert os.listdir(tmp_path) == [filename]
+
+    with Image.open(tmp_path / filename) as image:
+        assert image.format == "JPEG"
+        assert image.size == (250, 200)
+
+    # Normalized once
+    assert save_logo(_logo(_png(1000, 800)), folder=tmp_path) == filename
+
+
+def test_small_logo_is_not_upscaled(tmp_path):
+    filename = save_logo(_logo(_png(40, 20)), folder=tmp_path)
+
+    with Image.open(tmp_path / filename) as image:
+        assert image.size == (40, 20)
+
+
+@pytest.mark.parametrize(
+    "action, embedded_logo_marker",
+    [
+        ("match_slips", b"data:image/jpeg;base64,"),
+        ("match_slips_pdf", b"/DCTDecode"),
+        ("pairings_pdf", b"/DCTDecode"),
+    ],
+)
+def test_logo_is_embedded_once(action, embedded_logo_marker, uploads_folder):
+    response = taw_app.test_client().post(
+        "/",
+        data={
+            "tournament_name": "Testing Tournament",
+            "round_number": "1",
+            "aetherhub_dump": Path("taw/testing/pairings_long.txt").read_text(),
+            "action": action,
+            "tournament_logo": (io.BytesIO(_png(1000, 800)), "logo.png"),
+        },
+    )
+
+    assert response.data.count(embedded_logo_marker) == 1
+    if action == "match_slips":
+        # 32 tables, and 3 empty slips to fill the last page
+        assert response.data.count(b'<use href="#tournament-logo" />') == 35
+        assert b"/uploads/" not in response.data
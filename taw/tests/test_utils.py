@@ -1,10 +1,19 @@
+import io
+import locale
+import re
+
 import pytest
 
+from taw.cache import PAPER_CUTTER_SEATS_CACHE_MAX_BYTES, paper_cutter_seats_cache
 from taw.exceptions import ParsePairingException, ParseStandingException
 from taw.utils import (
+    MAX_TABLE_NUMBER,
+    get_paper_cutter_order,
     get_pairings_by_name,
+    iter_pairings,
     sort_pairings_for_paper_cutter,
     parse_pairings,
+    parse_round_results,
     parse_standings,
     Player,
     Standing,
@@ -264,6 +273,98 @@ def test_parse_pairings(pairings_input, expected_output):
         assert parse_pairings(pairings_input) == expected_output
 
 
+@pytest.mark.parametrize(
+    "pairings_input, expected_message",
+    [
+        pytest.param(
+            """1   Jacques Chirac (15 Points)    François Mitterrand (13 Points)     No results
+99999   Vincent Auriol (13 Points)     René Coty (9 Points)  2 - 1""",
+            "Some tables are missing: 2 to 99998 (99997 tables)",
+            id="huge gap",
+        ),
+        pytest.param(
+            """1   Jacques Chirac (15 Points)    François Mitterrand (13 Points)     No results
+3   Vincent Auriol (13 Points)     René Coty (9 Points)  2 - 1
+6   Valéry Giscard d'Estaing (12 Points)   Charles de Gaulle (12 Points)     No results""",
+            "Some tables are missing: 2, 4 to 5 (2 tables)",
+            id="several gaps",
+        ),
+        pytest.param(
+            "99999999   Jacques Chirac (15 Points)    François Mitterrand (13 Points)",
+            "Table number is too large (maximum is 100000): "
+            "99999999   Jacques Chirac (15 Points)    François Mitterrand (13 Points)",
+            id="absurd table number",
+        ),
+        pytest.param(
+            f"{'9' * 5000}   Jacques Chirac (15 Points)    BYE",
+            "Table number is too large",
+            id="absurd table number too long to be converted",
+        ),
+    ],
+)
+def test_parse_pairings_error_message(pairings_input, expected_message):
+    with pytest.raises(ParsePairingException, match=re.escape(expected_message)):
+        parse_pairings(pairings_input)
+
+
+def test_iter_pairings_keeps_input_order():
+    pairings_input = """Table   Player 1    Player 2    Match Results
+2   Vincent Auriol (13 Points)     René Coty (9 Points)  2 - 1
+
+1   Jacques Chirac (15 Points)    BYE   2 - 0"""
+
+    assert list(iter_pairings(pairings_input)) == [
+        Table(
+            number=2,
+            player_1=Player(name="Vincent Auriol", points=13),
+            player_2=Player(name="René Coty", points=9),
+        ),
+        Table(
+            number=1,
+            player_1=Player(name="Jacques Chirac", points=15),
+            player_2=Player(name="* * * BYE * * *", points=0),
+        ),
+    ]
+
+
+def test_parse_round_results():
+    results = parse_round_results(
+        """Table   Player 1    Player 2    Match Results
+1   Jacques Chirac (15 Points)    François Mitterrand (13 Points)     No results
+3   Vincent Auriol (13 Points)     René Coty (9 Points)  1 - 1 - 1
+2   Charles de Gaulle (12 Points)     Georges Pompidou (12 Points)  2 - 1
+4   Alain Poher (0 Points)    BYE"""
+    )
+
+    assert [table.number for table in results.pairings] == [1, 2, 3, 4]
+    assert [results.get_result(idx) for idx in range(4)] == [
+        None,
+        (2, 1, 0),
+        (1, 1, 1),
+        # The bye is always won
+        (2, 0, 0),
+    ]
+    assert results.get_outstanding_tables() == [results.pairings[0]]
+
+
+def test_parse_round_results_validates_pairings():
+    with pytest.raises(ParsePairingException, match="Some tables are missing: 2"):
+        parse_round_results(
+            """1   Jacques Chirac (15 Points)    François Mitterrand (13 Points)     2 - 0
+3   Vincent Auriol (13 Points)     René Coty (9 Points)  No results"""
+        )
+
+
+def test_parse_pairings_from_file():
+    pairings_input = io.StringIO(
+        """2   Vincent Auriol (13 Points)     René Coty (9 Points)  2 - 1
+1   Jacques Chirac (15 Points)    François Mitterrand (13 Points)     No results
+"""
+    )
+
+    assert [table.number for table in parse_pairings(pairings_input)] == [1, 2]
+
+
 @pytest.mark.parametrize(
     "pairings, first_table_number, pairings_by_name",
     [
@@ -457,6 +558,73 @@ def test_get_pairings_by_name(pairings, first_table_number, pairings_by_name):
     )
 
 
+# Any of them collates names like a dictionary would, unlike the C locale
+COLLATE_LOCALES = ["en_US.UTF-8", "fr_FR.UTF-8", "de_DE.UTF-8"]
+
+
+@pytest.fixture
+def collate_locale():
+    previous_locale = locale.setlocale(locale.LC_COLLATE)
+    for collate_locale in COLLATE_LOCALES:
+        try:
+            locale.setlocale(locale.LC_COLLATE, collate_locale)
+        except locale.Error:
+            continue
+        break
+    else:
+        pytest.skip(f"None of {COLLATE_LOCALES} is available")
+
+    yield collate_locale
+    locale.setlocale(locale.LC_COLLATE, previous_locale)
+
+
+def _get_names_by_name(pairings, **kwargs):
+    return [table.player_1.name for table in get_pairings_by_name(pairings, **kwargs)]
+
+
+LOCALE_PAIRINGS = [
+    Table(
+        number=1,
+        player_1=Player(name="Pierre Messmer", points=0),
+        player_2=Player(name="Øystein Ore", points=0),
+    ),
+    Table(
+        number=2,
+        player_1=Player(name="Xavier Bertrand", points=0),
+        player_2=Player(name="Olivier Dussopt", points=0),
+    ),
+]
+
+
+def test_get_pairings_by_name_locale_aware(collate_locale):
+    # `Ø` can't be stripped of its accent, it's simply dropped by default
+    assert _get_names_by_name(LOCALE_PAIRINGS) == [
+        "Olivier Dussopt",
+        "Pierre Messmer",
+        "Xavier Bertrand",
+        "Øystein Ore",
+    ]
+    assert _get_names_by_name(LOCALE_PAIRINGS, locale_aware=True) == [
+        "Olivier Dussopt",
+        "Øystein Ore",
+        "Pierre Messmer",
+        "Xavier Bertrand",
+    ]
+
+
+def test_get_pairings_by_name_locale_changed(collate_locale):
+    _get_names_by_name(LOCALE_PAIRINGS, locale_aware=True)
+
+    # Keys computed under the previous locale are not reused
+    locale.setlocale(locale.LC_COLLATE, "C")
+    assert _get_names_by_name(LOCALE_PAIRINGS, locale_aware=True) == [
+        "Olivier Dussopt",
+        "Pierre Messmer",
+        "Xavier Bertrand",
+        "Øystein Ore",
+    ]
+
+
 @pytest.mark.parametrize(
     "standings_input, expected_output",
     [
@@ -639,6 +807,46 @@ def test_parse_standings(standings_input, expected_output):
         assert parse_standings(standings_input) == expected_output
 
 
+@pytest.mark.parametrize(
+    "standings_input, expected_message",
+    [
+        pytest.param(
+            """1  Jacques Chirac    15  5 - 0   68.0000%    71.4285%    58.0696%
+150000  René Coty    15  5 - 0   68.0000%    71.4285%    58.0696%""",
+            "Some positions are missing: 2 to 149999 (149998 positions)",
+            id="huge gap",
+        ),
+        pytest.param(
+            "1  Jacques Chirac    15  5 - 0   68.0000%    71.4285%    58.0696%\n"
+            "99999999  René Coty    15  5 - 0   68.0000%    71.4285%    58.0696%",
+            "Position is too large (maximum is 200000)",
+            id="absurd position",
+        ),
+    ],
+)
+def test_parse_standings_error_message(standings_input, expected_message):
+    with pytest.raises(ParseStandingException, match=re.escape(expected_message)):
+        parse_standings(standings_input)
+
+
+def test_parse_standings_shares_strings():
+    first_standing, second_standing = parse_standings(
+        """1   Jacques Chirac    9   3 - 0   59.2592%    85.7142%    57.9365%
+2   René Coty     9   3 - 0   48.1481%    83.3333%    41.2698%"""
+    )
+
+    assert first_standing.record == second_standing.record == "3 - 0"
+    assert first_standing.record is second_standing.record
+
+
+def test_player_has_no_dict():
+    player = parse_pairings("1   Jacques Chirac (15 Points)    BYE   2 - 0")[0].player_1
+
+    assert not hasattr(player, "__dict__")
+    assert player.name == "Jacques Chirac"
+    assert not player.is_bye
+
+
 @pytest.mark.parametrize(
     "min_table_nb, max_table_nb, first_table_number, expected_table_numbers",
     [
@@ -760,3 +968,93 @@ def test_sort_pairings_for_paper_cutter(
         )
     ]
     assert table_numbers == expected_table_numbers
+
+
+def test_sort_pairings_for_paper_cutter_unsorted_pairings():
+    pairings = [
+        Table(
+            number=idx,
+            player_1=Player(name=f"name_1_{idx}", points=0),
+            player_2=Player(name=f"name_2_{idx}", points=0),
+        )
+        for idx in [3, 1, 6, 2, 5, 4]
+    ]
+
+    sorted_pairings = sort_pairings_for_paper_cutter(pairings, nb_slips_per_page=5)
+    assert [table.number if table else None for table in sorted_pairings] == [
+        *[1, 3, 5, None, None],
+        *[2, 4, 6, None, None],
+    ]
+
+
+def test_tables_view():
+    pairings = [
+        Table(
+            number=idx,
+            player_1=Player(name=f"name_1_{idx}", points=0),
+            player_2=Player(name=f"name_2_{idx}", points=0),
+        )
+        for idx in [1, 2]
+    ]
+
+    pairings_by_name = get_pairings_by_name(pairings)
+    assert len(pairings_by_name) == 4
+    # Tables are not copied when they don't have to be
+    assert pairings_by_name[0] is pairings[0]
+    assert pairings_by_name[2] == Table(
+        number=1, player_1=pairings[0].player_2, player_2=pairings[0].player_1
+    )
+    assert pairings_by_name[1:3] == [pairings[1], pairings_by_name[2]]
+
+    offset_pairings = sort_pairings_for_paper_cutter(
+        pairings, nb_slips_per_page=5, first_table_number=10
+    )
+    assert offset_pairings[0] == pairings[0]._replace(number=10)
+    assert offset_pairings[-1] is None
+    # The original tables were left alone
+    assert pairings[0].number == 1
+
+
+@pytest.mark.parametrize(
+    "nb_tables, nb_slips_per_page, expected_order",
+    [
+        pytest.param(0, 5, (), id="no table"),
+        pytest.param(1, 5, (0, None, None, None, None), id="one slip"),
+        pytest.param(
+            6, 5, (0, 2, 4, None, None, 1, 3, 5, None, None), id="just over one page"
+        ),
+        pytest.param(
+            7, 3, (0, 3, 6, 1, 4, None, 2, 5, None), id="three slips per page"
+        ),
+    ],
+)
+def test_get_paper_cutter_order(nb_tables, nb_slips_per_page, expected_order):
+    assert (
+        get_paper_cutter_order(nb_tables, nb_slips_per_page=nb_slips_per_page)
+        == expected_order
+    )
+
+
+def test_get_paper_cutter_order_many_slips_per_page():
+    # Used to take exponential time in `nb_slips_per_page`
+    order = get_paper_cutter_order(1_000, nb_slips_per_page=50)
+
+    assert len(order) == 1_000
+    assert sorted(order) == list(range(1_000))
+    # The first page has the first table of each of the 20 rows
+    assert order[:3] == (0, 20, 40)
+
+
+def test_get_paper_cutter_order_cache_is_bounded():
+    paper_cutter_seats_cache.clear()
+
+    for nb_slips_per_page in range(1, 11):
+        order = get_paper_cutter_order(
+            MAX_TABLE_NUMBER, nb_slips_per_page=nb_slips_per_page
+        )
+        assert len(order) >= MAX_TABLE_NUMBER
+
+    stats = paper_cutter_seats_cache.stats()
+    assert stats["nb_bytes"] <= PAPER_CUTTER_SEATS_CACHE_MAX_BYTES
+    # The least recently used orders were evicted
+    assert stats["nb_entries"] < 10
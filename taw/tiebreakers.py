@@ -0,0 +1,308 @@
+"""
+Compute standings and their tiebreakers (OMW, GW, OGW) from the pairings and
+results of each round, instead of copying them from AetherHub
+
+See the Magic Tournament Rules, appendix C: match and game win percentages
+have a floor of 33% when computing the opponents' percentages. Results are
+computed like AetherHub does, so that they can be compared with its standings
+
+NumPy is only imported by this module, the web app doesn't load it
+"""
+import math
+from collections import namedtuple
+
+import numpy as np
+
+from taw.utils import RoundResults, Standing
+
+
+MATCH_WIN_POINTS = 3
+MATCH_DRAW_POINTS = 1
+GAME_WIN_POINTS = 3
+# AetherHub doesn't give any point for drawn games
+GAME_DRAW_POINTS = 0
+# AetherHub uses a third, rather than the 0.33 of the MTR
+MIN_PERCENTAGE = 1 / 3
+
+# A bye is a 2-0 win, see `BYE_RESULT`
+BYE_GAMES = (2, 0, 0)
+
+NO_OPPONENT = -1
+
+# One entry per player who played (or had a bye) during a round
+_RoundRecord = namedtuple(
+    "_RoundRecord",
+    ["players", "opponents", "wins", "losses", "draws", "game_points", "nb_games"],
+)
+
+Tiebreakers = namedtuple(
+    "Tiebreakers",
+    ["match_points", "mwp", "omw", "gw", "ogw", "wins", "losses", "draws"],
+)
+
+
+class StandingsEngine:
+    """
+    Per-player records (NumPy arrays, indexed by player) and an opponents
+    matrix (one column per round), built round after round
+
+    Adding or updating a round only applies the difference of that round to
+    the records: there is no need to go over the whole event again
+    """
+
+    def __init__(self, *, nb_players_hint=256, nb_rounds_hint=16):
+        self.player_names = []
+        self._player_indices = {}
+        self._rounds = []
+
+        self._wins = np.zeros(nb_players_hint, dtype=np.int32)
+        self._losses = np.zeros(nb_players_hint, dtype=np.int32)
+        self._draws = np.zeros(nb_players_hint, dtype=np.int32)
+        self._game_points = np.zeros(nb_players_hint, dtype=np.int32)
+        self._nb_games = np.zeros(nb_players_hint, dtype=np.int32)
+        # Opponent of each player during each round, `NO_OPPONENT` for byes,
+        # rounds they didn't play, and tables still playing
+        self._opponents = np.full(
+            (nb_players_hint, nb_rounds_hint), NO_OPPONENT, dtype=np.int32
+        )
+
+        self._tiebreakers = None
+
+    @property
+    def nb_players(self):
+        return len(self.player_names)
+
+    @property
+    def nb_rounds(self):
+        return len(self._rounds)
+
+    def add_round(self, round_results):
+        """Add the next round, `round_results` is a `RoundResults`"""
+        self._rounds.append(None)
+        self.update_round(len(self._rounds) - 1, round_results)
+
+    def update_round(self, round_idx, round_results):
+        """
+        Replace the results of a round, eg. once more results were reported
+        Tables without results are not taken into account
+        """
+        round_record = self._get_round_record(round_results)
+
+        if (previous_round_record := self._rounds[round_idx]) is not None:
+            self._apply(previous_round_record, sign=-1)
+            self._opponents[previous_round_record.players, round_idx] = NO_OPPONENT
+
+        self._apply(round_record, sign=1)
+        self._grow(nb_rounds=round_idx + 1)
+        self._opponents[round_record.players, round_idx] = round_record.opponents
+        self._rounds[round_idx] = round_record
+
+        self._tiebreakers = None
+
+    def _get_player_idx(self, name):
+        player_idx = self._player_indices.get(name)
+        if player_idx is None:
+            player_idx = self._player_indices[name] = len(self.player_names)
+            self.player_names.append(name)
+        return player_idx
+
+    def _get_round_record(self, round_results):
+        pairings = round_results.pairings
+        player_1_indices = np.fromiter(
+            (self._get_player_idx(table.player_1.name) for table in pairings),
+            dtype=np.int32,
+            count=len(pairings),
+        )
+        is_bye = np.fromiter(
+            (table.player_2.is_bye for table in pairings),
+            dtype=bool,
+            count=len(pairings),
+        )
+        player_2_indices = np.fromiter(
+            (
+                NO_OPPONENT
+                if table.player_2.is_bye
+                else self._get_player_idx(table.player_2.name)
+                for table in pairings
+            ),
+            dtype=np.int32,
+            count=len(pairings),
+        )
+        self._grow(nb_players=self.nb_players)
+
+        # The results arrays are used as is, without any copy
+        player_1_games = np.frombuffer(round_results.player_1_wins, dtype=np.int16)
+        player_2_games = np.frombuffer(round_results.player_2_wins, dtype=np.int16)
+        drawn_games = np.frombuffer(round_results.draws, dtype=np.int16)
+
+        reported = player_1_games != RoundResults.NO_RESULT
+        # Byes are always won, even when their result wasn't reported
+        player_1_games = np.where(is_bye, BYE_GAMES[0], player_1_games)
+        player_2_games = np.where(is_bye, BYE_GAMES[1], player_2_games)
+        drawn_games = np.where(is_bye, BYE_GAMES[2], drawn_games)
+        reported |= is_bye
+
+        # Each player of a reported table, from their point of view
+        is_match = reported & ~is_bye
+        players = np.concatenate(
+            [player_1_indices[reported], player_2_indices[is_match]]
+        )
+        opponents = np.concatenate(
+            [player_2_indices[reported], player_1_indices[is_match]]
+        )
+        games_won = np.concatenate(
+            [player_1_games[reported], player_2_games[is_match]]
+        ).astype(np.int32)
+        games_lost = np.concatenate(
+            [player_2_games[reported], player_1_games[is_match]]
+        ).astype(np.int32)
+        games_drawn = np.concatenate(
+            [drawn_games[reported], drawn_games[is_match]]
+        ).astype(np.int32)
+
+        return _RoundRecord(
+            players=players,
+            opponents=opponents,
+            wins=(games_won > games_lost).astype(np.int32),
+            losses=(games_won < games_lost).astype(np.int32),
+            draws=(games_won == games_lost).astype(np.int32),
+            game_points=GAME_WIN_POINTS * games_won + GAME_DRAW_POINTS * games_drawn,
+            nb_games=games_won + games_lost + games_drawn,
+        )
+
+    def _apply(self, round_record, *, sign):
+        # A player only plays once per round, there are no duplicate indices
+        players = round_record.players
+        self._wins[players] += sign * round_record.wins
+        self._losses[players] += sign * round_record.losses
+        self._draws[players] += sign * round_record.draws
+        self._game_points[players] += sign * round_record.game_points
+        self._nb_games[players] += sign * round_record.nb_games
+
+    def _grow(self, *, nb_players=0, nb_rounds=0):
+        """Make room for that many players and rounds, doubling the capacity"""
+        capacity, rounds_capacity = self._opponents.shape
+        if nb_players <= capacity and nb_rounds <= rounds_capacity:
+            return
+
+        new_capacity = max(capacity, 2 ** math.ceil(math.log2(max(nb_players, 1))))
+        new_rounds_capacity = max(
+            rounds_capacity, 2 ** math.ceil(math.log2(max(nb_rounds, 1)))
+        )
+        for attribute in ["_wins", "_losses", "_draws", "_game_points", "_nb_games"]:
+            values = np.zeros(new_capacity, dtype=np.int32)
+            values[:capacity] = getattr(self, attribute)
+            setattr(self, attribute, values)
+
+        opponents = np.full(
+            (new_capacity, new_rounds_capacity), NO_OPPONENT, dtype=np.int32
+        )
+        opponents[:capacity, :rounds_capacity] = self._opponents
+        self._opponents = opponents
+
+    def get_tiebreakers(self):
+        """Return the `Tiebreakers` of each player, as arrays indexed by player"""
+        if self._tiebreakers is not None:
+            return self._tiebreakers
+
+        nb_players = self.nb_players
+        wins = self._wins[:nb_players]
+        losses = self._losses[:nb_players]
+        draws = self._draws[:nb_players]
+        game_points = self._game_points[:nb_players]
+        nb_games = self._nb_games[:nb_players]
+
+        match_points = MATCH_WIN_POINTS * wins + MATCH_DRAW_POINTS * draws
+        nb_matches = wins + losses + draws
+        mwp = _get_percentage(match_points, MATCH_WIN_POINTS * nb_matches)
+        gw = _get_percentage(game_points, GAME_WIN_POINTS * nb_games)
+
+        # Average of the opponents' (floored) percentages
+        opponents = self._opponents[:nb_players, : self.nb_rounds]
+        has_opponent = opponents != NO_OPPONENT
+        opponents = np.where(has_opponent, opponents, 0)
+        nb_opponents = has_opponent.sum(axis=1)
+
+        def get_opponents_average(percentages):
+            floored = np.maximum(percentages, MIN_PERCENTAGE)
+            total = np.where(has_opponent, floored[opponents], 0).sum(axis=1)
+            return _divide(total, nb_opponents)
+
+        self._tiebreakers = Tiebreakers(
+            match_points=match_points,
+            mwp=mwp,
+            omw=get_opponents_average(mwp),
+            gw=gw,
+            ogw=get_opponents_average(gw),
+            wins=wins,
+            losses=losses,
+            draws=draws,
+        )
+        return self._tiebreakers
+
+    def get_standings(self):
+        """
+        Return the standings as `parse_standings` does: `Standing`s ordered by
+        points, then OMW, GW and OGW
+        """
+        tiebreakers = self.get_tiebreakers()
+        # The last key is the primary one
+        order = np.lexsort(
+            (
+                -tiebreakers.ogw,
+                -tiebreakers.gw,
+                -tiebreakers.omw,
+                -tiebreakers.match_points,
+            )
+        )
+
+        # Back to Python objects once, rather than one NumPy scalar at a time
+        match_points = tiebreakers.match_points.tolist()
+        wins = tiebreakers.wins.tolist()
+        losses = tiebreakers.losses.tolist()
+        draws = tiebreakers.draws.tolist()
+        omw = _format_percentages(tiebreakers.omw)
+        gw = _format_percentages(tiebreakers.gw)
+        ogw = _format_percentages(tiebreakers.ogw)
+
+        return [
+            Standing(
+                position=position,
+                player_name=self.player_names[player_idx],
+                nb_points=match_points[player_idx],
+                record=_format_record(
+                    wins[player_idx], losses[player_idx], draws[player_idx]
+                ),
+                omw=omw[player_idx],
+                gw=gw[player_idx],
+                ogw=ogw[player_idx],
+            )
+            for position, player_idx in enumerate(order.tolist(), start=1)
+        ]
+
+
+def _divide(numerators, denominators):
+    """Element-wise division, 0 where there is nothing to divide by"""
+    return np.divide(
+        numerators,
+        denominators,
+        out=np.zeros(len(numerators)),
+        where=denominators != 0,
+    )
+
+
+def _get_percentage(points, max_points):
+    # A player who didn't play yet gets the floor
+    return np.where(max_points != 0, _divide(points, max_points), MIN_PERCENTAGE)
+
+
+def _format_percentages(percentages):
+    # Like AetherHub, truncated to 4 decimals (with some leeway for floats)
+    truncated = np.floor(percentages * 1_000_000 + 1e-6) / 10_000
+    return [f"{percentage:.4f}%" for percentage in truncated.tolist()]
+
+
+def _format_record(wins, losses, draws):
+    if draws:
+        return f"{wins} - {losses} - {draws}"
+    return f"{wins} - {losses}"
@@ -0,0 +1,275 @@
+"""
+Read TrueType fonts, and subset them to the glyphs used by a document
+
+Subsets keep the glyph ids of the whole font (unused glyphs are simply left
+empty), so that text can be written with glyph ids right away, before knowing
+which glyphs the document will use
+"""
+import struct
+from hashlib import sha1
+
+# Tables needed by PDF viewers, see the PDF reference, 5.8 "Embedded Font
+# Programs". The other ones (eg. `cmap`, `kern`) are not used
+SUBSET_TABLES = ["cvt ", "fpgm", "glyf", "head", "hhea", "hmtx", "loca", "maxp", "prep"]
+
+# Flags of the components of composite glyphs
+_ARG_1_AND_2_ARE_WORDS = 0x0001
+_WE_HAVE_A_SCALE = 0x0008
+_MORE_COMPONENTS = 0x0020
+_WE_HAVE_AN_X_AND_Y_SCALE = 0x0040
+_WE_HAVE_A_TWO_BY_TWO = 0x0080
+
+_CHECKSUM_MAGIC = 0xB1B0AFBA
+
+
+class TrueTypeFont:
+    """
+    The metrics, characters and glyphs of a TrueType font
+    Metrics are in thousandths of the font size, like in PDFs
+    """
+
+    def __init__(self, data):
+        self._data = data
+        (nb_tables,) = struct.unpack_from(">H", data, 4)
+        self._tables = {}
+        for idx in range(nb_tables):
+            tag, _, offset, length = struct.unpack_from(">4sIII", data, 12 + 16 * idx)
+            self._tables[tag.decode("latin-1")] = (offset, length)
+
+        head = self._get_table("head")
+        (units_per_em,) = struct.unpack_from(">H", head, 18)
+        self._scale = 1000 / units_per_em
+        self.bbox = [
+            round(value * self._scale) for value in struct.unpack_from(">4h", head, 36)
+        ]
+        (index_to_loc_format,) = struct.unpack_from(">h", head, 50)
+
+        hhea = self._get_table("hhea")
+        ascent, descent = struct.unpack_from(">2h", hhea, 4)
+        self.ascent = round(ascent * self._scale)
+        self.descent = round(descent * self._scale)
+        (nb_h_metrics,) = struct.unpack_from(">H", hhea, 34)
+
+        (self.nb_glyphs,) = struct.unpack_from(">H", self._get_table("maxp"), 4)
+
+        # Glyphs after the last metric have the same advance width
+        advances = struct.unpack_from(f">{nb_h_metrics}I", self._get_table("hmtx"))
+        self._widths = [advance >> 16 for advance in advances]
+        self._widths += [self._widths[-1]] * (self.nb_glyphs - nb_h_metrics)
+
+        loca = self._get_table("loca")
+        if index_to_loc_format == 0:
+            offsets = struct.unpack_from(f">{self.nb_glyphs + 1}H", loca)
+            self._glyph_offsets = [2 * offset for offset in offsets]
+        else:
+            self._glyph_offsets = struct.unpack_from(f">{self.nb_glyphs + 1}I", loca)
+
+        self.postscript_name = self._get_postscript_name()
+        self._glyph_ids = self._get_glyph_ids()
+
+    def get_glyph_id(self, char):
+        """Return the glyph of `char`, or 0 if the font doesn't have it"""
+        return self._glyph_ids.get(ord(char), 0)
+
+    def get_width(self, glyph_id):
+        return round(self._widths[glyph_id] * self._scale)
+
+    def subset(self, glyph_ids):
+        """Return the font file with only the given glyphs (and `.notdef`)"""
+        glyph_ids = self._add_components({0, *glyph_ids})
+
+        glyf = self._get_table("glyf")
+        glyphs = []
+        offsets = [0]
+        for glyph_id in range(self.nb_glyphs):
+            if glyph_id in glyph_ids:
+                start, end = self._glyph_offsets[glyph_id : glyph_id + 2]
+                glyph = glyf[start:end]
+                glyphs.append(glyph + b"\0" * (-len(glyph) % 4))
+                offsets.append(offsets[-1] + len(glyphs[-1]))
+            else:
+                offsets.append(offsets[-1])
+
+        # Long offsets, whatever the original ones
+        head = bytearray(self._get_table("head"))
+        struct.pack_into(">h", head, 50, 1)
+
+        tables = {
+            tag: self._get_table(tag) for tag in SUBSET_TABLES if tag in self._tables
+        }
+        tables.update(
+            {
+                "glyf": b"".join(glyphs),
+                "head": bytes(head),
+                "loca": struct.pack(f">{len(offsets)}I", *offsets),
+            }
+        )
+        return _build_font(tables)
+
+    def _get_table(self, tag):
+        offset, length = self._tables[tag]
+        return self._data[offset : offset + length]
+
+    def _add_components(self, glyph_ids):
+        """Add the glyphs that composite glyphs are made of"""
+        glyf = self._get_table("glyf")
+        to_visit = list(glyph_ids)
+        while to_visit:
+            glyph_id = to_visit.pop()
+            start, end = self._glyph_offsets[glyph_id : glyph_id + 2]
+            if end - start < 10:
+                # An empty glyph, eg. a space
+                continue
+            (nb_contours,) = struct.unpack_from(">h", glyf, start)
+            if nb_contours >= 0:
+                continue
+
+            offset = start + 10
+            while True:
+                flags, component_id = struct.unpack_from(">2H", glyf, offset)
+                if component_id not in glyph_ids:
+                    glyph_ids.add(component_id)
+                    to_visit.append(component_id)
+
+                offset += 4 + (4 if flags & _ARG_1_AND_2_ARE_WORDS else 2)
+                if flags & _WE_HAVE_A_SCALE:
+                    offset += 2
+                elif flags & _WE_HAVE_AN_X_AND_Y_SCALE:
+                    offset += 4
+                elif flags & _WE_HAVE_A_TWO_BY_TWO:
+                    offset += 8
+                if not flags & _MORE_COMPONENTS:
+                    break
+
+        return glyph_ids
+
+    def _get_glyph_ids(self):
+        """Map code points to glyphs, from the Unicode `cmap` subtable"""
+        cmap = self._get_table("cmap")
+        (nb_subtables,) = struct.unpack_from(">H", cmap, 2)
+        subtables = {}
+        for idx in range(nb_subtables):
+            platform_id, encoding_id, offset = struct.unpack_from(
+                ">HHI", cmap, 4 + 8 * idx
+            )
+            subtables[platform_id, encoding_id] = offset
+
+        # The full Unicode range if there is one, the BMP otherwise
+        if (offset := subtables.get((3, 10))) is not None:
+            return _parse_cmap_format_12(cmap, offset)
+        return _parse_cmap_format_4(cmap, subtables[3, 1])
+
+    def _get_postscript_name(self):
+        name = self._get_table("name")
+        nb_records, strings_offset = struct.unpack_from(">2H", name, 2)
+        for idx in range(nb_records):
+            platform_id, _, _, name_id, length, offset = struct.unpack_from(
+                ">6H", name, 6 + 12 * idx
+            )
+            if name_id == 6:
+                value = name[strings_offset + offset : strings_offset + offset + length]
+                return value.decode("utf-16-be" if platform_id == 3 else "latin-1")
+
+        return "Font"
+
+
+def get_subset_tag(glyph_ids):
+    """
+    Six uppercase letters, to prefix the name of a subset with: PDF viewers
+    must not mistake two subsets of the same font for each other
+    """
+    digest = sha1(repr(sorted(glyph_ids)).encode()).digest()
+    return "".join(chr(ord("A") + byte % 26) for byte in digest[:6])
+
+
+def _parse_cmap_format_4(cmap, offset):
+    (nb_segments_x2,) = struct.unpack_from(">H", cmap, offset + 6)
+    nb_segments = nb_segments_x2 // 2
+    end_codes_offset = offset + 14
+    start_codes_offset = end_codes_offset + nb_segments_x2 + 2
+    deltas_offset = start_codes_offset + nb_segments_x2
+    range_offsets_offset = deltas_offset + nb_segments_x2
+
+    end_codes = struct.unpack_from(f">{nb_segments}H", cmap, end_codes_offset)
+    start_codes = struct.unpack_from(f">{nb_segments}H", cmap, start_codes_offset)
+    deltas = struct.unpack_from(f">{nb_segments}h", cmap, deltas_offset)
+    range_offsets = struct.unpack_from(f">{nb_segments}H", cmap, range_offsets_offset)
+
+    glyph_ids = {}
+    for idx in range(nb_segments):
+        for code in range(start_codes[idx], end_codes[idx] + 1):
+            if code == 0xFFFF:
+                continue
+            if range_offsets[idx] == 0:
+                glyph_id = (code + deltas[idx]) % 65536
+            else:
+                # Relative to the range offset itself
+                glyph_offset = (
+                    range_offsets_offset
+                    + 2 * idx
+                    + range_offsets[idx]
+                    + 2 * (code - start_codes[idx])
+                )
+                (glyph_id,) = struct.unpack_from(">H", cmap, glyph_offset)
+                if glyph_id:
+                    glyph_id = (glyph_id + deltas[idx]) % 65536
+            if glyph_id:
+                glyph_ids[code] = glyph_id
+
+    return glyph_ids
+
+
+def _parse_cmap_format_12(cmap, offset):
+    (nb_groups,) = struct.unpack_from(">I", cmap, offset + 12)
+    glyph_ids = {}
+    for idx in range(nb_groups):
+        start_code, end_code, start_glyph_id = struct.unpack_from(
+            ">3I", cmap, offset + 16 + 12 * idx
+        )
+        for code in range(start_code, end_code + 1):
+            glyph_ids[code] = start_glyph_id + code - start_code
+
+    return glyph_ids
+
+
+def _build_font(tables):
+    """The font file with the given tables, see the TrueType reference"""
+    nb_tables = len(tables)
+    entry_selector = nb_tables.bit_length() - 1
+    search_range = 16 * 2**entry_selector
+    header = struct.pack(
+        ">I4H",
+        0x00010000,
+        nb_tables,
+        search_range,
+        entry_selector,
+        16 * nb_tables - search_range,
+    )
+
+    records = []
+    data = []
+    offset = len(header) + 16 * nb_tables
+    for tag, table in sorted(tables.items()):
+        if tag == "head":
+            # Computed once the whole font is there
+            table = table[:8] + b"\0\0\0\0" + table[12:]
+            head_offset = offset
+        records.append(
+            struct.pack(
+                ">4s3I", tag.encode("latin-1"), _get_checksum(table), offset, len(table)
+            )
+        )
+        table += b"\0" * (-len(table) % 4)
+        data.append(table)
+        offset += len(table)
+
+    font = bytearray(header + b"".join(records) + b"".join(data))
+    struct.pack_into(
+        ">I", font, head_offset + 8, (_CHECKSUM_MAGIC - _get_checksum(font)) % 2**32
+    )
+    return bytes(font)
+
+
+def _get_checksum(data):
+    data = bytes(data) + b"\0" * (-len(data) % 4)
+    return sum(struct.unpack(f">{len(data) // 4}I", data)) % 2**32
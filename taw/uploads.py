@@ -0,0 +1,190 @@
+import base64
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from collections import namedtuple
+from functools import lru_cache
+
+
+# The same logo is uploaded every round, for every action: logos are stored
+# by content, so that each of them is only written once. They're all
+# normalized, see `_normalize_logo`
+LOGO_FILENAME_PREFIX = "taw-logo-"
+NORMALIZED_LOGO_EXTENSION = ".jpg"
+re_logo_filename = re.compile(
+    rf"^{LOGO_FILENAME_PREFIX}[0-9a-f]{{64}}{re.escape(NORMALIZED_LOGO_EXTENSION)}$"
+)
+
+# Logos are served under their content hash, they never change
+LOGOS_MAX_AGE_CACHE_CONTROL = 365 * 24 * 60 * 60
+
+# Eviction policy, the uploads folder lives on the function's ephemeral disk
+LOGOS_MAX_AGE = 24 * 60 * 60
+LOGOS_MAX_BYTES = 64 * 1024 * 1024
+EVICTION_INTERVAL = 60
+
+CHUNK_SIZE = 64 * 1024
+
+# Logos are printed 50px high on match slips, 100px high on pairings and
+# standings: that's enough pixels for a sharp print
+LOGO_HEIGHT = 200
+LOGO_MAX_WIDTH = 10 * LOGO_HEIGHT
+LOGO_JPEG_QUALITY = 85
+
+
+def save_logo(file_storage, *, folder):
+    """
+    Save the uploaded logo under a name derived from its content, and return
+    that name. Identical logos are only written and normalized once.
+
+    Return None if the logo could not be decoded (eg. SVGs): only normalized
+    logos are served, whatever the browser would make of the others
+    """
+    digest = hashlib.sha256()
+    f = tempfile.NamedTemporaryFile(
+        dir=folder, prefix=f".{LOGO_FILENAME_PREFIX}", delete=False
+    )
+    # The temporary file never matches `re_logo_filename`, eviction would not
+    # remove it: it's removed here once the logo is stored, or on any error
+    try:
+        with f:
+            while chunk := file_storage.stream.read(CHUNK_SIZE):
+                digest.update(chunk)
+                f.write(chunk)
+
+        filename = (
+            f"{LOGO_FILENAME_PREFIX}{digest.hexdigest()}{NORMALIZED_LOGO_EXTENSION}"
+        )
+        path = os.path.join(folder, filename)
+        if os.path.exists(path):
+            # The logo is still in use, see `evict_logos`
+            os.utime(path)
+            return filename
+
+        if _normalize_logo(f.name, path):
+            return filename
+        return None
+    finally:
+        _remove_temporary_file(f.name)
+
+
+def _normalize_logo(source_path, destination_path):
+    """
+    Decode the logo once, downscale it to `LOGO_HEIGHT` and recompress it as
+    a JPEG, on a white background (that's the color of the paper)
+    Return False if the logo could not be decoded
+    """
+    # Pillow takes a while to import, cold starts don't need it
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        with Image.open(source_path) as image:
+            # Keeps the aspect ratio, and only decodes JPEGs at the size we need
+            image.thumbnail((LOGO_MAX_WIDTH, LOGO_HEIGHT), Image.LANCZOS)
+            image = image.convert("RGBA")
+    except (UnidentifiedImageError, Image.DecompressionBombError, OSError):
+        return False
+
+    normalized = Image.new("RGB", image.size, "white")
+    normalized.paste(image, mask=image)
+
+    # Don't let other workers read a half-written logo
+    f = tempfile.NamedTemporaryFile(
+        dir=os.path.dirname(destination_path),
+        prefix=f".{LOGO_FILENAME_PREFIX}",
+        delete=False,
+    )
+    try:
+        with f:
+            normalized.save(f, format="JPEG", quality=LOGO_JPEG_QUALITY, optimize=True)
+        os.replace(f.name, destination_path)
+    finally:
+        _remove_temporary_file(f.name)
+
+    return True
+
+
+def _remove_temporary_file(path):
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        # It was moved to its final name
+        pass
+
+
+EmbeddedLogo = namedtuple("EmbeddedLogo", ["jpeg", "width", "height"])
+
+
+@lru_cache(maxsize=32)
+def get_embedded_logo(path):
+    """
+    Return the normalized logo, to be embedded once in a document instead of
+    being referenced by every match slip, or None if it can't be read
+    Logos are stored by content, the file behind a given path never changes
+    """
+    from PIL import Image, UnidentifiedImageError
+
+    try:
+        with open(path, "rb") as f:
+            jpeg = f.read()
+        with Image.open(path) as image:
+            width, height = image.size
+    except (UnidentifiedImageError, OSError):
+        # eg. evicted since, see `evict_logos`
+        return None
+
+    return EmbeddedLogo(jpeg=jpeg, width=width, height=height)
+
+
+def get_data_uri(embedded_logo):
+    return "data:image/jpeg;base64," + base64.b64encode(embedded_logo.jpeg).decode()
+
+
+_eviction_lock = threading.Lock()
+_last_eviction = None
+
+
+def maybe_evict_logos(*, folder):
+    """Run `evict_logos`, at most once every `EVICTION_INTERVAL` seconds"""
+    global _last_eviction
+
+    with _eviction_lock:
+        now = time.monotonic()
+        if _last_eviction is not None and now - _last_eviction < EVICTION_INTERVAL:
+            return
+        _last_eviction = now
+
+    evict_logos(folder=folder)
+
+
+def evict_logos(*, folder, max_age=LOGOS_MAX_AGE, max_bytes=LOGOS_MAX_BYTES):
+    """
+    Remove logos which were not uploaded in the last `max_age` seconds, then
+    the least recently uploaded ones until they fit in `max_bytes`
+    Other files of the folder are left alone
+    """
+    logos = []
+    with os.scandir(folder) as entries:
+        for entry in entries:
+            if re_logo_filename.match(entry.name) and entry.is_file():
+                stat = entry.stat()
+                logos.append((stat.st_mtime, stat.st_size, entry.path))
+
+    # Least recently uploaded first
+    logos.sort()
+
+    now = time.time()
+    nb_bytes = sum(size for _, size, _ in logos)
+    for mtime, size, path in logos:
+        if now - mtime <= max_age and nb_bytes <= max_bytes:
+            break
+
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            # Another worker got there first
+            pass
+        nb_bytes -= size
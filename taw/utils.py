@@ -1,10 +1,16 @@
+import locale
 import math
 import re
+import sys
 import unicodedata
-from collections import Counter, namedtuple
-from itertools import zip_longest
-from operator import itemgetter
-
+from array import array
+from collections import namedtuple
+from collections.abc import Sequence
+from functools import lru_cache
+from itertools import compress
+from operator import attrgetter, itemgetter
+
+from taw.cache import paper_cutter_seats_cache
 from taw.exceptions import ParsePairingException, ParseStandingException
 
 
@@ -13,8 +19,15 @@ Table = namedtuple("Table", ["number", "player_1", "player_2"])
 
 BYE_STRING = "* * * BYE * * *"
 
+# Anything above that is a typo in the input, not an actual tournament
+MAX_TABLE_NUMBER = 100_000
+MAX_POSITION = 2 * MAX_TABLE_NUMBER
+
 
 class Player(namedtuple("Player", ["name", "points"])):
+    # Otherwise each player gets its own `__dict__`
+    __slots__ = ()
+
     @property
     def is_bye(self):
         return self.name == BYE_STRING
@@ -26,42 +39,28 @@ def parse_pairings(pairings_input):
     Pairings are represented by a list of `Table`s, ordered by table number
     Each `Table` is a namedtuple, containing the table number and two `Player`s
     Each `Player` is a namedtuple, with a name and a positive number of poitns
+    The input can be a string or a file-like object, see `iter_pairings`
     """
 
-    pairings = []
-    for pairing_line in pairings_input.split("\n"):
-        pairing = _parse_pairing(pairing_line)
-        # _parse_pairing will return None in some cases (eg. blank line)
-        if pairing:
-            pairings.append(pairing)
-
     # Sort by table number
-    pairings = sorted(pairings, key=itemgetter(0))
+    pairings = sorted(iter_pairings(pairings_input), key=itemgetter(0))
+    _check_table_numbers(pairings)
 
-    if not pairings:
-        return pairings
+    return pairings
+
+
+def _check_table_numbers(sorted_pairings):
+    if not sorted_pairings:
+        return
 
-    # Make sure no table is missing
-    table_numbers = Counter([pairing.number for pairing in pairings])
-    min_table_number = min(table_numbers.keys())
-    max_table_number = max(table_numbers.keys())
-    missing_tables = set(range(min_table_number, max_table_number + 1)) - set(
-        table_numbers.keys()
+    # Make sure no table is missing, and that we don't have duplicate tables
+    missing_tables, duplicate_table_numbers = _find_gaps_and_duplicates(
+        pairing.number for pairing in sorted_pairings
     )
     if missing_tables:
-        missing_tables_str = ", ".join(
-            [str(table_number) for table_number in missing_tables]
-        )
+        missing_tables_str = _format_gaps(missing_tables, noun="tables")
         raise ParsePairingException(f"Some tables are missing: {missing_tables_str}")
 
-    # Make sure we don't have duplicate tables
-    duplicate_table_numbers = sorted(
-        [
-            table_number
-            for table_number, nb_occurrences in table_numbers.items()
-            if nb_occurrences > 1
-        ]
-    )
     if duplicate_table_numbers:
         duplicate_table_numbers_str = ", ".join(
             [str(table_number) for table_number in duplicate_table_numbers]
@@ -70,28 +69,142 @@ def parse_pairings(pairings_input):
             f"Some table numbers are present more than once: {duplicate_table_numbers_str}"
         )
 
-    return pairings
 
+class RoundResults(
+    namedtuple("RoundResults", ["pairings", "player_1_wins", "player_2_wins", "draws"])
+):
+    """
+    Results of a round: the number of games won by each player and drawn, as
+    arrays indexed like `pairings` (ie. ordered by table number), with
+    `NO_RESULT` for the tables which are still playing
+    """
+
+    __slots__ = ()
+
+    NO_RESULT = -1
+
+    @classmethod
+    def for_pairings(cls, pairings):
+        """Results of the round before any of them was reported"""
+        no_results = array("h", [cls.NO_RESULT]) * len(pairings)
+        return cls(
+            pairings=pairings,
+            player_1_wins=no_results,
+            player_2_wins=array("h", no_results),
+            draws=array("h", no_results),
+        )
+
+    def get_result(self, idx):
+        """Return `(player_1_wins, player_2_wins, draws)`, or None if unknown"""
+        if self.player_1_wins[idx] == self.NO_RESULT:
+            return None
+
+        return self.player_1_wins[idx], self.player_2_wins[idx], self.draws[idx]
+
+    def get_outstanding_tables(self):
+        """Return the tables which are still playing, in a single pass"""
+        return list(
+            compress(self.pairings, map(self.NO_RESULT.__eq__, self.player_1_wins))
+        )
+
+
+# A bye is a win, even when AetherHub doesn't say so
+BYE_RESULT = (2, 0, 0)
+
+
+def parse_round_results(pairings_input):
+    """
+    Parse the pairings input like `parse_pairings`, and return the results
+    already reported in it, see `RoundResults`
+    """
+    strings = {}
+    parsed_lines = sorted(
+        filter(
+            None,
+            (
+                _parse_pairing_line(pairing_line, strings=strings)
+                for pairing_line in _iter_lines(pairings_input)
+            ),
+        ),
+        key=lambda parsed_line: parsed_line[0].number,
+    )
+    pairings = [table for table, _ in parsed_lines]
+    _check_table_numbers(pairings)
+
+    results = RoundResults.for_pairings(pairings)
+    for idx, (table, result) in enumerate(parsed_lines):
+        if table.player_2.is_bye:
+            result = result or BYE_RESULT
+        if result is not None:
+            (
+                results.player_1_wins[idx],
+                results.player_2_wins[idx],
+                results.draws[idx],
+            ) = result
+
+    return results
+
+
+def iter_pairings(pairings_input):
+    """
+    Lazily parse the pairings input, one line at a time, and yield `Table`s
+    in the order they appear in the input. Tables are neither sorted nor
+    validated, use `parse_pairings` for that.
+    `pairings_input` is either a string or a file-like object opened in text mode
+    """
+    # Each distinct name / record is only stored once per dump
+    strings = {}
+    for pairing_line in _iter_lines(pairings_input):
+        parsed_line = _parse_pairing_line(pairing_line, strings=strings)
+        # _parse_pairing_line will return None in some cases (eg. blank line)
+        if parsed_line:
+            yield parsed_line[0]
+
+
+def _iter_lines(input_):
+    # File-like objects already iterate over their lines
+    if not isinstance(input_, str):
+        yield from input_
+        return
+
+    # Don't build the whole list of lines like `str.split` would
+    start = 0
+    while (end := input_.find("\n", start)) != -1:
+        yield input_[start:end]
+        start = end + 1
+    yield input_[start:]
+
+
+re_pairing_header = r"Table\s+Player 1\s+Player 2\s+Match Results"
 
 re_pairing = (
-    r"^(?P<table_number>[0-9]+)\s+"
+    r"(?P<table_number>[0-9]+)\s+"
     r"(?P<player_1_name>[^(]+)\s"
     r"\((?P<player_1_nb_points>[\d]+)\sPoints\)\s*"
+    # Either a "normal" pairing, or a "BYE" pairing
+    r"(?:"
     r"(?P<player_2_name>[^(]+)\s"
-    r"\((?P<player_2_nb_points>[\d]+)\sPoints\).*"
+    r"\((?P<player_2_nb_points>[\d]+)\sPoints\)"
+    r"|(?P<bye>BYE)"
+    r")"
+    # Then the result, if it was reported: games won by each player, and drawn
+    r"(?:\s+(?:No results|"
+    r"(?P<player_1_wins>[0-9]{1,3})\s*-\s*(?P<player_2_wins>[0-9]{1,3})"
+    r"(?:\s*-\s*(?P<draws>[0-9]{1,3}))?"
+    r"))?"
 )
 
-re_pairing_bye = (
-    r"^(?P<table_number>[0-9]+)\s+"
-    r"(?P<player_1_name>[^(]+)\s"
-    r"\((?P<player_1_nb_points>[\d]+)\sPoints\)\s*"
-    r"BYE.*"
+# A single pattern to classify each line: either the header, or a pairing
+re_pairing_line = re.compile(
+    rf"(?P<header>{re_pairing_header})|{re_pairing}",
 )
 
-re_pairing_header = r"Table\s+Player 1\s+Player 2\s+Match Results"
-
 
-def _parse_pairing(pairing_line):
+def _parse_pairing_line(pairing_line, *, strings=None):
+    """
+    Return the `Table` of the line and its result (see `RoundResults.get_result`),
+    or None for lines without any pairing
+    """
     # Strip extraneous spaces
     pairing_line = pairing_line.strip()
 
@@ -99,49 +212,119 @@ def _parse_pairing(pairing_line):
     if not pairing_line:
         return None
 
-    # Ignore the header
-    result = re.match(re_pairing_header, pairing_line)
+    result = re_pairing_line.match(pairing_line)
     if result:
-        return None
+        # Ignore the header
+        if result["header"]:
+            return None
 
-    # Try to match to "normal" pairing re
-    result = re.match(re_pairing, pairing_line)
-    if result:
-        group_dict = result.groupdict()
-        return Table(
-            number=int(group_dict["table_number"]),
-            player_1=Player(
-                name=group_dict["player_1_name"],
-                points=int(group_dict["player_1_nb_points"]),
-            ),
-            player_2=Player(
-                name=group_dict["player_2_name"],
-                points=int(group_dict["player_2_nb_points"]),
-            ),
+        table_number = _parse_bounded_number(
+            result["table_number"], max_value=MAX_TABLE_NUMBER
         )
+        if table_number is None:
+            raise ParsePairingException(
+                f"Table number is too large (maximum is {MAX_TABLE_NUMBER}): {pairing_line}"
+            )
 
-    # Try to match to "BYE" pairing re
-    result = re.match(re_pairing_bye, pairing_line)
-    if result:
-        group_dict = result.groupdict()
-        return Table(
-            number=int(group_dict["table_number"]),
-            player_1=Player(
-                name=group_dict["player_1_name"],
-                points=int(group_dict["player_1_nb_points"]),
-            ),
-            player_2=Player(
+        player_1 = Player(
+            name=_intern(strings, result["player_1_name"]),
+            points=int(result["player_1_nb_points"]),
+        )
+        if result["bye"]:
+            player_2 = Player(
                 name=BYE_STRING,
                 points=0,
-            ),
+            )
+        else:
+            player_2 = Player(
+                name=_intern(strings, result["player_2_name"]),
+                points=int(result["player_2_nb_points"]),
+            )
+
+        table = Table(
+            number=table_number,
+            player_1=player_1,
+            player_2=player_2,
         )
 
+        match_result = None
+        if result["player_1_wins"] is not None:
+            match_result = (
+                int(result["player_1_wins"]),
+                int(result["player_2_wins"]),
+                int(result["draws"] or 0),
+            )
+
+        return table, match_result
+
     # Welp, we tried peeps
     raise ParsePairingException(
         f"Could not parse the following pairing: {pairing_line}"
     )
 
 
+def _intern(strings, string):
+    """
+    Return the copy of `string` from the `strings` table, a plain dict shared
+    by all the lines of a dump, and add it there if it's the first one
+    """
+    if strings is None:
+        return string
+
+    return strings.setdefault(string, string)
+
+
+def _parse_bounded_number(number_str, *, max_value):
+    """
+    Return the number, or None if it is greater than `max_value`
+    Very long strings are not even converted, `int` would choke on them
+    """
+    if len(number_str) > len(str(max_value)):
+        return None
+
+    number = int(number_str)
+    if number > max_value:
+        return None
+
+    return number
+
+
+def _find_gaps_and_duplicates(sorted_numbers):
+    """
+    Single pass over sorted numbers, returning the gaps as a list of
+    `(first_missing, last_missing)` tuples and the duplicate numbers
+    Missing numbers are never materialised, a huge gap is still a single tuple
+    """
+    gaps = []
+    duplicates = []
+
+    previous_number = None
+    for number in sorted_numbers:
+        if previous_number is not None:
+            if number == previous_number:
+                # A number present three times should only be reported once
+                if not duplicates or duplicates[-1] != number:
+                    duplicates.append(number)
+            elif number > previous_number + 1:
+                gaps.append((previous_number + 1, number - 1))
+
+        previous_number = number
+
+    return gaps, duplicates
+
+
+def _format_gaps(gaps, *, noun):
+    gaps_str = []
+    for first_missing, last_missing in gaps:
+        if first_missing == last_missing:
+            gaps_str.append(str(first_missing))
+        else:
+            nb_missing = last_missing - first_missing + 1
+            gaps_str.append(f"{first_missing} to {last_missing} ({nb_missing} {noun})")
+
+    return ", ".join(gaps_str)
+
+
 def _remove_accents(input_str):
     """
     See https://github.com/pmourlanne/taw/issues/17
@@ -151,32 +334,126 @@ def _remove_accents(input_str):
     return only_ascii
 
 
-def get_pairings_by_name(pairings, *, first_table_number=None):
+# Player names come back every round, and for every action (pairings, match
+# slips, ...), so collation keys are only computed once per process
+COLLATION_KEYS_CACHE_SIZE = 16_384
+
+
+@lru_cache(maxsize=COLLATION_KEYS_CACHE_SIZE)
+def _get_collation_key(name):
+    return _remove_accents(name.lower())
+
+
+@lru_cache(maxsize=COLLATION_KEYS_CACHE_SIZE)
+def _get_locale_collation_key(name, collate_locale):
+    # Keys depend on the `LC_COLLATE` locale category when they are computed:
+    # `collate_locale` is only there so that keys computed under another
+    # locale are not reused
+    return locale.strxfrm(name)
+
+
+class TablesView(Sequence):
+    """
+    Read-only sequence of tables, reordered, mirrored and offset, without
+    copying them. Each item is given by its "seat" in `tables`:
+    `2 * table_idx` for a table as is, `2 * table_idx + 1` for the same table
+    seen from player 2 (players are swapped), and `EMPTY_SEAT` for `None`
+
+    `Table`s are only built when they are accessed, and only if they differ
+    from the original ones (mirrored, or with a table number offset)
+    """
+
+    __slots__ = ("_tables", "_seats", "_table_number_offset")
+
+    EMPTY_SEAT = -1
+
+    def __init__(self, tables, seats, *, table_number_offset=0):
+        self._tables = tables
+        # An `array`, a lot more compact than a list of ints
+        self._seats = seats
+        self._table_number_offset = table_number_offset
+
+    def __len__(self):
+        return len(self._seats)
+
+    def __getitem__(self, idx):
+        if isinstance(idx, slice):
+            return TablesView(
+                self._tables,
+                self._seats[idx],
+                table_number_offset=self._table_number_offset,
+            )
+
+        return self._get_table(self._seats[idx])
+
+    def __iter__(self):
+        get_table = self._get_table
+        for seat in self._seats:
+            yield get_table(seat)
+
+    def _get_table(self, seat):
+        if seat == self.EMPTY_SEAT:
+            return None
+
+        table = self._tables[seat >> 1]
+        if seat & 1:
+            table = Table(
+                number=table.number, player_1=table.player_2, player_2=table.player_1
+            )
+        if self._table_number_offset:
+            table = table._replace(number=table.number + self._table_number_offset)
+        return table
+
+    def __eq__(self, other):
+        # Compares like the lists of tables it replaces
+        if isinstance(other, (list, tuple, TablesView)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"TablesView({list(self)!r})"
+
+
+def get_pairings_by_name(pairings, *, first_table_number=None, locale_aware=False):
+    """
+    Return each table twice (once for each player), ordered by player name,
+    as a `TablesView` over `pairings`
+    Names are compared without accents and case by default, with
+    `locale_aware`, they are compared according to the current locale
+    """
     # 0 is not a valid first table number so a falsy check is enough,
     # we don't need to explicitly check against `None`
     first_table_number = first_table_number or 1
     table_number_offset = first_table_number - 1
 
-    # Each table must appear twice (once for each player)
-    ret = []
-    for table in pairings:
-        ret.append(
-            Table(
-                number=table.number + table_number_offset,
-                player_1=table.player_1,
-                player_2=table.player_2,
-            ),
-        )
-        ret.append(
-            Table(
-                number=table.number + table_number_offset,
-                player_1=table.player_2,
-                player_2=table.player_1,
-            ),
-        )
+    # Each table must appear twice (once for each player): we sort seats,
+    # see `TablesView`, the mirrored tables are only built when accessed
+    def get_seat_player_name(seat):
+        table = pairings[seat >> 1]
+        return table.player_2.name if seat & 1 else table.player_1.name
 
     # Pairings should then be ordered by player name
-    return sorted(ret, key=lambda table: _remove_accents(table.player_1.name.lower()))
+    if locale_aware:
+        collate_locale = locale.setlocale(locale.LC_COLLATE)
+
+        def get_collation_key(name):
+            return _get_locale_collation_key(name, collate_locale)
+
+    else:
+        get_collation_key = _get_collation_key
+    seats = sorted(
+        range(2 * len(pairings)),
+        key=lambda seat: get_collation_key(get_seat_player_name(seat)),
+    )
+    return TablesView(
+        pairings, array("l", seats), table_number_offset=table_number_offset
+    )
+
+
+# Match slips printed on each page, see `sort_pairings_for_paper_cutter`
+NB_SLIPS_PER_PAGE = 5
 
 
 def sort_pairings_for_paper_cutter(
@@ -217,62 +494,68 @@ def sort_pairings_for_paper_cutter(
     first_table_number = first_table_number or 1
     table_number_offset = first_table_number - 1
 
-    if table_number_offset:
-        # Offset the tables before manipulating anything
-        original_pairings = pairings
-        pairings = []
-        for original_pairing in original_pairings:
-            pairings.append(
-                original_pairing._replace(
-                    number=original_pairing.number + table_number_offset
+    # Layout only depends on the number of tables, we'll come back to pairings
+    # after: only indices are sorted, the offset is added when tables are accessed
+    seats = _get_paper_cutter_seats(len(pairings), nb_slips_per_page=nb_slips_per_page)
+
+    # Parsed pairings are already sorted by table number
+    table_numbers = list(map(attrgetter("number"), pairings))
+    if table_numbers != sorted(table_numbers):
+        table_indices = sorted(range(len(pairings)), key=table_numbers.__getitem__)
+        seats = array(
+            "l",
+            [
+                2 * table_indices[seat >> 1] if seat != TablesView.EMPTY_SEAT else seat
+                for seat in seats
+            ],
+        )
+
+    return TablesView(pairings, seats, table_number_offset=table_number_offset)
+
+
+def _get_paper_cutter_seats(nb_tables, *, nb_slips_per_page):
+    """
+    `get_paper_cutter_order` as seats of a `TablesView`. The result only
+    depends on its arguments, so it is cached, and shared between the views:
+    they never modify it
+
+    Rows of the "matrix" described in `sort_pairings_for_paper_cutter` are
+    filled one after the other, and each of them holds up to `nb_pages`
+    tables: the table at row `row_idx` of page `page_idx` is simply the table
+    at index `row_idx * nb_pages + page_idx`, if there are enough tables for
+    it.
+    """
+    cache_key = (nb_tables, nb_slips_per_page)
+    seats = paper_cutter_seats_cache.get(cache_key)
+    if seats is None:
+        nb_pages = math.ceil(nb_tables / nb_slips_per_page)
+        seats = array(
+            "l",
+            [
+                2 * table_idx if table_idx < nb_tables else TablesView.EMPTY_SEAT
+                for page_idx in range(nb_pages)
+                for table_idx in range(
+                    page_idx, page_idx + nb_slips_per_page * nb_pages, nb_pages
                 )
-            )
+            ],
+        )
+        paper_cutter_seats_cache.set(cache_key, seats, size=sys.getsizeof(seats))
 
-    # Let's manipulate table numbers, we'll come back to pairings after
-    pairings_per_table_number = {pairing.number: pairing for pairing in pairings}
-    table_numbers = sorted(pairings_per_table_number.keys())
-    nb_pages = math.ceil(len(table_numbers) / nb_slips_per_page)
-    nb_tables = len(table_numbers)
+    return seats
 
-    def _get_nb_tables_in_row(row_idx):
-        # The first row is always full, otherwise we'd done one page fewer
-        if row_idx == 0:
-            return nb_pages
 
-        total_nb_slips_in_previous_rows = sum(
-            [_get_nb_tables_in_row(idx) for idx in range(row_idx - 1, -1, -1)]
+def get_paper_cutter_order(nb_tables, *, nb_slips_per_page):
+    """
+    Return the print order used by `sort_pairings_for_paper_cutter`, as a tuple
+    of indices in the list of tables sorted by table number (`None` for an
+    empty slip)
+    """
+    return tuple(
+        seat >> 1 if seat != TablesView.EMPTY_SEAT else None
+        for seat in _get_paper_cutter_seats(
+            nb_tables, nb_slips_per_page=nb_slips_per_page
         )
-        return min(nb_pages, nb_tables - total_nb_slips_in_previous_rows)
-
-    # We build the "matrix" for tables. It's not really a matrix, since
-    # some rows are longer than others.
-    matrix = [
-        # Rows are of different sizes
-        [None] * _get_nb_tables_in_row(row_idx)
-        # There are `nb_slips_per_page` rows
-        for row_idx in range(nb_slips_per_page)
-    ]
-
-    # Now we just fill out the matrix, iterating over each line
-    table_idx = 0
-    for row in matrix:
-        for row_idx in range(len(row)):
-            row[row_idx] = table_numbers[table_idx]
-            table_idx += 1
-
-    # We "inverse" the matrix, to get the list of columns instead of the list of rows
-    inversed_matrix = zip_longest(*matrix)
-    # We flatten the list of columns into a simple list,
-    # `zip_longest` will add `None` to "unfinished" columns
-    table_numbers_in_order = [
-        table_number for column in inversed_matrix for table_number in column
-    ]
-
-    # Now it's back to pairings, from table number
-    return [
-        pairings_per_table_number[table_number] if table_number is not None else None
-        for table_number in table_numbers_in_order
-    ]
+    )
 
 
 Standing = namedtuple(
@@ -282,8 +565,10 @@ Standing = namedtuple(
 
 def parse_standings(standings_input):
     standings = []
+    # Records (eg. `3 - 0`) are the same for a lot of players, see `_intern`
+    strings = {}
     for standing_line in standings_input.split("\n"):
-        standing = _parse_standing(standing_line)
+        standing = _parse_standing(standing_line, strings=strings)
         # _parse_standing will return None in some cases (eg. blank line)
         if standing:
             standings.append(standing)
@@ -295,32 +580,19 @@ def parse_standings(standings_input):
         return standings
 
     # Make sure the first position is number 1
-    positions = Counter([standing.position for standing in standings])
-    min_position = min(positions.keys())
-    if min_position != 1:
+    if standings[0].position != 1:
         raise ParseStandingException("First position should be number 1")
 
-    # Make sure no position is missing
-    max_position = max(positions.keys())
-    missing_positions = set(range(min_position, max_position + 1)) - set(
-        positions.keys()
+    # Make sure no position is missing, and that we don't have duplicate positions
+    missing_positions, duplicate_positions = _find_gaps_and_duplicates(
+        standing.position for standing in standings
     )
     if missing_positions:
-        missing_positions_str = ", ".join(
-            [str(position) for position in missing_positions]
-        )
+        missing_positions_str = _format_gaps(missing_positions, noun="positions")
         raise ParseStandingException(
             f"Some positions are missing: {missing_positions_str}"
         )
 
-    # Make sure we don't have duplicate positions
-    duplicate_positions = sorted(
-        [
-            position
-            for position, nb_occurrences in positions.items()
-            if nb_occurrences > 1
-        ]
-    )
     if duplicate_positions:
         duplicate_positions_str = ", ".join(
             [str(position) for position in duplicate_positions]
@@ -347,7 +619,7 @@ re_standing = (
 re_header_standing = r"Rank\s+Name\s+Points\s+Results\s+OMW\s+GW\s+OGW"
 
 
-def _parse_standing(standing_line):
+def _parse_standing(standing_line, *, strings=None):
     standing_line = standing_line.strip()
 
     # If at that point the line is empty, just return None :shrug:
@@ -367,11 +639,17 @@ def _parse_standing(standing_line):
         )
 
     group_dict = result.groupdict()
+    position = _parse_bounded_number(group_dict["position"], max_value=MAX_POSITION)
+    if position is None:
+        raise ParseStandingException(
+            f"Position is too large (maximum is {MAX_POSITION}): {standing_line}"
+        )
+
     return Standing(
-        position=int(group_dict["position"]),
-        player_name=group_dict["player_name"],
+        position=position,
+        player_name=_intern(strings, group_dict["player_name"]),
         nb_points=int(group_dict["nb_points"]),
-        record=group_dict["record"],
+        record=_intern(strings, group_dict["record"]),
         omw=group_dict["omw"],
         gw=group_dict["gw"],
         ogw=group_dict["ogw"],
@@ -0,0 +1,618 @@
+import os
+import sys
+from operator import itemgetter
+
+import click
+from flask import (
+    Flask,
+    abort,
+    render_template,
+    request,
+    send_from_directory,
+    stream_with_context,
+)
+from werkzeug.exceptions import RequestEntityTooLarge
+
+from taw import metrics
+from taw.bytecode_cache import PrecompiledBytecodeCache, precompile_templates
+from taw.cache import (
+    paper_cutter_seats_cache,
+    parse_with_cache,
+    parsed_dumps_cache,
+    rendered_pages_cache,
+)
+from taw.compression import MinifyExtension, compress_response, get_response_encoding
+from taw.exceptions import ParsePairingException, ParseStandingException
+from taw.forms import PairingsForm, StandingsForm
+from taw.json_api import api_v1
+from taw.pdf import iter_match_slips_pdf, iter_pairings_pdf, iter_round_bundle_pdf
+from taw.profiling import (
+    get_request_duration,
+    get_server_timing_header,
+    profiled,
+    start_request_timing,
+    timed,
+)
+from taw.uploads import (
+    LOGOS_MAX_AGE_CACHE_CONTROL,
+    get_data_uri,
+    get_embedded_logo,
+    maybe_evict_logos,
+    re_logo_filename,
+    save_logo,
+)
+from taw.utils import (
+    NB_SLIPS_PER_PAGE,
+    get_pairings_by_name,
+    parse_pairings,
+    parse_round_results,
+    parse_standings,
+    sort_pairings_for_paper_cutter,
+)
+
+
+app = Flask(
+    __name__,
+    static_url_path="",
+    static_folder="static",
+    template_folder="templates",
+)
+# Load templates from the bytecode built by `precompile-templates` when possible
+# Templates are minified when they're compiled, see `MinifyExtension`
+app.jinja_options = {
+    **app.jinja_options,
+    "bytecode_cache": PrecompiledBytecodeCache(),
+    "extensions": [MinifyExtension],
+}
+# Allows profiling any request with `?profile=1`, see `profiled`
+app.config["PROFILING"] = os.environ.get("TAW_PROFILING") == "1"
+# Room for the biggest dumps of a round bundle (see `MAX_TABLE_NUMBER`) and a
+# logo, bigger requests get a 413
+app.config["MAX_CONTENT_LENGTH"] = 32 * 1024 * 1024
+app.register_blueprint(api_v1)
+
+# See https://github.com/pmourlanne/taw/issues/27
+UPLOADS_FOLDER = "/tmp/"
+INVALID_LOGO_ERROR = "Could not read the logo, please upload a PNG or JPEG image"
+
+# Pages for more tables / standings than that are streamed
+STREAMING_MIN_NB_ROWS = 250
+# Number of template chunks sent at once when streaming
+STREAMING_BUFFER_SIZE = 100
+
+
+@app.before_request
+def before_request():
+    start_request_timing()
+
+
+@app.after_request
+def add_server_timing_header(response):
+    response.headers["Server-Timing"] = get_server_timing_header()
+    return response
+
+
+@app.after_request
+def record_request_metrics(response):
+    action = _get_metrics_action()
+    observations = metrics.pop_observations()
+    observations.append(
+        (metrics.requests_total, (action, str(response.status_code)), 1)
+    )
+    if (request_duration := get_request_duration()) is not None:
+        observations.append(
+            (metrics.request_duration_seconds, (action,), request_duration)
+        )
+
+    if not response.is_streamed:
+        observations.append(
+            (metrics.response_bytes, (action,), response.calculate_content_length())
+        )
+        metrics.registry.record(observations)
+        return response
+
+    # We only know the size of streamed responses once they've been sent
+    response.response = _iter_and_record_response_bytes(
+        response.iter_encoded(), observations, action=action
+    )
+    return response
+
+
+@app.after_request
+def compress_rendered_pages(response):
+    # Registered after `record_request_metrics` so that it runs before it: the
+    # metrics see the compressed response
+    encoding = get_response_encoding(request, response)
+    if encoding is None:
+        return response
+
+    action = _get_metrics_action()
+
+    def record_compressed_bytes(nb_bytes, nb_compressed_bytes):
+        metrics.registry.record(
+            [
+                (metrics.uncompressed_bytes, (action, encoding), nb_bytes),
+                (
+                    metrics.compression_saved_bytes,
+                    (action, encoding),
+                    nb_bytes - nb_compressed_bytes,
+                ),
+            ]
+        )
+
+    return compress_response(response, encoding, on_done=record_compressed_bytes)
+
+
+def _get_metrics_action():
+    # Don't let anyone create new labels
+    if request.endpoint == "home" and request.method == "POST":
+        try:
+            action = request.form.get("action")
+        except RequestEntityTooLarge:
+            # The form was never read, see `MAX_CONTENT_LENGTH`
+            return "unknown"
+        if action in ACTION_RENDERERS or action in PDF_ACTION_RENDERERS:
+            return action
+        return "unknown"
+
+    return request.endpoint or "not_found"
+
+
+def _iter_and_record_response_bytes(chunks, observations, *, action):
+    nb_bytes = 0
+    try:
+        for chunk in chunks:
+            nb_bytes += len(chunk)
+            yield chunk
+    finally:
+        observations.append((metrics.response_bytes, (action,), nb_bytes))
+        metrics.registry.record(observations)
+
+
+@app.route("/", methods=["GET", "POST"])
+@profiled
+def home():
+    # If we're asked to handle standings, we use the dedicated form
+    if getattr(request, "form") and request.form["action"] == "standings":
+        form = StandingsForm()
+    # We default to the pairings form otherwise
+    else:
+        form = PairingsForm()
+
+    with timed("validate"):
+        is_valid = form.validate_on_submit()
+
+    if is_valid:
+        _observe_dumps(form)
+
+        ctx = {
+            "tournament_name": form.tournament_name.data,
+            "round_number": form.round_number.data,
+        }
+
+        tournament_logo_filename = None
+        if data := form.tournament_logo.data:
+            with timed("logo"):
+                tournament_logo_filename = save_logo(data, folder=UPLOADS_FOLDER)
+                maybe_evict_logos(folder=UPLOADS_FOLDER)
+            # `save_logo` read the whole upload
+            metrics.observe(metrics.upload_bytes, data.stream.tell())
+            if tournament_logo_filename is None:
+                form.tournament_logo.errors.append(INVALID_LOGO_ERROR)
+                return render_template("index.html", form=form)
+
+        ctx["tournament_logo_filename"] = tournament_logo_filename
+
+        action = request.form["action"]
+        if render := PDF_ACTION_RENDERERS.get(action):
+            return render(form, ctx)
+
+        if render := ACTION_RENDERERS.get(action):
+            # Big pages are streamed, and are too big to be cached anyway
+            if form.nb_parsed_rows >= STREAMING_MIN_NB_ROWS:
+                return render(form, ctx, stream=True)
+
+            # The page only depends on the dump and the other fields
+            cache_key = (
+                form.aetherhub_dump_hash,
+                action,
+                ctx["round_number"],
+                ctx["tournament_name"],
+                tournament_logo_filename,
+                form.first_table_number.data,
+            )
+            html = rendered_pages_cache.get(cache_key)
+            if html is None:
+                with timed("render"):
+                    html = render(form, ctx)
+                rendered_pages_cache.set(cache_key, html, size=sys.getsizeof(html))
+
+            return html
+
+    return render_template("index.html", form=form)
+
+
+def _observe_dumps(form):
+    if isinstance(form, StandingsForm):
+        dumps = [("standings", form.aetherhub_dump.data, form.nb_parsed_rows)]
+    else:
+        dumps = [("pairings", form.aetherhub_dump.data, form.nb_parsed_rows)]
+        # The optional standings of the round bundle
+        if form.parsed_standings:
+            dumps.append(
+                ("standings", form.standings_dump.data, len(form.parsed_standings))
+            )
+
+    for kind, dump, nb_parsed_rows in dumps:
+        metrics.observe(metrics.dump_bytes, len(dump.encode()), kind)
+        metrics.observe(metrics.dump_lines, dump.count("\n") + 1, kind)
+        metrics.observe(metrics.parsed_rows, nb_parsed_rows, kind)
+
+
+def _render_pairings(form, ctx, *, stream=False):
+    return _render_page(
+        "pairings.html",
+        stream=stream,
+        rows=_iter_pairings_rows(form),
+        **ctx,
+    )
+
+
+def _iter_pairings_rows(form):
+    with timed("sort"):
+        pairings_by_name = get_pairings_by_name(
+            form.parsed_pairings,
+            first_table_number=form.first_table_number.data,
+        )
+
+    for pairing in pairings_by_name:
+        # We don't want to show the bye as player 1
+        if pairing.player_1.is_bye:
+            continue
+
+        # We treat the bye pairing a little bit differently
+        if pairing.player_2.is_bye:
+            # No table (player 1 doesn't have to sit anywhere)
+            table_number = ""
+            # The bye player has no points
+            player_2_points = ""
+        else:
+            table_number = pairing.number
+            player_2_points = pairing.player_2.points
+
+        yield {
+            "table_number": table_number,
+            "player_1": pairing.player_1.name,
+            "player_1_points": pairing.player_1.points,
+            "player_2": pairing.player_2.name,
+            "player_2_points": player_2_points,
+        }
+
+
+def _render_match_slips(form, ctx, *, stream=False):
+    # The logo is embedded once in the page, instead of being loaded by every slip
+    embedded_logo = _get_embedded_logo(ctx)
+    return _render_page(
+        "match_slips.html",
+        stream=stream,
+        rows=_iter_match_slips_rows(form),
+        nb_slips_per_page=NB_SLIPS_PER_PAGE,
+        embedded_logo=embedded_logo,
+        embedded_logo_data_uri=embedded_logo and get_data_uri(embedded_logo),
+        **ctx,
+    )
+
+
+def _get_embedded_logo(ctx):
+    if tournament_logo_filename := ctx["tournament_logo_filename"]:
+        return get_embedded_logo(os.path.join(UPLOADS_FOLDER, tournament_logo_filename))
+
+    return None
+
+
+def _iter_match_slips_rows(form):
+    with timed("sort"):
+        pairings = form.parsed_pairings
+        # Filter out the bye before sorting:
+        pairings = [pairing for pairing in pairings if not pairing.player_2.is_bye]
+        # We want to print five match slips per page, and we want
+        # them to in the "correct" order when we use the paper cutter
+        pairings = sort_pairings_for_paper_cutter(
+            pairings,
+            nb_slips_per_page=NB_SLIPS_PER_PAGE,
+            first_table_number=form.first_table_number.data,
+        )
+
+    for pairing in pairings:
+        if pairing is not None:
+            yield {
+                "table_number": pairing.number,
+                "player_1": pairing.player_1.name,
+                "player_1_points": pairing.player_1.points,
+                "player_2": pairing.player_2.name,
+                "player_2_points": pairing.player_2.points,
+            }
+        else:
+            # Empty pairing
+            yield {
+                "table_number": "",
+                "player_1": "",
+                "player_1_points": None,
+                "player_2": "",
+                "player_2_points": None,
+            }
+
+
+def _render_standings(form, ctx, *, stream=False):
+    return _render_page(
+        "standings.html",
+        stream=stream,
+        standings=form.parsed_standings,
+        **ctx,
+    )
+
+
+def _render_page(template_name, *, stream, **ctx):
+    """
+    Return the rendered HTML, or a streamed response when `stream` is set:
+    the browser can then start the layout while the rest is being rendered,
+    and the whole HTML is never held in memory
+    """
+    if not stream:
+        return render_template(template_name, **ctx)
+
+    template = app.jinja_env.get_template(template_name)
+    app.update_template_context(ctx)
+    template_stream = template.stream(ctx)
+    # We don't want to send each bit of HTML on its own
+    template_stream.enable_buffering(STREAMING_BUFFER_SIZE)
+
+    return app.response_class(
+        stream_with_context(template_stream),
+        mimetype="text/html",
+    )
+
+
+def _render_outstanding_tables(form, ctx, *, stream=False):
+    # Results are only needed here, the form only parsed the pairings
+    results = parse_with_cache(
+        parse_round_results,
+        form.aetherhub_dump.data,
+        dump_hash=form.aetherhub_dump_hash,
+    )
+    outstanding_tables = results.get_outstanding_tables()
+
+    return _render_page(
+        "outstanding_tables.html",
+        stream=stream,
+        rows=_iter_outstanding_tables_rows(
+            outstanding_tables, first_table_number=form.first_table_number.data
+        ),
+        nb_outstanding_tables=len(outstanding_tables),
+        nb_tables=len(results.pairings),
+        **ctx,
+    )
+
+
+def _iter_outstanding_tables_rows(outstanding_tables, *, first_table_number):
+    table_number_offset = (first_table_number or 1) - 1
+    for table in outstanding_tables:
+        yield {
+            "table_number": table.number + table_number_offset,
+            "player_1": table.player_1.name,
+            "player_1_points": table.player_1.points,
+            "player_2": table.player_2.name,
+            "player_2_points": table.player_2.points,
+        }
+
+
+ACTION_RENDERERS = {
+    "pairings": _render_pairings,
+    "match_slips": _render_match_slips,
+    "standings": _render_standings,
+    "outstanding_tables": _render_outstanding_tables,
+}
+
+
+def _render_pairings_pdf(form, ctx):
+    pdf = iter_pairings_pdf(
+        _iter_pairings_rows(form),
+        tournament_name=ctx["tournament_name"],
+        round_number=ctx["round_number"],
+        logo=_get_embedded_logo(ctx),
+    )
+    return _pdf_response(pdf, filename=f"pairings_round_{ctx['round_number']}.pdf")
+
+
+def _render_match_slips_pdf(form, ctx):
+    pdf = iter_match_slips_pdf(
+        _iter_match_slips_rows(form),
+        tournament_name=ctx["tournament_name"],
+        round_number=ctx["round_number"],
+        nb_slips_per_page=NB_SLIPS_PER_PAGE,
+        logo=_get_embedded_logo(ctx),
+    )
+    return _pdf_response(pdf, filename=f"match_slips_round_{ctx['round_number']}.pdf")
+
+
+def _render_round_bundle_pdf(form, ctx):
+    # The dumps were parsed once when validating the form, everything is
+    # generated from them
+    pdf = iter_round_bundle_pdf(
+        _iter_pairings_rows(form),
+        _iter_match_slips_rows(form),
+        form.parsed_standings,
+        tournament_name=ctx["tournament_name"],
+        round_number=ctx["round_number"],
+        nb_slips_per_page=NB_SLIPS_PER_PAGE,
+        logo=_get_embedded_logo(ctx),
+    )
+    return _pdf_response(pdf, filename=f"round_{ctx['round_number']}.pdf")
+
+
+def _pdf_response(pdf, *, filename):
+    # PDFs are always streamed, page by page
+    return app.response_class(
+        pdf,
+        mimetype="application/pdf",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'},
+    )
+
+
+PDF_ACTION_RENDERERS = {
+    "pairings_pdf": _render_pairings_pdf,
+    "match_slips_pdf": _render_match_slips_pdf,
+    "round_bundle_pdf": _render_round_bundle_pdf,
+}
+
+
+@app.route("/metrics")
+def metrics_page():
+    caches = {
+        "parsed_dumps": parsed_dumps_cache.stats(),
+        "rendered_pages": rendered_pages_cache.stats(),
+        "paper_cutter_seats": paper_cutter_seats_cache.stats(),
+    }
+
+    def get_cache_hit_ratio(stats):
+        nb_lookups = stats["hits"] + stats["misses"]
+        return stats["hits"] / nb_lookups if nb_lookups else 0
+
+    # The caches keep their own stats, they're only read when scraped
+    cache_metrics = [
+        ("taw_cache_hits_total", "counter", "Cache hits", itemgetter("hits")),
+        ("taw_cache_misses_total", "counter", "Cache misses", itemgetter("misses")),
+        ("taw_cache_hit_ratio", "gauge", "Cache hit ratio", get_cache_hit_ratio),
+        ("taw_cache_bytes", "gauge", "Size of the cache", itemgetter("nb_bytes")),
+    ]
+    exposed = metrics.registry.expose() + "".join(
+        metrics.format_metric(
+            name,
+            type_,
+            documentation,
+            [
+                (name, {"cache": cache_name}, get_value(stats))
+                for cache_name, stats in caches.items()
+            ],
+        )
+        for name, type_, documentation, get_value in cache_metrics
+    )
+
+    return app.response_class(exposed, mimetype="text/plain; version=0.0.4")
+
+
+@app.route("/cache/stats/")
+def cache_stats():
+    return {
+        "parsed_dumps": parsed_dumps_cache.stats(),
+        "rendered_pages": rendered_pages_cache.stats(),
+        "paper_cutter_seats": paper_cutter_seats_cache.stats(),
+    }
+
+
+def warm_up():
+    """
+    Pay upfront for what the first request of a cold instance would otherwise
+    pay for: loading the templates and compiling the parsing regexps
+    """
+    for template_name in app.jinja_env.list_templates(extensions=["html"]):
+        app.jinja_env.get_template(template_name)
+
+    parse_pairings("1   Player 1 (0 Points)   Player 2 (0 Points)")
+    parse_standings("1  Player 1    0  0 - 0   0.0000%    0.0000%    0.0000%")
+
+
+@app.cli.command("precompile-templates")
+def precompile_templates_command():
+    """Compile the templates into the bytecode cache, to run before deploying."""
+    for template_name in precompile_templates(app.jinja_env):
+        click.echo(f"Compiled {template_name}")
+
+
+@app.cli.command("project-top-cut")
+@click.argument("standings_file", type=click.File(encoding="utf-8"))
+@click.option(
+    "--rounds", "nb_rounds", type=int, required=True, help="Swiss rounds left"
+)
+@click.option("--top", type=int, default=8, show_default=True)
+@click.option(
+    "--pairings",
+    "pairings_file",
+    type=click.File(encoding="utf-8"),
+    help="Pairings of the round being played, with the results reported so far",
+)
+@click.option(
+    "--trials",
+    "nb_trials",
+    type=click.IntRange(min=1),
+    help="100k by default, fewer for big events: trials × players × rounds "
+    "is capped at 100M, about 4s",
+)
+@click.option("--processes", "nb_processes", type=int, help="Spread the trials")
+@click.option("--seed", type=int)
+def project_top_cut_command(
+    standings_file, nb_rounds, top, pairings_file, nb_trials, nb_processes, seed
+):
+    """Project who makes the top cut, from an AetherHub standings dump."""
+    # NumPy is only needed here, not to serve requests
+    from taw.projection import project_top_cut
+
+    try:
+        standings = parse_standings(standings_file.read())
+        round_results = pairings_file and parse_round_results(pairings_file.read())
+        projection = project_top_cut(
+            standings,
+            nb_rounds=nb_rounds,
+            top=top,
+            round_results=round_results,
+            nb_trials=nb_trials,
+            nb_processes=nb_processes,
+            seed=seed,
+        )
+    except (ParsePairingException, ParseStandingException, ValueError) as e:
+        raise click.ClickException(str(e))
+
+    click.echo(f"Projected from {projection.nb_trials} trials\n")
+    click.echo(f"Points of the last player of the top {top}:")
+    for nb_points, probability in projection.cutoff_probabilities.items():
+        click.echo(f"{nb_points:>5} points: {probability:.1%}")
+
+    click.echo(f"\nChances of making the top {top} with:")
+    for nb_points, probability in projection.points_probabilities.items():
+        if probability:
+            click.echo(f"{nb_points:>5} points: {probability:.1%}")
+
+    click.echo(f"\nChances of making the top {top}:")
+    for standing in standings:
+        probability = projection.top_probabilities[standing.player_name]
+        if probability:
+            click.echo(
+                f"{standing.position:>5}. {standing.player_name}: {probability:.1%}"
+            )
+
+
+@app.route("/help/")
+def help_page():
+    return render_template("help.html")
+
+
+@app.route("/faq/")
+def faq():
+    return render_template("faq.html")
+
+
+@app.route("/uploads/<path:name>")
+def uploads(name):
+    # Only logos are served from the uploads folder, see `save_logo`
+    if not re_logo_filename.match(name):
+        abort(404)
+
+    response = send_from_directory(
+        os.path.join(UPLOADS_FOLDER), name, max_age=LOGOS_MAX_AGE_CACHE_CONTROL
+    )
+    # Logos are stored by content, a given URL always serves the same file
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    # Always served as the JPEG it is
+    response.headers["X-Content-Type-Options"] = "nosniff"
+    return response